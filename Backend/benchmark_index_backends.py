@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+📈 ANN Backend Benchmark
+Recall-vs-latency report for the FAISS backends supported by VectorStoreEmbedder,
+measured against the exact flat index over the real enhanced_vector_store vectors
+"""
+
+import json
+import logging
+import argparse
+from pathlib import Path
+import numpy as np
+import faiss
+
+from vector_store_embedder import benchmark_index_backends
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Default sweep: each backend at a few search-time settings to trace the recall/latency curve
+DEFAULT_CONFIGS = (
+    [{"index_type": "flat"}]
+    + [{"index_type": "ivf_flat", "index_params": {"nprobe": n}} for n in (4, 8, 16, 32, 64)]
+    + [{"index_type": "hnsw", "index_params": {"M": 32, "efSearch": ef}} for ef in (16, 32, 64, 128, 256)]
+    + [{"index_type": "ivf_pq", "index_params": {"nprobe": n, "pq_m": 48}} for n in (8, 16, 32, 64)]
+)
+
+TEST_QUERIES = [
+    "INSAT-3D satellite",
+    "ocean surface temperature",
+    "weather forecasting",
+    "MOSDAC data access",
+    "OCEANSAT-3 ocean colour monitor",
+    "SCATSAT-1 wind vector products",
+    "difference between INSAT-3D and INSAT-3DS",
+    "Chandrayaan lunar mission"
+]
+
+
+def load_flat_vectors(vector_store_dir: Path) -> np.ndarray:
+    """
+    The stored vectors (in storage order), whatever backend wrote the store:
+    IndexIDMap2 stores through their inner index, IVF-Flat stores from the
+    inverted lists (incremental IVF stores use content-hash ids, so ids are not
+    0..n-1). IVF-PQ codes are lossy, so those stores are re-embedded from the
+    chunk store instead.
+    """
+    stored = faiss.read_index(str(vector_store_dir / "faiss_index.bin"))
+    # keep `stored` referenced: an IndexIDMap2 owns (and frees) its inner index
+    index = stored
+    if isinstance(stored, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        index = faiss.downcast_index(stored.index)
+
+    if isinstance(index, (faiss.IndexIVFPQ, faiss.IndexPQ)):
+        logger.info("Index stores compressed (PQ) vectors - re-embedding the chunk store for exact vectors")
+        return embed_chunk_store(vector_store_dir)
+
+    if isinstance(index, faiss.IndexIVFFlat):
+        invlists = index.invlists
+        parts = [np.zeros((0, index.d), dtype='float32')]
+        for list_no in range(index.nlist):
+            size = invlists.list_size(list_no)
+            if size:
+                codes = faiss.rev_swig_ptr(invlists.get_codes(list_no), size * invlists.code_size)
+                parts.append(np.frombuffer(codes, dtype='float32').reshape(size, index.d).copy())
+        vectors = np.vstack(parts)
+    else:
+        vectors = index.reconstruct_n(0, index.ntotal)
+    return np.ascontiguousarray(vectors, dtype='float32')
+
+
+def embed_chunk_store(vector_store_dir: Path) -> np.ndarray:
+    """Re-encode every stored chunk with the store's embedding model (normalized, as at build time)"""
+    from embedding_registry import get_embedding_model
+    from chunk_store import ChunkStore
+
+    with open(vector_store_dir / "index_info.json", 'r', encoding='utf-8') as f:
+        model_name = json.load(f).get("model_name", "all-MiniLM-L6-v2")
+    chunk_store = ChunkStore(str(vector_store_dir))
+    texts = [chunk_store.get_field(i, "content") or "" for i in range(len(chunk_store))]
+    chunk_store.close()
+
+    vectors = np.asarray(get_embedding_model(model_name).encode(texts, batch_size=64, convert_to_tensor=False),
+                         dtype='float32')
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def build_queries(vectors: np.ndarray, vector_store_dir: Path, num_queries: int, seed: int) -> np.ndarray:
+    """
+    Real text queries when the embedding model is available, topped up with
+    stored vectors sampled from the corpus
+    """
+    queries = []
+    try:
+        from embedding_registry import get_embedding_model
+        from query_embedding_cache import get_query_embedding_cache
+        with open(vector_store_dir / "index_info.json", 'r', encoding='utf-8') as f:
+            model_name = json.load(f).get("model_name", "all-MiniLM-L6-v2")
+        text_vectors = get_query_embedding_cache(get_embedding_model(model_name)).encode_many(TEST_QUERIES)
+        queries.append(text_vectors)
+    except Exception as e:
+        logger.warning(f"⚠️ Text queries unavailable, sampling corpus vectors only: {e}")
+
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(vectors), size=min(num_queries, len(vectors)), replace=False)
+    queries.append(vectors[sample])
+    return np.ascontiguousarray(np.vstack(queries), dtype='float32')
+
+
+def main():
+    """
+    Run the benchmark and save the report next to the vector store
+    """
+    parser = argparse.ArgumentParser(description="Recall vs latency of FAISS backends")
+    parser.add_argument("--vector-store", default="enhanced_vector_store")
+    parser.add_argument("--queries", type=int, default=500, help="Corpus vectors sampled as queries")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Report path (default: <vector-store>/ann_benchmark.json)")
+    args = parser.parse_args()
+
+    vector_store_dir = Path(args.vector_store)
+    vectors = load_flat_vectors(vector_store_dir)
+    queries = build_queries(vectors, vector_store_dir, args.queries, args.seed)
+    logger.info(f"📈 Benchmarking {len(DEFAULT_CONFIGS)} configurations over {len(vectors)} vectors "
+                f"with {len(queries)} queries (k={args.k})")
+
+    report = benchmark_index_backends(vectors, queries, k=args.k, configs=list(DEFAULT_CONFIGS))
+
+    output_path = Path(args.output) if args.output else vector_store_dir / "ann_benchmark.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "total_vectors": len(vectors),
+            "num_queries": len(queries),
+            "k": args.k,
+            "results": report
+        }, f, indent=2)
+
+    logger.info(f"✅ Saved recall-vs-latency report to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+📈 Micro-Batching Benchmark
+Throughput and latency of query embedding + FAISS search under concurrent load,
+as a function of the batching window (0 = one encode/search per request)
+"""
+
+import json
+import time
+import logging
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import faiss
+
+from embedding_registry import get_embedding_model, DEFAULT_MODEL_NAME
+from query_embedding_cache import QueryEmbeddingCache
+from micro_batcher import QuerySearchBatcher
+from vector_store_embedder import apply_search_params
+from benchmark_index_backends import TEST_QUERIES
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def run_load(search, queries, concurrency: int, k: int):
+    """Issue every query from `concurrency` threads; returns (wall seconds, per-request latencies)"""
+    def one(query):
+        start = time.perf_counter()
+        search(query, k)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, queries))
+    return time.perf_counter() - start, np.array(latencies)
+
+
+def main():
+    """
+    Sweep batching windows and save the report next to the vector store
+    """
+    parser = argparse.ArgumentParser(description="Throughput/latency of micro-batched query search")
+    parser.add_argument("--vector-store", default="enhanced_vector_store")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--windows", default="0,0.5,1,2,5,10", help="Batching windows in ms (0 = unbatched)")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--output", default=None, help="Report path (default: <vector-store>/micro_batching_benchmark.json)")
+    args = parser.parse_args()
+
+    vector_store_dir = Path(args.vector_store)
+    index = faiss.read_index(str(vector_store_dir / "faiss_index.bin"))
+    with open(vector_store_dir / "index_info.json", 'r', encoding='utf-8') as f:
+        index_info = json.load(f)
+    apply_search_params(index, index_info)
+    model = get_embedding_model(index_info.get("model_name", DEFAULT_MODEL_NAME))
+
+    # Distinct query strings, and a cache that keeps nothing, so every request really encodes
+    encoder = QueryEmbeddingCache(model, max_entries=0)
+    queries = [f"{TEST_QUERIES[i % len(TEST_QUERIES)]} {i}" for i in range(args.requests)]
+    encoder.encode_many(queries[:8])   # warm up the model
+
+    def unbatched_search(query, k):
+        return index.search(encoder.encode(query), k)
+
+    logger.info(f"📈 {args.requests} requests, concurrency {args.concurrency}, {index.ntotal} vectors")
+    results = []
+    for window_ms in [float(w) for w in args.windows.split(",")]:
+        batcher = None
+        if window_ms > 0:
+            batcher = QuerySearchBatcher(encoder.encode_many, index, max_batch_size=args.max_batch, max_wait_ms=window_ms)
+            search = batcher.search
+        else:
+            search = unbatched_search
+
+        seconds, latencies = run_load(search, queries, args.concurrency, args.k)
+        result = {
+            "window_ms": window_ms,
+            "throughput_qps": round(len(queries) / seconds, 1),
+            "latency_ms": {
+                "mean": round(float(latencies.mean()) * 1000, 2),
+                "p50": round(float(np.percentile(latencies, 50)) * 1000, 2),
+                "p95": round(float(np.percentile(latencies, 95)) * 1000, 2),
+                "p99": round(float(np.percentile(latencies, 99)) * 1000, 2)
+            }
+        }
+        if batcher is not None:
+            result["batching"] = batcher.get_stats()
+            batcher.close()
+        results.append(result)
+        logger.info(f"  window={window_ms}ms: {result['throughput_qps']} qps, "
+                    f"p50={result['latency_ms']['p50']}ms p95={result['latency_ms']['p95']}ms"
+                    + (f", mean batch {result['batching']['mean_batch_size']}" if batcher is not None else ""))
+
+    output_path = Path(args.output) if args.output else vector_store_dir / "micro_batching_benchmark.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "total_vectors": index.ntotal,
+            "requests": len(queries),
+            "concurrency": args.concurrency,
+            "max_batch_size": args.max_batch,
+            "k": args.k,
+            "results": results
+        }, f, indent=2)
+
+    logger.info(f"✅ Saved micro-batching report to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+📈 Neo4j Import Benchmark
+Throughput of MOSDACNeo4jImporter import modes: batched (one session) and
+parallel (partitioned, and unpartitioned for comparison) over several worker
+counts.
+
+Runs against the Neo4j at NEO4J_URI - use a scratch container, the database
+is cleared before every run:
+
+    docker run --rm -p 7687:7687 -e NEO4J_AUTH=neo4j/benchmark neo4j:5
+    NEO4J_PASSWORD=benchmark python benchmark_neo4j_import.py --clear
+
+or, without a server, against --stand-in: an in-process stand-in that charges
+a fixed round trip plus a per-row cost per transaction and, like Neo4j, fails
+a transaction with a TransientError (deadlock) when it needs a node lock held
+by another open transaction.
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+from pathlib import Path
+from neo4j.exceptions import TransientError
+
+from import_to_neo4j import MOSDACNeo4jImporter, load_triples
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class _StandInResult:
+    def single(self, strict=False):
+        return None
+
+    def consume(self):
+        pass
+
+
+class _StandInTransaction:
+    def __init__(self, server):
+        self.server = server
+        self.locked = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.server.release(self.locked)
+
+    def run(self, query, rows=(), **params):
+        names = set()
+        for row in rows:
+            names.update(row[key] for key in ("name", "subject", "object") if key in row)
+        self.server.acquire(names, self.locked)
+        # Server-side work runs in parallel with other sessions (sleep releases the GIL)
+        time.sleep(self.server.round_trip + self.server.per_row * len(rows))
+        self.server.rows_written += len(rows)
+        return _StandInResult()
+
+    def commit(self):
+        pass
+
+
+class _StandInSession:
+    def __init__(self, server):
+        self.server = server
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def begin_transaction(self):
+        return _StandInTransaction(self.server)
+
+
+class StandInNeo4j:
+    """Driver-shaped stand-in: session() -> begin_transaction() -> run()/commit()"""
+
+    def __init__(self, round_trip_ms: float = 2.0, per_row_us: float = 20.0):
+        self.round_trip = round_trip_ms / 1000.0
+        self.per_row = per_row_us / 1_000_000.0
+        self.rows_written = 0
+        self.deadlocks = 0
+        self._locks = {}   # node name -> owning lock set
+        self._mutex = threading.Lock()
+
+    def session(self, **config):
+        return _StandInSession(self)
+
+    def acquire(self, names, owned):
+        with self._mutex:
+            if any(self._locks.get(name, owned) is not owned for name in names):
+                self.deadlocks += 1
+                raise TransientError("stand-in: node locked by another transaction (deadlock detected)")
+            for name in names:
+                self._locks[name] = owned
+            owned.update(names)
+
+    def release(self, owned):
+        with self._mutex:
+            for name in owned:
+                self._locks.pop(name, None)
+            owned.clear()
+
+    def close(self):
+        pass
+
+
+def main():
+    """
+    Run every mode/worker combination and save the report next to the triples
+    """
+    parser = argparse.ArgumentParser(description="Throughput of batched vs parallel Neo4j triple import")
+    parser.add_argument("--triples", default="mosdac_data/triples.csv")
+    parser.add_argument("--workers", default="2,4,8", help="Worker counts for the parallel modes")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument("--max-retries", type=int, default=10)
+    parser.add_argument("--stand-in", action="store_true", help="Use the in-process stand-in instead of NEO4J_URI")
+    parser.add_argument("--round-trip-ms", type=float, default=2.0, help="Stand-in cost per transaction")
+    parser.add_argument("--per-row-us", type=float, default=20.0, help="Stand-in cost per row")
+    parser.add_argument("--clear", action="store_true", help="Confirm that the database at NEO4J_URI may be wiped")
+    parser.add_argument("--output", default=None, help="Report path (default: <triples dir>/import_benchmark.json)")
+    args = parser.parse_args()
+
+    if not args.stand_in and not args.clear:
+        parser.error("the benchmark wipes the database between runs: pass --clear (scratch database only) or --stand-in")
+
+    importer = MOSDACNeo4jImporter(batch_size=args.batch_size, max_retries=args.max_retries,
+                                   retry_backoff_seconds=0.01)
+    if args.stand_in:
+        importer.driver.close()
+    else:
+        importer.create_constraints()
+
+    rows, _ = load_triples(args.triples)
+    runs = [("batched", 1, True)]
+    for workers in [int(w) for w in args.workers.split(",")]:
+        runs.append(("parallel", workers, True))
+        runs.append(("parallel_unpartitioned", workers, False))
+
+    results = []
+    for mode, workers, partitioned in runs:
+        if args.stand_in:
+            importer.driver = StandInNeo4j(args.round_trip_ms, args.per_row_us)
+        else:
+            importer.clear_database()
+
+        if mode == "batched":
+            stats = importer.import_triples(args.triples)
+        else:
+            stats = importer.import_triples_parallel(args.triples, workers=workers, partitioned=partitioned)
+        if args.stand_in:
+            stats["deadlocks"] = importer.driver.deadlocks
+        results.append({"mode": mode, "workers": workers, **stats})
+        logger.info(f"  {mode} workers={workers}: {stats['triples_per_second']} triples/sec, "
+                    f"{stats['retries']} retries, {stats['skipped']} skipped")
+
+    output_path = Path(args.output) if args.output else Path(args.triples).parent / "import_benchmark.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "target": "stand-in" if args.stand_in else os.getenv("NEO4J_URI", "neo4j://127.0.0.1:7687"),
+            "triples": len(rows),
+            "batch_size": args.batch_size,
+            "results": results
+        }, f, indent=2)
+
+    logger.info(f"✅ Saved import benchmark to: {output_path}")
+    if not args.stand_in:
+        importer.close()
+
+
+if __name__ == "__main__":
+    main()
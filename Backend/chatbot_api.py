@@ -4,12 +4,18 @@ REST API for Enhanced Hybrid MOSDAC + ISRO Chatbot
 Serves as a backend for the Next.js frontend
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import os
+import time
 import logging
 import json
+import threading
+import google.generativeai as genai
 from minimal_chatbot import MinimalMOSDACChatbot
+from response_streaming import format_sse
+from health_monitor import HealthMonitor
+from metrics import render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE, HTTP_REQUESTS, IN_FLIGHT
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -19,29 +25,250 @@ logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
+# Frontends allowed to call the API (shared with the ASGI app in chatbot_asgi.py)
+ALLOWED_ORIGINS = ["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:8080", "http://127.0.0.1:8080", "http://localhost:3001", "http://127.0.0.1:3001", "https://mosdac-chatbot-frontend.onrender.com", "https://dhruvtara1.onrender.com"]
 # Enable CORS for all origins (more permissive for deployment)
-CORS(app, origins=["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:8080", "http://127.0.0.1:8080", "http://localhost:3001", "http://127.0.0.1:3001", "https://mosdac-chatbot-frontend.onrender.com", "https://dhruvtara1.onrender.com"], supports_credentials=True)  # Enable CORS for all frontends
+CORS(app, origins=ALLOWED_ORIGINS, supports_credentials=True)  # Enable CORS for all frontends
 
 # Load API key
 api_key = os.getenv("GEMINI_API_KEY", "")
 if not api_key:
     logger.warning("⚠️ GEMINI_API_KEY not found in environment variables. Chatbot will use fallback responses.")
 
+# Root endpoint description (shared with the ASGI app in chatbot_asgi.py)
+API_INFO = {
+    "name": "MOSDAC + ISRO Chatbot API",
+    "version": "1.0.0",
+    "endpoints": [
+        {
+            "path": "/chat",
+            "method": "POST",
+            "description": "Chat with the MOSDAC + ISRO bot",
+            "parameters": ["query", "user_id (optional)"]
+        },
+        {
+            "path": "/chat/stream",
+            "method": "POST",
+            "description": "Chat with the MOSDAC + ISRO bot, streamed as server-sent events (sources, text, metadata)",
+            "parameters": ["query", "user_id (optional)"]
+        },
+        {
+            "path": "/system-info",
+            "method": "GET",
+            "description": "Get system information"
+        },
+        {
+            "path": "/health",
+            "method": "GET",
+            "description": "Health check endpoint"
+        },
+        {
+            "path": "/livez",
+            "method": "GET",
+            "description": "Liveness: 200 while the process is serving"
+        },
+        {
+            "path": "/readyz",
+            "method": "GET",
+            "description": "Readiness: 200 once warmed up and required dependencies are healthy (cached checks with latencies)"
+        },
+        {
+            "path": "/metrics",
+            "method": "GET",
+            "description": "Prometheus metrics: per-stage latency histograms, cache/fallback/error counters, in-flight requests"
+        }
+    ]
+}
+
 # Initialize chatbot
 chatbot = None
 
+# Cold-start report, filled in by warmup()
+BOOT_STATS = {"ready": False, "process_started_at": time.time()}
+
+# Requests and the health monitor may both try to initialize
+_chatbot_lock = threading.Lock()
+
 # Initialize chatbot on first use instead of using before_first_request
-def get_chatbot():
+def get_chatbot(setup_llm: bool = True):
     global chatbot
     if chatbot is None:
+        with _chatbot_lock:
+            if chatbot is not None:
+                return chatbot
+            try:
+                logger.info("Initializing chatbot...")
+                chatbot = MinimalMOSDACChatbot(api_key, setup_llm=setup_llm)
+                logger.info("✅ Chatbot initialized successfully")
+            except Exception as e:
+                logger.error(f"❌ Failed to initialize chatbot: {e}")
+                raise
+    return chatbot
+
+def warmup(pre_fork: bool = False):
+    """
+    Build the chatbot (Gemini model probe, Neo4j connection, sample data,
+    caches) before the server accepts traffic. Under gunicorn this runs once
+    in the master before workers fork (see gunicorn.conf.py), so the loaded
+    state is shared copy-on-write; pre_fork=True leaves the Gemini (gRPC)
+    client to after_fork(). A failed warmup is logged, not raised:
+    requests retry the lazy initialization and /readyz stays 503.
+    """
+    start = time.perf_counter()
+    try:
+        bot = get_chatbot(setup_llm=not pre_fork)
+    except Exception as e:
+        BOOT_STATS.update({"ready": False, "error": str(e)})
+        logger.error(f"❌ Warmup failed, falling back to lazy initialization: {e}")
+        return
+    
+    BOOT_STATS.update({
+        "ready": True,
+        "warmup_seconds": round(time.perf_counter() - start, 3),
+        "cold_start_seconds": round(time.time() - BOOT_STATS["process_started_at"], 3),
+        "warmed_up_in_pid": os.getpid(),
+        "startup_timings": getattr(bot, 'startup_timings', {})
+    })
+    BOOT_STATS.pop("error", None)
+    logger.info(f"🚀 Warmup complete in {BOOT_STATS['warmup_seconds']}s "
+                f"(cold start {BOOT_STATS['cold_start_seconds']}s): {BOOT_STATS['startup_timings']}")
+
+def after_fork():
+    """Give a freshly forked worker its own network clients and health monitor"""
+    if chatbot is not None and hasattr(chatbot, 'reconnect'):
         try:
-            logger.info("Initializing chatbot...")
-            chatbot = MinimalMOSDACChatbot(api_key)
-            logger.info("✅ Chatbot initialized successfully")
+            chatbot.reconnect()
         except Exception as e:
-            logger.error(f"❌ Failed to initialize chatbot: {e}")
-            raise
-    return chatbot
+            logger.error(f"❌ Failed to reconnect clients after fork: {e}")
+    get_health_monitor()
+
+def get_vector_store_status(bot) -> str:
+    """
+    Vector store part of the health report, from what the served bot holds:
+    "loaded" (FAISS index in memory), "missing" (the bot searches a vector
+    store but has none) or "not_used" (MinimalMOSDACChatbot answers from its
+    knowledge base and Neo4j without one)
+    """
+    if bot is None:
+        return "not_initialized"
+    if not hasattr(bot, 'index'):
+        return "not_used"
+    return "loaded" if bot.index is not None and bot.index.ntotal > 0 else "missing"
+
+def check_neo4j() -> str:
+    if chatbot is None:
+        return "not_initialized"
+    if not getattr(chatbot, 'driver', None):
+        return "disabled"
+    with chatbot.driver.session() as session:
+        session.run("RETURN 1").consume()
+    return "ok"
+
+def check_vector_store() -> str:
+    return get_vector_store_status(chatbot)
+
+# Initialization retries after a failed warmup (exponential backoff, per process)
+INIT_RETRY = {"attempts": 0, "next_attempt_at": 0.0}
+
+def check_chatbot() -> str:
+    """
+    Retry the chatbot initialization if warmup failed, so /readyz and /health
+    recover once the dependency is back instead of staying 503.
+    INIT_RETRY_MAX_SECONDS (default 300) caps the backoff.
+    """
+    if chatbot is not None:
+        return "ok"
+    if time.time() < INIT_RETRY["next_attempt_at"]:
+        return "initializing"
+    INIT_RETRY["attempts"] += 1
+    try:
+        bot = get_chatbot()
+    except Exception as e:
+        delay = min(5 * 2 ** (INIT_RETRY["attempts"] - 1), float(os.getenv("INIT_RETRY_MAX_SECONDS", "300")))
+        INIT_RETRY["next_attempt_at"] = time.time() + delay
+        BOOT_STATS.update({"ready": False, "error": str(e), "init_attempts": INIT_RETRY["attempts"]})
+        raise
+    BOOT_STATS.update({"ready": True, "init_attempts": INIT_RETRY["attempts"],
+                       "startup_timings": getattr(bot, 'startup_timings', {})})
+    BOOT_STATS.pop("error", None)
+    logger.info(f"✅ Chatbot initialized by the health monitor (attempt {INIT_RETRY['attempts']})")
+    return "ok"
+
+def check_llm() -> str:
+    """Model metadata lookup: reaches the Gemini API without spending tokens"""
+    if chatbot is None:
+        return "not_initialized"
+    model_name = getattr(chatbot, 'gemini_model_name', None)
+    if getattr(chatbot, 'gemini_model', None) is None or not model_name:
+        return "disabled"
+    genai.get_model(f"models/{model_name}")
+    return "ok"
+
+# Per-process monitor (threads do not survive fork, so each worker starts its own)
+health_monitor = None
+
+def get_health_monitor() -> HealthMonitor:
+    """
+    Start (once per process) the background dependency checks.
+    HEALTH_CHECK_INTERVAL_SECONDS (default 30); READINESS_REQUIRED_CHECKS is a
+    comma-separated subset of neo4j,vector_store,llm that must be healthy for
+    /readyz (default: none - the chatbot degrades to fallback answers).
+    """
+    global health_monitor
+    if health_monitor is None or health_monitor.pid != os.getpid():
+        required = [name.strip() for name in os.getenv("READINESS_REQUIRED_CHECKS", "").split(",") if name.strip()]
+        health_monitor = HealthMonitor(
+            {"chatbot": check_chatbot, "neo4j": check_neo4j, "vector_store": check_vector_store, "llm": check_llm},
+            interval_seconds=float(os.getenv("HEALTH_CHECK_INTERVAL_SECONDS", "30")),
+            required=required
+        ).start()
+    return health_monitor
+
+def get_liveness():
+    """(payload, status code) for the liveness endpoint - no I/O"""
+    return {"status": "alive", "pid": os.getpid(),
+            "health_monitor": health_monitor is not None and health_monitor.is_running()}, 200
+
+def get_readiness():
+    """(payload, status code) for the readiness endpoint, from cached checks"""
+    # The monitor also retries a failed initialization (check_chatbot)
+    monitor = get_health_monitor()
+    if chatbot is None:
+        return {"status": "warming_up", "error": BOOT_STATS.get("error"), "pid": os.getpid()}, 503
+    ready = monitor.is_ready()
+    return {
+        "status": "ready" if ready else "not_ready",
+        "checks": monitor.results(),
+        "required": sorted(monitor.required),
+        "cold_start": BOOT_STATS,
+        "pid": os.getpid()
+    }, 200 if ready else 503
+
+def get_health_report():
+    """
+    (payload, status code) for /health. Initializes the chatbot if needed
+    (500 when that fails, as before the health monitor); the Neo4j status
+    comes from the monitor's cached check.
+    """
+    monitor = get_health_monitor()
+    try:
+        bot = get_chatbot()
+    except Exception as e:
+        BOOT_STATS.update({"ready": False, "error": str(e)})
+        return {'status': 'unhealthy', 'error': str(e), 'timestamp': str(os.getpid())}, 500
+    if not BOOT_STATS.get("ready"):
+        BOOT_STATS.update({"ready": True, "startup_timings": getattr(bot, 'startup_timings', {})})
+        BOOT_STATS.pop("error", None)
+    
+    checks = monitor.results()
+    neo4j_status = {"ok": "connected", "error": "disconnected"}.get(checks.get("neo4j", {}).get("status"), "unknown")
+    return {
+        'status': 'healthy',
+        'chatbot': 'initialized',
+        'neo4j': neo4j_status,
+        'vector_store': get_vector_store_status(bot),
+        'timestamp': str(os.getpid())
+    }, 200
 
 @app.route('/chat', methods=['POST'])
 def chat():
@@ -80,6 +307,44 @@ def chat():
         logger.error(f"❌ Error processing chat request: {e}")
         return jsonify({"error": "An error occurred while processing your request", "details": str(e)}), 500
 
+@app.route('/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Stream a chat response as server-sent events: a "sources" event first,
+    then "text" events as the answer is generated, then a "metadata" event
+    """
+    data = request.json or {}
+    query = data.get('query')
+    user_id = data.get('user_id', 'api_user')
+    
+    if not query:
+        return jsonify({"error": "Query parameter is required"}), 400
+    
+    # Get or initialize chatbot
+    try:
+        chatbot = get_chatbot()
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize chatbot: {e}")
+        return jsonify({"error": "Failed to initialize chatbot", "details": str(e)}), 500
+    
+    logger.info(f"Processing streaming chat request: {query}")
+    
+    def generate():
+        try:
+            for event, payload in chatbot.chat_stream(query, user_id):
+                yield format_sse(event, payload)
+        except Exception as stream_error:
+            logger.error(f"❌ Chat streaming error: {stream_error}")
+            fallback_response = "I apologize, but I'm experiencing some technical difficulties. Please try again later."
+            yield format_sse("text", {"text": fallback_response})
+            yield format_sse("metadata", {"status": "fallback", "error": str(stream_error)})
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Stop reverse proxies (nginx, Render) from buffering the stream
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/system-info', methods=['GET'])
 def system_info():
     """
@@ -102,75 +367,78 @@ def system_info():
 
 @app.route('/health')
 def health_check():
-    """Health check endpoint for monitoring"""
-    try:
-        # Check if chatbot can be initialized
-        bot = get_chatbot()
-        
-        # Check Neo4j connection
-        neo4j_status = "unknown"
-        try:
-            if hasattr(bot, 'driver') and bot.driver:
-                with bot.driver.session() as session:
-                    session.run("RETURN 1")
-                neo4j_status = "connected"
-        except Exception:
-            neo4j_status = "disconnected"
-        
-        # Check vector store
-        vector_store_status = "unknown"
-        try:
-            if hasattr(bot, 'vector_store') and bot.vector_store:
-                vector_store_status = "loaded"
-            elif os.path.exists('enhanced_vector_store'):
-                vector_store_status = "available"
-            else:
-                vector_store_status = "missing"
-        except Exception:
-            vector_store_status = "error"
-        
-        return jsonify({
-            'status': 'healthy',
-            'chatbot': 'initialized',
-            'neo4j': neo4j_status,
-            'vector_store': vector_store_status,
-            'timestamp': str(os.getpid())
-        }), 200
-        
-    except Exception as e:
-        return jsonify({
-            'status': 'unhealthy',
-            'error': str(e),
-            'timestamp': str(os.getpid())
-        }), 500
+    """Health check endpoint for monitoring (initializes the chatbot if needed)"""
+    payload, status = get_health_report()
+    return jsonify(payload), status
+
+@app.route('/livez', methods=['GET'])
+def liveness_check():
+    """Liveness probe"""
+    payload, status = get_liveness()
+    return jsonify(payload), status
+
+@app.route('/readyz', methods=['GET'])
+def readiness_check():
+    """Readiness probe: never triggers initialization or a database round trip"""
+    payload, status = get_readiness()
+    return jsonify(payload), status
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(render_metrics(), mimetype=METRICS_CONTENT_TYPE)
 
 @app.route('/', methods=['GET'])
 def index():
     """
     API root endpoint
     """
-    return jsonify({
-        "name": "MOSDAC + ISRO Chatbot API",
-        "version": "1.0.0",
-        "endpoints": [
-            {
-                "path": "/chat",
-                "method": "POST",
-                "description": "Chat with the MOSDAC + ISRO bot",
-                "parameters": ["query", "user_id (optional)"]
-            },
-            {
-                "path": "/system-info",
-                "method": "GET",
-                "description": "Get system information"
-            },
-            {
-                "path": "/health",
-                "method": "GET",
-                "description": "Health check endpoint"
-            }
-        ]
-    })
+    return jsonify(API_INFO)
+
+class _TrackedBody:
+    """Response body wrapper whose close() (called by the server after the last byte) ends the request"""
+    def __init__(self, body, on_close):
+        self.body = body
+        self.on_close = on_close
+
+    def __iter__(self):
+        return iter(self.body)
+
+    def close(self):
+        try:
+            if hasattr(self.body, 'close'):
+                self.body.close()
+        finally:
+            self.on_close()
+
+class MetricsMiddleware:
+    """In-flight gauge and request counter per route, covering the whole streamed body"""
+    def __init__(self, wsgi_app, endpoints):
+        self.wsgi_app = wsgi_app
+        self.endpoints = set(endpoints)
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        endpoint = path if path in self.endpoints else "unmatched"
+        status = {"code": 500}
+
+        def start_response_with_status(status_line, headers, exc_info=None):
+            status["code"] = int(status_line.split(" ", 1)[0])
+            return start_response(status_line, headers, exc_info)
+
+        def finish():
+            IN_FLIGHT.dec(endpoint=endpoint)
+            HTTP_REQUESTS.inc(endpoint=endpoint, status=status["code"])
+
+        IN_FLIGHT.inc(endpoint=endpoint)
+        try:
+            body = self.wsgi_app(environ, start_response_with_status)
+        except Exception:
+            finish()
+            raise
+        return _TrackedBody(body, finish)
+
+app.wsgi_app = MetricsMiddleware(app.wsgi_app, [rule.rule for rule in app.url_map.iter_rules()])
 
 if __name__ == "__main__":
     # Change to the Backend directory to ensure correct relative paths
@@ -182,6 +450,14 @@ if __name__ == "__main__":
     host = os.getenv("API_HOST", "0.0.0.0")
     port = int(os.getenv("API_PORT", 5000))
     
+    # Load everything before accepting traffic. With the debug reloader this
+    # block runs in the file watcher and again in the serving child: only the
+    # child (WERKZEUG_RUN_MAIN set) warms up.
+    debug = True
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        warmup()
+        get_health_monitor()
+    
     # Run the app
     logger.info(f"Starting API server on {host}:{port}")
-    app.run(host=host, port=port, debug=True)
+    app.run(host=host, port=port, debug=debug)
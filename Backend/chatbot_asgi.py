@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+⚡ Async (ASGI) serving mode for the MOSDAC + ISRO Chatbot API
+Same routes and response contracts as chatbot_api.py, but requests wait on
+Neo4j (async driver) and Gemini (generate_content_async) without holding a
+thread, so one worker can keep hundreds of chats in flight.
+
+Run with:
+    gunicorn -k uvicorn.workers.UvicornWorker --workers 1 chatbot_asgi:app
+or:
+    uvicorn chatbot_asgi:app --host 0.0.0.0 --port 5000
+"""
+
+import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+import chatbot_api
+from chatbot_api import (ALLOWED_ORIGINS, API_INFO, get_chatbot, get_health_monitor, get_health_report,
+                         get_liveness, get_readiness, warmup)
+from response_streaming import format_sse
+from metrics import render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE, HTTP_REQUESTS, IN_FLIGHT
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Created lazily so it binds to the server's event loop, not the import-time one
+_init_lock = None
+
+
+async def get_chatbot_async():
+    """
+    Shared chatbot instance; the (blocking) first initialization runs in a
+    worker thread so the event loop keeps serving other requests
+    """
+    global _init_lock
+    if chatbot_api.chatbot is not None:
+        return chatbot_api.chatbot
+    if _init_lock is None:
+        _init_lock = asyncio.Lock()
+    async with _init_lock:
+        return await run_in_threadpool(get_chatbot)
+
+
+async def read_json(request):
+    """
+    Request body parsed like Flask's request.json in chatbot_api.py: 415 for a
+    non-JSON content type, 400 for malformed JSON (raised as HTTPException,
+    which /chat turns into its 500 error response, as Flask does)
+    """
+    mimetype = request.headers.get('content-type', '').split(';')[0].strip().lower()
+    if mimetype != 'application/json' and not (mimetype.startswith('application/') and mimetype.endswith('+json')):
+        raise HTTPException(415, "Did not attempt to load JSON data because the request "
+                                 "Content-Type was not 'application/json'.")
+    try:
+        return await request.json()
+    except ValueError:
+        raise HTTPException(400, "Failed to decode JSON object")
+
+
+async def chat(request):
+    """
+    Handle chat requests
+    """
+    try:
+        # Get request data
+        data = await read_json(request)
+        query = data.get('query')
+        user_id = data.get('user_id', 'api_user')
+
+        if not query:
+            return JSONResponse({"error": "Query parameter is required"}, status_code=400)
+
+        # Get or initialize chatbot
+        try:
+            chatbot = await get_chatbot_async()
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize chatbot: {e}")
+            return JSONResponse({"error": "Failed to initialize chatbot", "details": str(e)}, status_code=500)
+
+        # Process query
+        logger.info(f"Processing chat request: {query}")
+        try:
+            response = await chatbot.achat(query, user_id)
+            logger.info("Chat response generated successfully")
+            return JSONResponse({"response": response})
+        except Exception as chat_error:
+            logger.error(f"❌ Chat processing error: {chat_error}")
+            # Return a fallback response instead of failing
+            fallback_response = "I apologize, but I'm experiencing some technical difficulties. Please try again later."
+            return JSONResponse({"response": fallback_response, "status": "fallback"})
+
+    except Exception as e:
+        logger.error(f"❌ Error processing chat request: {e}")
+        return JSONResponse({"error": "An error occurred while processing your request", "details": str(e)},
+                            status_code=500)
+
+
+async def chat_stream(request):
+    """
+    Stream a chat response as server-sent events (same events as chatbot_api.py)
+    """
+    data = await read_json(request) or {}
+    query = data.get('query')
+    user_id = data.get('user_id', 'api_user')
+
+    if not query:
+        return JSONResponse({"error": "Query parameter is required"}, status_code=400)
+
+    try:
+        chatbot = await get_chatbot_async()
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize chatbot: {e}")
+        return JSONResponse({"error": "Failed to initialize chatbot", "details": str(e)}, status_code=500)
+
+    logger.info(f"Processing streaming chat request: {query}")
+
+    async def generate():
+        try:
+            async for event, payload in chatbot.achat_stream(query, user_id):
+                yield format_sse(event, payload)
+        except Exception as stream_error:
+            logger.error(f"❌ Chat streaming error: {stream_error}")
+            fallback_response = "I apologize, but I'm experiencing some technical difficulties. Please try again later."
+            yield format_sse("text", {"text": fallback_response})
+            yield format_sse("metadata", {"status": "fallback", "error": str(stream_error)})
+
+    return StreamingResponse(generate(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+async def system_info(request):
+    """
+    Get system information
+    """
+    try:
+        # Get or initialize chatbot
+        try:
+            chatbot = await get_chatbot_async()
+        except Exception as e:
+            logger.error(f"❌ Failed to initialize chatbot: {e}")
+            return JSONResponse({"error": "Failed to initialize chatbot", "details": str(e)}, status_code=500)
+
+        # Reads the data version (file stat / Neo4j), so keep it off the event loop
+        info = await run_in_threadpool(chatbot.get_system_info)
+        return JSONResponse(info)
+
+    except Exception as e:
+        logger.error(f"❌ Error getting system info: {e}")
+        return JSONResponse({"error": "An error occurred while getting system info", "details": str(e)},
+                            status_code=500)
+
+
+async def health_check(request):
+    """Health check endpoint for monitoring (may initialize the chatbot, so off the event loop)"""
+    payload, status = await run_in_threadpool(get_health_report)
+    return JSONResponse(payload, status_code=status)
+
+
+async def liveness_check(request):
+    """Liveness probe"""
+    payload, status = get_liveness()
+    return JSONResponse(payload, status_code=status)
+
+
+async def readiness_check(request):
+    """Readiness probe: never triggers initialization or a database round trip"""
+    payload, status = get_readiness()
+    return JSONResponse(payload, status_code=status)
+
+
+async def metrics(request):
+    """Prometheus scrape endpoint"""
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+
+class MetricsMiddleware:
+    """In-flight gauge and request counter per route (covers the whole streamed body)"""
+    def __init__(self, app, endpoints):
+        self.app = app
+        self.endpoints = set(endpoints)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        endpoint = scope["path"] if scope["path"] in self.endpoints else "unmatched"
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc(endpoint=endpoint)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            IN_FLIGHT.dec(endpoint=endpoint)
+            HTTP_REQUESTS.inc(endpoint=endpoint, status=status["code"])
+
+
+async def index(request):
+    """
+    API root endpoint
+    """
+    return JSONResponse(API_INFO)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Warm up before serving unless gunicorn already did it pre-fork
+    if chatbot_api.chatbot is None:
+        await run_in_threadpool(warmup)
+    get_health_monitor()
+    yield
+    # Close the async Neo4j driver inside the loop that created it
+    chatbot = chatbot_api.chatbot
+    if chatbot is not None and hasattr(chatbot, 'aclose'):
+        await chatbot.aclose()
+
+
+routes = [
+    Route('/chat', chat, methods=['POST']),
+    Route('/chat/stream', chat_stream, methods=['POST']),
+    Route('/system-info', system_info, methods=['GET']),
+    Route('/health', health_check, methods=['GET']),
+    Route('/livez', liveness_check, methods=['GET']),
+    Route('/readyz', readiness_check, methods=['GET']),
+    Route('/metrics', metrics, methods=['GET']),
+    Route('/', index, methods=['GET'])
+]
+
+app = Starlette(
+    routes=routes,
+    middleware=[
+        Middleware(MetricsMiddleware, endpoints=[route.path for route in routes]),
+        Middleware(CORSMiddleware, allow_origins=ALLOWED_ORIGINS, allow_credentials=True,
+                   allow_methods=["*"], allow_headers=["*"])
+    ],
+    lifespan=lifespan
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Change to the Backend directory to ensure correct relative paths
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(backend_dir)
+
+    host = os.getenv("API_HOST", "0.0.0.0")
+    port = int(os.getenv("API_PORT", 5000))
+
+    logger.info(f"Starting async API server on {host}:{port}")
+    uvicorn.run(app, host=host, port=port)
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+🔑 Chunk ID Map
+Binary, mmap-able chunk_id <-> FAISS row mapping that replaces the chunk_ids
+list in index_info.json. Both directions are O(1):
+  - row -> id: offsets table + UTF-8 blob
+  - id -> row: open-addressing hash table (64-bit blake2b keys, linear probing)
+Incremental indexes (IndexIDMap2 keyed by content hash) also store each row's
+FAISS label plus a label -> row table, so search results can be mapped back.
+The map carries the same index_version as the FAISS index it belongs to.
+"""
+
+import os
+import sys
+import json
+import mmap
+import uuid
+import hashlib
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ID_MAP_HEADER = "chunk_id_map.json"
+ID_MAP_BLOB = "chunk_ids.bin"
+ID_MAP_OFFSETS = "chunk_ids_offsets.npy"
+ID_MAP_SLOTS = "chunk_ids_slots.npy"
+ID_MAP_SLOT_KEYS = "chunk_ids_slot_keys.npy"
+ID_MAP_LABELS = "chunk_labels.npy"
+ID_MAP_LABEL_SLOTS = "chunk_labels_slots.npy"
+ID_MAP_FORMAT_VERSION = 1
+
+EMPTY_SLOT = -1
+
+
+class IndexVersionMismatch(Exception):
+    """Raised when an id map does not belong to the FAISS index it is loaded with"""
+    pass
+
+
+def new_index_version() -> str:
+    """Version tag shared by a FAISS index and its id map"""
+    return f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def _hash_id(chunk_id: str) -> int:
+    """Stable 64-bit hash (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(chunk_id.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def content_label(chunk: Dict[str, Any]) -> int:
+    """
+    Stable, non-negative int64 FAISS label for a chunk, derived from its source
+    and content so unchanged chunks keep their label across crawls
+    """
+    key = f"{chunk.get('source_file', '')}\0{chunk['content']}".encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little') & 0x7FFFFFFFFFFFFFFF
+
+
+def suffix_duplicate_ids(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Make chunk ids unique so they can go into an id map: the second and later
+    occurrences of an id become "<id>#2", "<id>#3", ... (renamed chunks are
+    copies; the input dicts are not modified)
+    """
+    seen = {chunk['id'] for chunk in chunks}
+    counts = {}
+    unique, renamed = [], 0
+    for chunk in chunks:
+        chunk_id = chunk['id']
+        occurrence = counts.get(chunk_id, 0) + 1
+        counts[chunk_id] = occurrence
+        if occurrence > 1:
+            new_id = f"{chunk_id}#{occurrence}"
+            while new_id in seen:
+                occurrence += 1
+                new_id = f"{chunk_id}#{occurrence}"
+            counts[chunk_id] = occurrence
+            seen.add(new_id)
+            chunk = dict(chunk, id=new_id)
+            renamed += 1
+        unique.append(chunk)
+
+    if renamed:
+        logger.warning(f"⚠️ Renamed {renamed} chunks with duplicate ids (suffixed with #n)")
+    return unique
+
+
+def _mix_label(label: int) -> int:
+    """Spread label bits before masking (labels may share low bits)"""
+    return ((label * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 1
+
+
+def _table_size(num_ids: int) -> int:
+    """Power of two with load factor <= 0.5"""
+    size = 1
+    while size < max(2 * num_ids, 2):
+        size <<= 1
+    return size
+
+
+def write_chunk_id_map(chunk_ids: List[str], output_dir: str, index_version: str,
+                       labels: Optional[List[int]] = None) -> Dict[str, Any]:
+    """
+    Write the id map for chunk_ids (position == FAISS row) and return its header.
+    labels, if given, are the FAISS ids of each row (IndexIDMap2 stores).
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    # row -> id
+    offsets = np.zeros(len(chunk_ids) + 1, dtype=np.uint64)
+    with open(output_path / ID_MAP_BLOB, 'wb') as f:
+        for row, chunk_id in enumerate(chunk_ids):
+            data = chunk_id.encode('utf-8')
+            f.write(data)
+            offsets[row + 1] = offsets[row] + len(data)
+    np.save(output_path / ID_MAP_OFFSETS, offsets)
+
+    # id -> row
+    table_size = _table_size(len(chunk_ids))
+    mask = table_size - 1
+    slots = np.full(table_size, EMPTY_SLOT, dtype=np.int64)
+    slot_keys = np.zeros(table_size, dtype=np.uint64)
+    seen = set()
+    for row, chunk_id in enumerate(chunk_ids):
+        if chunk_id in seen:
+            raise ValueError(f"Duplicate chunk id: {chunk_id}")
+        seen.add(chunk_id)
+        key = _hash_id(chunk_id)
+        slot = key & mask
+        while slots[slot] != EMPTY_SLOT:
+            slot = (slot + 1) & mask
+        slots[slot] = row
+        slot_keys[slot] = key
+    np.save(output_path / ID_MAP_SLOTS, slots)
+    np.save(output_path / ID_MAP_SLOT_KEYS, slot_keys)
+
+    # label -> row
+    if labels is not None:
+        if len(labels) != len(chunk_ids):
+            raise ValueError("labels must have one entry per chunk id")
+        label_array = np.asarray(labels, dtype=np.int64)
+        label_slots = np.full(table_size, EMPTY_SLOT, dtype=np.int64)
+        for row, label in enumerate(labels):
+            slot = _mix_label(int(label)) & mask
+            while label_slots[slot] != EMPTY_SLOT:
+                if label_array[label_slots[slot]] == label:
+                    raise ValueError(f"Duplicate label: {label}")
+                slot = (slot + 1) & mask
+            label_slots[slot] = row
+        np.save(output_path / ID_MAP_LABELS, label_array)
+        np.save(output_path / ID_MAP_LABEL_SLOTS, label_slots)
+
+    header = {
+        "format_version": ID_MAP_FORMAT_VERSION,
+        "index_version": index_version,
+        "num_ids": len(chunk_ids),
+        "table_size": table_size,
+        "has_labels": labels is not None
+    }
+    with open(output_path / ID_MAP_HEADER, 'w', encoding='utf-8') as f:
+        json.dump(header, f)
+
+    logger.info(f"✅ Saved chunk id map ({len(chunk_ids)} ids) to: {output_path / ID_MAP_HEADER}")
+    return header
+
+
+def chunk_id_map_exists(directory: str) -> bool:
+    """Check whether an id map has been written to the directory"""
+    return (Path(directory) / ID_MAP_HEADER).exists()
+
+
+class ChunkIdMap:
+    def __init__(self, directory: str, expected_version: Optional[str] = None):
+        """
+        Open an id map read-only via mmap. If expected_version is given (the
+        index_version from index_info.json) a mismatch raises IndexVersionMismatch.
+        """
+        path = Path(directory)
+        with open(path / ID_MAP_HEADER, 'r', encoding='utf-8') as f:
+            self.header = json.load(f)
+
+        if self.header.get("format_version") != ID_MAP_FORMAT_VERSION:
+            raise ValueError(f"Unsupported id map format: {self.header.get('format_version')}")
+        if expected_version is not None and self.header["index_version"] != expected_version:
+            raise IndexVersionMismatch(
+                f"id map version {self.header['index_version']} does not match index version {expected_version}"
+            )
+
+        self.index_version = self.header["index_version"]
+        self.num_ids = self.header["num_ids"]
+        self._offsets = np.load(path / ID_MAP_OFFSETS, mmap_mode='r')
+        self._slots = np.load(path / ID_MAP_SLOTS, mmap_mode='r')
+        self._slot_keys = np.load(path / ID_MAP_SLOT_KEYS, mmap_mode='r')
+        self._mask = self.header["table_size"] - 1
+
+        self.has_labels = self.header.get("has_labels", False)
+        if self.has_labels:
+            self._labels = np.load(path / ID_MAP_LABELS, mmap_mode='r')
+            self._label_slots = np.load(path / ID_MAP_LABEL_SLOTS, mmap_mode='r')
+
+        blob_path = path / ID_MAP_BLOB
+        if os.path.getsize(blob_path) > 0:
+            with open(blob_path, 'rb') as f:
+                self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._blob = b""
+
+    def __len__(self) -> int:
+        return self.num_ids
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return self.row_for_id(chunk_id) is not None
+
+    def id_for_row(self, row: int) -> str:
+        """FAISS row -> chunk id"""
+        row = int(row)
+        if row < 0 or row >= self.num_ids:
+            raise IndexError(f"row {row} out of range")
+        start, end = int(self._offsets[row]), int(self._offsets[row + 1])
+        return self._blob[start:end].decode('utf-8')
+
+    def row_for_id(self, chunk_id: str) -> Optional[int]:
+        """Chunk id -> FAISS row, or None if the id is not in the index"""
+        key = _hash_id(chunk_id)
+        slot = key & self._mask
+        while True:
+            row = int(self._slots[slot])
+            if row == EMPTY_SLOT:
+                return None
+            # Cheap 64-bit key check first, then confirm against the stored id
+            if int(self._slot_keys[slot]) == key and self.id_for_row(row) == chunk_id:
+                return row
+            slot = (slot + 1) & self._mask
+
+    def rows_for_ids(self, chunk_ids: Iterable[str]) -> List[Optional[int]]:
+        """Batched id -> row lookup"""
+        return [self.row_for_id(chunk_id) for chunk_id in chunk_ids]
+
+    def label_for_row(self, row: int) -> int:
+        """FAISS row -> FAISS label (identity for plain, row-addressed indexes)"""
+        if not self.has_labels:
+            return int(row)
+        return int(self._labels[row])
+
+    def row_for_label(self, label: int) -> Optional[int]:
+        """FAISS label (as returned by index.search) -> row, or None"""
+        label = int(label)
+        if label < 0:
+            return None
+        if not self.has_labels:
+            return label if label < self.num_ids else None
+        slot = _mix_label(label) & self._mask
+        while True:
+            row = int(self._label_slots[slot])
+            if row == EMPTY_SLOT:
+                return None
+            if int(self._labels[row]) == label:
+                return row
+            slot = (slot + 1) & self._mask
+
+    def rows_for_labels(self, labels: Iterable[int]) -> List[Optional[int]]:
+        """Batched label -> row lookup (e.g. one row of index.search output)"""
+        return [self.row_for_label(label) for label in labels]
+
+    def labels(self) -> np.ndarray:
+        """All FAISS labels in row order"""
+        if not self.has_labels:
+            return np.arange(self.num_ids, dtype=np.int64)
+        return np.asarray(self._labels)
+
+    def ids(self) -> List[str]:
+        """All ids in row order"""
+        return [self.id_for_row(row) for row in range(self.num_ids)]
+
+    def close(self):
+        """Release the mapping"""
+        if isinstance(self._blob, mmap.mmap):
+            self._blob.close()
+
+
+def migrate_index_info(vector_store_dir: str):
+    """
+    Move a legacy chunk_ids list out of index_info.json into a binary id map
+    and rewrite index_info.json as a small manifest
+    """
+    path = Path(vector_store_dir)
+    info_path = path / "index_info.json"
+    with open(info_path, 'r', encoding='utf-8') as f:
+        index_info = json.load(f)
+
+    if "chunk_ids" not in index_info:
+        logger.info("ℹ️ index_info.json has no chunk_ids list - nothing to migrate")
+        return index_info
+
+    index_version = index_info.get("index_version") or new_index_version()
+    write_chunk_id_map(index_info.pop("chunk_ids"), str(path), index_version)
+    index_info["index_version"] = index_version
+    index_info["id_map"] = ID_MAP_HEADER
+
+    with open(info_path, 'w', encoding='utf-8') as f:
+        json.dump(index_info, f, indent=2, ensure_ascii=False)
+
+    logger.info(f"✅ Migrated index_info.json to manifest (version {index_version})")
+    return index_info
+
+
+def main():
+    """
+    Usage: python chunk_id_map.py migrate [vector_store_dir]
+    """
+    command = sys.argv[1] if len(sys.argv) > 1 else "migrate"
+    vector_store_dir = sys.argv[2] if len(sys.argv) > 2 else "enhanced_vector_store"
+
+    if command == "migrate":
+        migrate_index_info(vector_store_dir)
+    else:
+        print(main.__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+🗂️ Columnar Chunk Store
+Compact, memory-mapped replacement for chunks_metadata.json. Each field is
+stored as its own column:
+  - free text (id, content) as an offsets table + UTF-8 blob + null bitmap
+  - repeated strings (source_file, source_type, ...) dictionary-encoded as int32 ids
+  - integers (chunk_index, chunk_size, ...) as int64 arrays
+Rows are addressed by FAISS row id and only decoded when accessed, so gunicorn
+workers share pages through the OS page cache and a query decodes just its top-k.
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import shutil
+import logging
+import tracemalloc
+from array import array
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CHUNK_STORE_MANIFEST = "chunks_manifest.json"
+LEGACY_CHUNKS_FILE = "chunks_metadata.json"
+CHUNK_STORE_FORMAT_VERSION = 2
+
+# Column layout. Dotted names live under the chunk's "metadata" dict.
+STRING_COLUMNS = ("id", "content")
+DICTIONARY_COLUMNS = ("source_file", "source_type", "timestamp", "metadata.file_type", "metadata.file_path")
+INTEGER_COLUMNS = ("chunk_index", "chunk_size", "metadata.total_chunks")
+
+# Anything outside the schema is kept per row as compact JSON
+EXTRA_COLUMN = "extra"
+
+MISSING_ID = -1
+MISSING_INT = np.iinfo(np.int64).min
+
+_MISSING = object()
+
+
+def _column_file(name: str, suffix: str) -> str:
+    return f"chunks_{name.replace('.', '_')}{suffix}"
+
+
+def _pop_path(chunk: Dict[str, Any], column: str):
+    """Remove and return a (possibly dotted) field, or _MISSING"""
+    if "." in column:
+        parent, child = column.split(".", 1)
+        nested = chunk.get(parent)
+        if not isinstance(nested, dict) or child not in nested:
+            return _MISSING
+        return nested.pop(child)
+    return chunk.pop(column, _MISSING)
+
+
+def _set_path(chunk: Dict[str, Any], column: str, value):
+    if "." in column:
+        parent, child = column.split(".", 1)
+        chunk.setdefault(parent, {})[child] = value
+    else:
+        chunk[column] = value
+
+
+class _BlobColumnWriter:
+    """Streams strings into a blob file while tracking their offsets and which rows are None"""
+
+    def __init__(self, directory: Path, name: str):
+        self.directory = directory
+        self.name = name
+        self.offsets = array('Q', [0])
+        self.nulls = array('B')
+        self.file = open(directory / _column_file(name, ".bin"), 'wb')
+
+    def append(self, value: Optional[str]):
+        data = value.encode('utf-8') if value is not None else b""
+        self.file.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+        self.nulls.append(value is None)
+
+    def close(self):
+        self.file.close()
+        np.save(self.directory / _column_file(self.name, "_offsets.npy"), np.frombuffer(self.offsets, dtype=np.uint64))
+        np.save(self.directory / _column_file(self.name, "_nulls.npy"),
+                np.packbits(np.frombuffer(self.nulls, dtype=np.uint8)))
+
+
+class ChunkStoreWriter:
+    def __init__(self, output_dir: str):
+        """
+        Streaming writer: append() chunks one at a time, close() writes the manifest
+        """
+        self.output_path = Path(output_dir)
+        self.output_path.mkdir(parents=True, exist_ok=True)
+
+        self.num_rows = 0
+        self.string_columns = {name: _BlobColumnWriter(self.output_path, name) for name in STRING_COLUMNS}
+        self.extra_column = _BlobColumnWriter(self.output_path, EXTRA_COLUMN)
+        self.dictionaries = {name: {} for name in DICTIONARY_COLUMNS}
+        self.dictionary_ids = {name: array('i') for name in DICTIONARY_COLUMNS}
+        self.integer_columns = {name: array('q') for name in INTEGER_COLUMNS}
+
+    def append(self, chunk: Dict[str, Any]):
+        """Add one chunk as the next row"""
+        # Work on a copy; whatever is left over after popping the schema is "extra"
+        remaining = dict(chunk)
+        if isinstance(remaining.get("metadata"), dict):
+            remaining["metadata"] = dict(remaining["metadata"])
+
+        for name in STRING_COLUMNS:
+            value = _pop_path(remaining, name)
+            if value is not _MISSING and not isinstance(value, str):
+                _set_path(remaining, name, value)
+                value = None
+            self.string_columns[name].append(None if value is _MISSING else value)
+
+        for name in DICTIONARY_COLUMNS:
+            value = _pop_path(remaining, name)
+            if value is _MISSING or not isinstance(value, str):
+                if value is not _MISSING:
+                    _set_path(remaining, name, value)
+                self.dictionary_ids[name].append(MISSING_ID)
+                continue
+            dictionary = self.dictionaries[name]
+            if value not in dictionary:
+                dictionary[value] = len(dictionary)
+            self.dictionary_ids[name].append(dictionary[value])
+
+        for name in INTEGER_COLUMNS:
+            value = _pop_path(remaining, name)
+            if value is _MISSING or isinstance(value, bool) or not isinstance(value, int):
+                if value is not _MISSING:
+                    _set_path(remaining, name, value)
+                self.integer_columns[name].append(MISSING_INT)
+                continue
+            self.integer_columns[name].append(value)
+
+        # "metadata" is rebuilt from its columns on read
+        if remaining.get("metadata") == {}:
+            remaining.pop("metadata")
+        self.extra_column.append(json.dumps(remaining, ensure_ascii=False, separators=(',', ':')) if remaining else None)
+
+        self.num_rows += 1
+
+    def close(self) -> int:
+        """Flush all columns and write the manifest"""
+        for writer in self.string_columns.values():
+            writer.close()
+        self.extra_column.close()
+        for name, ids in self.dictionary_ids.items():
+            np.save(self.output_path / _column_file(name, "_ids.npy"), np.frombuffer(ids, dtype=np.int32))
+        for name, values in self.integer_columns.items():
+            np.save(self.output_path / _column_file(name, ".npy"), np.frombuffer(values, dtype=np.int64))
+
+        manifest = {
+            "format_version": CHUNK_STORE_FORMAT_VERSION,
+            "num_rows": self.num_rows,
+            "string_columns": list(STRING_COLUMNS),
+            "dictionary_columns": list(DICTIONARY_COLUMNS),
+            "integer_columns": list(INTEGER_COLUMNS),
+            "dictionaries": {name: list(values) for name, values in self.dictionaries.items()}
+        }
+        with open(self.output_path / CHUNK_STORE_MANIFEST, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+
+        logger.info(f"✅ Saved {self.num_rows} chunks to columnar store: {self.output_path}")
+        return self.num_rows
+
+
+def write_chunk_store(chunks: Iterable[Dict[str, Any]], output_dir: str) -> int:
+    """Write all chunks to a columnar store in output_dir"""
+    writer = ChunkStoreWriter(output_dir)
+    for chunk in chunks:
+        writer.append(chunk)
+    return writer.close()
+
+
+def chunk_store_exists(directory: str) -> bool:
+    """Check whether a columnar chunk store has been written to the directory"""
+    return (Path(directory) / CHUNK_STORE_MANIFEST).exists()
+
+
+def chunk_store_is_current(directory: str) -> bool:
+    """
+    True when the columnar store exists and is at least as new as any legacy
+    chunks_metadata.json next to it (i.e. there is nothing to convert)
+    """
+    path = Path(directory)
+    if not chunk_store_exists(directory):
+        return False
+    json_path = path / LEGACY_CHUNKS_FILE
+    return not json_path.exists() or json_path.stat().st_mtime <= (path / CHUNK_STORE_MANIFEST).stat().st_mtime
+
+
+def default_export_path(vector_store_dir: str) -> Path:
+    """
+    Where JSON exports go by default: next to the store, not inside it, so an
+    export is never mistaken for (or converted back as) the legacy metadata
+    """
+    path = Path(vector_store_dir)
+    return path.with_name(f"{path.name}_{LEGACY_CHUNKS_FILE}")
+
+
+class _BlobColumn:
+    """Read-only view of an offsets + UTF-8 blob column"""
+
+    def __init__(self, directory: Path, name: str):
+        self.offsets = np.load(directory / _column_file(name, "_offsets.npy"), mmap_mode='r')
+        # Stores written before the null bitmap existed treat every empty value as missing
+        nulls_path = directory / _column_file(name, "_nulls.npy")
+        self.nulls = np.load(nulls_path, mmap_mode='r') if nulls_path.exists() else None
+        blob_path = directory / _column_file(name, ".bin")
+        if os.path.getsize(blob_path) > 0:
+            with open(blob_path, 'rb') as f:
+                self.blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.blob = b""
+
+    def get(self, idx: int) -> Optional[str]:
+        start, end = int(self.offsets[idx]), int(self.offsets[idx + 1])
+        if self.nulls is not None:
+            if (int(self.nulls[idx >> 3]) >> (7 - (idx & 7))) & 1:
+                return None
+        elif start == end:
+            return None
+        return self.blob[start:end].decode('utf-8')
+
+    def close(self):
+        if isinstance(self.blob, mmap.mmap):
+            self.blob.close()
+
+
+class ChunkStore:
+    def __init__(self, directory: str):
+        """
+        Open a columnar chunk store read-only; column data is mmap-ed, not loaded
+        """
+        path = Path(directory)
+        with open(path / CHUNK_STORE_MANIFEST, 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+
+        if self.manifest.get("format_version") != CHUNK_STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported chunk store format: {self.manifest.get('format_version')}")
+
+        self.num_rows = self.manifest["num_rows"]
+        self.dictionaries = self.manifest["dictionaries"]
+        self.string_columns = {name: _BlobColumn(path, name) for name in self.manifest["string_columns"]}
+        self.extra_column = _BlobColumn(path, EXTRA_COLUMN)
+        self.dictionary_ids = {
+            name: np.load(path / _column_file(name, "_ids.npy"), mmap_mode='r')
+            for name in self.manifest["dictionary_columns"]
+        }
+        self.integer_columns = {
+            name: np.load(path / _column_file(name, ".npy"), mmap_mode='r')
+            for name in self.manifest["integer_columns"]
+        }
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def _check_index(self, idx: int) -> int:
+        idx = int(idx)
+        if idx < 0:
+            idx += self.num_rows
+        if idx < 0 or idx >= self.num_rows:
+            raise IndexError(f"chunk index {idx} out of range")
+        return idx
+
+    def get_field(self, idx: int, column: str):
+        """Random access to a single field of a row (no full-row decode)"""
+        idx = self._check_index(idx)
+        if column in self.string_columns:
+            return self.string_columns[column].get(idx)
+        if column in self.dictionary_ids:
+            value_id = int(self.dictionary_ids[column][idx])
+            return None if value_id == MISSING_ID else self.dictionaries[column][value_id]
+        if column in self.integer_columns:
+            value = int(self.integer_columns[column][idx])
+            return None if value == MISSING_INT else value
+        raise KeyError(f"Unknown column: {column}")
+
+    def __getitem__(self, idx: int) -> Dict[str, Any]:
+        """Reassemble a row as the same dict shape chunks_metadata.json used"""
+        idx = self._check_index(idx)
+        chunk = {}
+
+        for name, column in self.string_columns.items():
+            value = column.get(idx)
+            if value is not None:
+                _set_path(chunk, name, value)
+
+        for name, ids in self.dictionary_ids.items():
+            value_id = int(ids[idx])
+            if value_id != MISSING_ID:
+                _set_path(chunk, name, self.dictionaries[name][value_id])
+
+        for name, values in self.integer_columns.items():
+            value = int(values[idx])
+            if value != MISSING_INT:
+                _set_path(chunk, name, value)
+
+        extra = self.extra_column.get(idx)
+        if extra:
+            for key, value in json.loads(extra).items():
+                if isinstance(value, dict) and isinstance(chunk.get(key), dict):
+                    chunk[key].update(value)
+                else:
+                    chunk[key] = value
+
+        return chunk
+
+    def __iter__(self):
+        for idx in range(self.num_rows):
+            yield self[idx]
+
+    def get_many(self, indices: Iterable[int]) -> List[Dict[str, Any]]:
+        """Decode only the requested rows (e.g. FAISS top-k hits)"""
+        return [self[idx] for idx in indices]
+
+    def export_json(self, output_file: str):
+        """Write the store back out as a pretty-printed JSON list, for debugging"""
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write("[\n")
+            for idx in range(self.num_rows):
+                if idx:
+                    f.write(",\n")
+                f.write(json.dumps(self[idx], indent=2, ensure_ascii=False))
+            f.write("\n]\n")
+        logger.info(f"✅ Exported {self.num_rows} chunks to: {output_file}")
+
+    def close(self):
+        """Release the mappings"""
+        for column in self.string_columns.values():
+            column.close()
+        self.extra_column.close()
+
+
+def benchmark_against_json(vector_store_dir: str) -> Dict[str, Any]:
+    """
+    Compare load time, Python heap use and on-disk size of the columnar store
+    against json.load of chunks_metadata.json
+    """
+    path = Path(vector_store_dir)
+    json_path = path / LEGACY_CHUNKS_FILE
+    report = {}
+
+    if json_path.exists():
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(json_path, 'r', encoding='utf-8') as f:
+            chunks = json.load(f)
+        report["json"] = {
+            "load_seconds": round(time.perf_counter() - start, 4),
+            "heap_bytes": tracemalloc.get_traced_memory()[0],
+            "disk_bytes": json_path.stat().st_size,
+            "rows": len(chunks)
+        }
+        tracemalloc.stop()
+        del chunks
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = ChunkStore(str(path))
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    sample = [store[i] for i in range(0, len(store), max(1, len(store) // 100))]
+    report["columnar"] = {
+        "load_seconds": round(load_seconds, 4),
+        "heap_bytes": tracemalloc.get_traced_memory()[0],
+        "disk_bytes": sum(p.stat().st_size for p in path.glob("chunks_*") if p.is_file() and p != json_path),
+        "rows": len(store),
+        "random_access_us": round((time.perf_counter() - start) / max(len(sample), 1) * 1e6, 2)
+    }
+    tracemalloc.stop()
+    store.close()
+
+    for fmt, stats in report.items():
+        logger.info(f"  {fmt:9s} load={stats['load_seconds']}s heap={stats['heap_bytes'] / 1e6:.1f} MB "
+                    f"disk={stats['disk_bytes'] / 1e6:.1f} MB rows={stats['rows']}")
+    return report
+
+
+def convert_store(chunks: List[Dict[str, Any]], vector_store_dir: Path):
+    """
+    Write the columnar store into a new store version next to vector_store_dir,
+    together with the index files of the live version, then swap it in:
+    running readers keep the columns they have mapped instead of seeing them
+    rewritten underneath them.
+    """
+    # Imported here: vector_store_embedder imports this module
+    from vector_store_embedder import replace_directory
+    from chunk_id_map import new_index_version
+
+    live_dir = vector_store_dir.resolve()
+    staging_dir = vector_store_dir.with_name(f"{vector_store_dir.name}.tmp-{new_index_version()}")
+    staging_dir.mkdir()
+    try:
+        write_chunk_store(chunks, str(staging_dir))
+        for item in live_dir.iterdir():
+            if item.name.startswith("chunks_") and item.name != LEGACY_CHUNKS_FILE:
+                continue  # columnar files of the old store
+            if item.is_dir():
+                shutil.copytree(item, staging_dir / item.name)
+            else:
+                shutil.copy2(item, staging_dir / item.name)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    replace_directory(staging_dir, vector_store_dir)
+    logger.info(f"✅ Published converted chunk store: {vector_store_dir} -> {vector_store_dir.resolve().name}")
+
+
+def main():
+    """
+    Usage:
+      python chunk_store.py convert [vector_store_dir]          chunks_metadata.json -> columnar store (if newer)
+      python chunk_store.py export [vector_store_dir] [out]     columnar store -> JSON (debugging; default
+                                                                <vector_store_dir>_chunks_metadata.json)
+      python chunk_store.py benchmark [vector_store_dir]        load time / memory vs JSON
+    """
+    command = sys.argv[1] if len(sys.argv) > 1 else "convert"
+    vector_store_dir = Path(sys.argv[2] if len(sys.argv) > 2 else "enhanced_vector_store")
+
+    if command == "convert":
+        chunks_path = vector_store_dir / LEGACY_CHUNKS_FILE
+        if chunk_store_is_current(str(vector_store_dir)):
+            logger.info(f"✅ Columnar chunk store is up to date: {vector_store_dir}")
+            return
+        if not chunks_path.exists():
+            logger.error(f"❌ Chunks metadata not found: {chunks_path}")
+            return
+        with open(chunks_path, 'r', encoding='utf-8') as f:
+            chunks = json.load(f)
+        convert_store(chunks, vector_store_dir)
+
+    elif command == "export":
+        output_file = sys.argv[3] if len(sys.argv) > 3 else str(default_export_path(str(vector_store_dir)))
+        store = ChunkStore(str(vector_store_dir))
+        store.export_json(output_file)
+        store.close()
+
+    elif command == "benchmark":
+        report = benchmark_against_json(str(vector_store_dir))
+        print(json.dumps(report, indent=2))
+
+    else:
+        print(main.__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -113,21 +113,7 @@ class DataProcessor:
         from rag_chunker import RAGChunker
         chunker = RAGChunker()
         
-        new_chunks = []
-        for item in text_data:
-            try:
-                # Create a temporary file for chunking
-                temp_file = Path(f"temp_{item['source_file'].replace('/', '_')}.txt")
-                with open(temp_file, 'w', encoding='utf-8') as f:
-                    f.write(item['content'])
-                
-                chunks = chunker.chunk_text_file(temp_file)
-                new_chunks.extend(chunks)
-                
-                # Clean up temp file
-                temp_file.unlink()
-            except Exception as e:
-                logger.warning(f"Failed to chunk {item['source_file']}: {e}")
+        new_chunks = list(chunker.chunk_documents(text_data))
         
         # Combine existing and new chunks
         all_chunks = existing_chunks + new_chunks
@@ -144,13 +130,13 @@ class DataProcessor:
         logger.info("🔍 Updating vector store...")
         
         from vector_store_embedder import VectorStoreEmbedder
-        embedder = VectorStoreEmbedder()
+        embedder = VectorStoreEmbedder(incremental=True, embedding_cache_dir=f"{self.base_dir}/embedding_cache")
         
-        # Create new vector store
+        # Incrementally update the vector store (only new/changed chunks are embedded)
         vector_store_path = f"{self.base_dir}/final_vector_store"
-        embedder.create_vector_store(chunks, vector_store_path)
+        stats = embedder.update_index(chunks, vector_store_path)
         
-        logger.info("✅ Vector store updated!")
+        logger.info(f"✅ Vector store updated! {stats['added']} added, {stats['removed']} removed, {stats['reused']} reused")
     
     def update_neo4j_data(self, text_data):
         """Update Neo4j with new entities and relationships"""
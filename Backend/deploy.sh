@@ -19,6 +19,11 @@ pip install -r requirements.txt --no-cache-dir || echo "⚠️ Some dependencies
 echo "🔍 Setting up FAISS vector store..."
 python faiss_cloud_manager.py || echo "⚠️ Vector store setup failed, will create minimal structure"
 
+# Build the columnar chunk store from legacy chunks_metadata.json (skipped when the store is already newer)
+echo "🗂️ Building columnar chunk store..."
+python chunk_store.py convert enhanced_vector_store || echo "⚠️ Chunk store build failed, chatbot will read chunks_metadata.json"
+python chunk_id_map.py migrate enhanced_vector_store || echo "⚠️ Chunk id map migration failed, keeping legacy index_info.json"
+
 # Download essential models only
 echo "🤖 Downloading essential AI models..."
 python -c "
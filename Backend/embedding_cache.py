@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+💾 Persistent Embedding Cache
+Content-addressed cache of chunk embeddings for ingestion re-runs. Vectors are
+keyed by (model_name, hash of whitespace-normalized content) and stored in an
+append-only, mmap-backed file with a small index; least recently used entries
+are evicted once the cache exceeds its size cap.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+import unicodedata
+from pathlib import Path
+from typing import List, Tuple
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CACHE_VECTORS_FILE = "vectors.bin"
+CACHE_INDEX_FILE = "index.npy"
+CACHE_HEADER_FILE = "cache_info.json"
+
+KEY_BYTES = 16
+# Raw uint8 keys: numpy "S" strings would strip trailing NUL bytes of the digest
+INDEX_DTYPE = np.dtype([("key", np.uint8, (KEY_BYTES,)), ("slot", np.int64), ("last_used", np.int64)])
+
+
+def normalize_content(text: str) -> str:
+    """Normalization applied before hashing, so whitespace-only changes still hit"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    def __init__(self, cache_dir: str, model_name: str, dimension: int,
+                 dtype: str = "float32", max_entries: int = 500_000):
+        """
+        Open (or create) the cache for one embedding model under cache_dir
+        """
+        if dtype not in ("float32", "float16"):
+            raise ValueError("dtype must be float32 or float16")
+
+        self.model_name = model_name
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self.max_entries = max_entries
+        self.path = Path(cache_dir) / model_name.replace("/", "__")
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._entries = {}   # key -> [slot, last_used]
+        self._clock = 0
+        self._num_slots = 0
+        self._vectors = None
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+        self._load()
+
+    def _load(self):
+        """Load the index; discard the cache if it was written for another model/layout"""
+        header_path = self.path / CACHE_HEADER_FILE
+        header = {"model_name": self.model_name, "dimension": self.dimension, "dtype": self.dtype.name}
+
+        if header_path.exists():
+            with open(header_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored != header:
+                logger.warning(f"⚠️ Embedding cache layout changed ({stored} -> {header}), starting empty")
+                for name in (CACHE_VECTORS_FILE, CACHE_INDEX_FILE):
+                    (self.path / name).unlink(missing_ok=True)
+
+        with open(header_path, 'w', encoding='utf-8') as f:
+            json.dump(header, f)
+
+        vectors_path = self.path / CACHE_VECTORS_FILE
+        row_bytes = self.dimension * self.dtype.itemsize
+        self._num_slots = vectors_path.stat().st_size // row_bytes if vectors_path.exists() else 0
+
+        index_path = self.path / CACHE_INDEX_FILE
+        if index_path.exists():
+            for key, slot, last_used in np.load(index_path):
+                # Entries pointing past a truncated vectors file are dropped
+                if slot < self._num_slots:
+                    self._entries[key.tobytes()] = [int(slot), int(last_used)]
+                    self._clock = max(self._clock, int(last_used))
+
+        logger.info(f"💾 Embedding cache for {self.model_name}: {len(self._entries)} entries at {self.path}")
+
+    def _key(self, text: str) -> bytes:
+        payload = f"{self.model_name}\0{normalize_content(text)}".encode('utf-8')
+        return hashlib.blake2b(payload, digest_size=KEY_BYTES).digest()
+
+    def _map_vectors(self):
+        """(Re)map the vectors file after appends"""
+        if self._vectors is None or len(self._vectors) != self._num_slots:
+            if self._num_slots == 0:
+                self._vectors = np.empty((0, self.dimension), dtype=self.dtype)
+            else:
+                self._vectors = np.memmap(self.path / CACHE_VECTORS_FILE, dtype=self.dtype, mode='r',
+                                          shape=(self._num_slots, self.dimension))
+        return self._vectors
+
+    def get_many(self, texts: List[str]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Batched lookup. Returns a float32 (len(texts), dim) array filled for hits
+        and the positions of the misses, which the caller must encode and put_many().
+        """
+        result = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        misses = []
+        hit_positions, hit_slots = [], []
+
+        with self._lock:
+            for position, text in enumerate(texts):
+                entry = self._entries.get(self._key(text))
+                if entry is None:
+                    misses.append(position)
+                    continue
+                self._clock += 1
+                entry[1] = self._clock
+                hit_positions.append(position)
+                hit_slots.append(entry[0])
+
+            if hit_positions:
+                result[hit_positions] = self._map_vectors()[hit_slots]
+                self._dirty = True
+
+            self.hits += len(hit_positions)
+            self.misses += len(misses)
+
+        return result, misses
+
+    def put_many(self, texts: List[str], vectors: np.ndarray):
+        """Append new vectors to the cache (existing keys are left untouched)"""
+        vectors = np.asarray(vectors, dtype=self.dtype)
+
+        with self._lock:
+            new_rows = []
+            for text, vector in zip(texts, vectors):
+                key = self._key(text)
+                if key in self._entries:
+                    continue
+                self._clock += 1
+                self._entries[key] = [self._num_slots + len(new_rows), self._clock]
+                new_rows.append(vector)
+
+            if not new_rows:
+                return
+
+            with open(self.path / CACHE_VECTORS_FILE, 'ab') as f:
+                f.write(np.ascontiguousarray(new_rows, dtype=self.dtype).tobytes())
+            self._num_slots += len(new_rows)
+            self._dirty = True
+
+            if len(self._entries) > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """Keep the most recently used 90% of max_entries and compact the vectors file"""
+        keep_count = int(self.max_entries * 0.9)
+        ordered = sorted(self._entries.items(), key=lambda item: item[1][1], reverse=True)[:keep_count]
+        old_vectors = self._map_vectors()
+
+        compacted_path = self.path / (CACHE_VECTORS_FILE + ".tmp")
+        with open(compacted_path, 'wb') as f:
+            for new_slot, (key, entry) in enumerate(ordered):
+                f.write(np.ascontiguousarray(old_vectors[entry[0]]).tobytes())
+                entry[0] = new_slot
+
+        self._vectors = None
+        os.replace(compacted_path, self.path / CACHE_VECTORS_FILE)
+        evicted = len(self._entries) - len(ordered)
+        self._entries = dict(ordered)
+        self._num_slots = len(ordered)
+        # Slots moved, so the on-disk index must follow immediately
+        self._write_index()
+        logger.info(f"💾 Evicted {evicted} least recently used embeddings from cache")
+
+    def _write_index(self):
+        index = np.empty(len(self._entries), dtype=INDEX_DTYPE)
+        for i, (key, (slot, last_used)) in enumerate(self._entries.items()):
+            index[i] = (np.frombuffer(key, dtype=np.uint8), slot, last_used)
+        tmp_path = self.path / "index.tmp.npy"
+        np.save(tmp_path, index)
+        os.replace(tmp_path, self.path / CACHE_INDEX_FILE)
+        self._dirty = False
+
+    def flush(self):
+        """Persist the index (atomically) so the next run sees new entries and recency"""
+        with self._lock:
+            if self._dirty:
+                self._write_index()
+
+    def get_stats(self):
+        """Hit/miss counters and size"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "disk_bytes": self._num_slots * self.dimension * self.dtype.itemsize
+        }
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+⚙️ Parallel Embedding Engine
+Multi-core embedding for ingestion: texts are sorted by length and packed into
+token-budgeted batches (less padding), encoded by a pool of worker processes
+that each hold one model copy, and streamed back batch by batch as they finish.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Iterator, Tuple, Iterable
+import numpy as np
+
+from embedding_registry import get_embedding_model, DEFAULT_MODEL_NAME
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Worker-process state (set by _init_worker)
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads_per_worker: int):
+    """Load the model once per worker process and pin its thread count"""
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+    _worker_model = get_embedding_model(model_name)
+
+
+def _encode_in_worker(texts: List[str]) -> np.ndarray:
+    return _worker_model.encode(texts, batch_size=len(texts), show_progress_bar=False).astype('float32')
+
+
+def estimate_token_counts(model, texts: List[str]) -> List[int]:
+    """
+    Token count per text (capped at the model's max_seq_length, since longer
+    inputs are truncated anyway); falls back to ~4 characters per token
+    """
+    max_length = getattr(model, "max_seq_length", None) or 512
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is not None:
+        try:
+            encoded = tokenizer(texts, add_special_tokens=True, truncation=True, max_length=max_length)
+            return [len(ids) for ids in encoded["input_ids"]]
+        except Exception as e:
+            logger.warning(f"⚠️ Tokenizer length estimate failed, using character heuristic: {e}")
+    return [min(max_length, len(text) // 4 + 2) for text in texts]
+
+
+def length_sorted_batches(token_counts: List[int], max_tokens_per_batch: int = 16384,
+                          max_batch_size: int = 256) -> List[List[int]]:
+    """
+    Group text positions into batches of similar length. A batch is closed once
+    its padded size (longest text x batch size) would exceed the token budget,
+    so short texts get big batches and long texts get small ones.
+    """
+    order = sorted(range(len(token_counts)), key=lambda i: token_counts[i])
+    batches, current, longest = [], [], 0
+
+    for position in order:
+        candidate_longest = max(longest, token_counts[position])
+        if current and (candidate_longest * (len(current) + 1) > max_tokens_per_batch
+                        or len(current) >= max_batch_size):
+            batches.append(current)
+            current, candidate_longest = [], token_counts[position]
+        current.append(position)
+        longest = candidate_longest
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+class ParallelEmbeddingEngine:
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, num_workers: int = None,
+                 max_tokens_per_batch: int = 16384, max_batch_size: int = 256):
+        """
+        num_workers=1 encodes in-process with the shared registry model;
+        more workers start a process pool (spawned, so torch threads are not forked)
+        """
+        self.model_name = model_name
+        self.num_workers = num_workers or max(1, (os.cpu_count() or 1) // 2)
+        self.max_tokens_per_batch = max_tokens_per_batch
+        self.max_batch_size = max_batch_size
+        self.model = get_embedding_model(model_name)
+        self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // self.num_workers)
+            logger.info(f"⚙️ Starting {self.num_workers} embedding workers ({threads_per_worker} threads each)")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_name, threads_per_worker)
+            )
+        return self._pool
+
+    def encode_stream(self, texts: List[str], max_batch_size: int = None) -> Iterator[Tuple[List[int], np.ndarray]]:
+        """
+        Yield (positions, float32 embeddings) per batch as soon as each finishes.
+        Batches complete out of order; positions index into texts.
+        max_batch_size overrides the engine's cap on texts per batch for this call.
+        """
+        if not texts:
+            return
+
+        batches = length_sorted_batches(estimate_token_counts(self.model, texts),
+                                        self.max_tokens_per_batch, max_batch_size or self.max_batch_size)
+
+        if self.num_workers <= 1:
+            for positions in batches:
+                batch_texts = [texts[i] for i in positions]
+                yield positions, self.model.encode(batch_texts, batch_size=len(batch_texts),
+                                                   show_progress_bar=False).astype('float32')
+            return
+
+        # Keep a bounded number of batches in flight so memory stays flat
+        pool = self._get_pool()
+        max_in_flight = self.num_workers * 2
+        pending = {}
+        batch_iter = iter(batches)
+
+        for positions in batch_iter:
+            pending[pool.submit(_encode_in_worker, [texts[i] for i in positions])] = positions
+            if len(pending) >= max_in_flight:
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                positions = pending.pop(future)
+                yield positions, future.result()
+                next_positions = next(batch_iter, None)
+                if next_positions is not None:
+                    pending[pool.submit(_encode_in_worker, [texts[i] for i in next_positions])] = next_positions
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode all texts into one (len(texts), dim) float32 array, in input order"""
+        dimension = self.model.get_sentence_embedding_dimension()
+        embeddings = np.empty((len(texts), dimension), dtype='float32')
+        for positions, vectors in self.encode_stream(texts):
+            embeddings[positions] = vectors
+        return embeddings
+
+    def close(self):
+        """Shut the worker pool down"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def benchmark_throughput(texts: List[str], worker_counts: Iterable[int] = (1, 2, 4, 8),
+                         model_name: str = DEFAULT_MODEL_NAME, **engine_kwargs) -> List[Dict[str, Any]]:
+    """
+    Report chunks/sec per worker count (pool start-up and model load excluded)
+    """
+    report = []
+    for num_workers in worker_counts:
+        engine = ParallelEmbeddingEngine(model_name, num_workers=num_workers, **engine_kwargs)
+        # Warm the pool so worker model loads are not timed
+        engine.encode(texts[:num_workers * 4])
+
+        start = time.perf_counter()
+        engine.encode(texts)
+        seconds = time.perf_counter() - start
+        engine.close()
+
+        report.append({
+            "workers": num_workers,
+            "chunks": len(texts),
+            "seconds": round(seconds, 2),
+            "chunks_per_sec": round(len(texts) / seconds, 1) if seconds > 0 else None
+        })
+        logger.info(f"  workers={num_workers:2d} {report[-1]['chunks_per_sec']} chunks/sec")
+    return report
+
+
+def main():
+    """
+    Usage: python embedding_engine.py [chunks_file] [worker counts, e.g. 1,2,4,8]
+    """
+    chunks_file = sys.argv[1] if len(sys.argv) > 1 else "mosdac_data/rag_chunks.json"
+    worker_counts = [int(n) for n in (sys.argv[2] if len(sys.argv) > 2 else "1,2,4,8").split(",")]
+
+    with open(chunks_file, 'r', encoding='utf-8') as f:
+        texts = [chunk['content'] for chunk in json.load(f)]
+
+    logger.info(f"⚙️ Benchmarking embedding throughput on {len(texts)} chunks")
+    print(json.dumps(benchmark_throughput(texts, worker_counts), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+🧠 Embedding Model Registry
+Loads each SentenceTransformer model once per process and shares it between
+online query embedding (chatbot) and offline ingestion (VectorStoreEmbedder)
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Dict, Any, Iterable, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where /proc is not available"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
+
+
+class EmbeddingModelRegistry:
+    def __init__(self):
+        """
+        Initialize an empty registry; models are loaded on first use or via warmup()
+        """
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def _get_load_lock(self, model_name: str) -> threading.Lock:
+        """One lock per model so different models can load concurrently"""
+        with self._lock:
+            if model_name not in self._load_locks:
+                self._load_locks[model_name] = threading.Lock()
+            return self._load_locks[model_name]
+
+    def get(self, model_name: str = DEFAULT_MODEL_NAME):
+        """
+        Return the shared model instance, loading it exactly once per process
+        """
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+
+        with self._get_load_lock(model_name):
+            # Another thread may have finished loading while we waited
+            model = self._models.get(model_name)
+            if model is not None:
+                return model
+
+            model = self._load(model_name)
+            with self._lock:
+                self._models[model_name] = model
+            return model
+
+    def _load(self, model_name: str):
+        """Load a SentenceTransformer model and record load time and memory use"""
+        from sentence_transformers import SentenceTransformer
+
+        logger.info(f"🧠 Loading embedding model: {model_name}")
+        rss_before = current_rss_bytes()
+        start = time.perf_counter()
+
+        model = SentenceTransformer(model_name)
+
+        load_seconds = time.perf_counter() - start
+        rss_after = current_rss_bytes()
+
+        try:
+            parameter_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+        except Exception:
+            parameter_bytes = None
+
+        stats = {
+            "load_seconds": round(load_seconds, 3),
+            "parameter_bytes": parameter_bytes,
+            "rss_delta_bytes": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+            "dimension": model.get_sentence_embedding_dimension(),
+            "loaded_at": time.time(),
+            "pid": os.getpid()
+        }
+        with self._lock:
+            self._stats[model_name] = stats
+
+        rss_delta_mb = f"{stats['rss_delta_bytes'] / 1e6:.1f} MB" if stats['rss_delta_bytes'] is not None else "unknown"
+        logger.info(f"✅ Loaded embedding model {model_name} in {load_seconds:.2f}s (RSS +{rss_delta_mb})")
+        return model
+
+    def warmup(self, model_names: Iterable[str] = (DEFAULT_MODEL_NAME,)):
+        """
+        Load the given models up front (e.g. at boot) so no request pays the load cost
+        """
+        for model_name in model_names:
+            try:
+                self.get(model_name)
+            except Exception as e:
+                logger.warning(f"⚠️ Warmup failed for embedding model {model_name}: {e}")
+
+    def is_loaded(self, model_name: str) -> bool:
+        """Check whether a model is already resident"""
+        return model_name in self._models
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-model load time and memory statistics"""
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+# Process-wide registry shared by the chatbot and the ingestion pipeline
+_registry = EmbeddingModelRegistry()
+
+
+def get_registry() -> EmbeddingModelRegistry:
+    """Return the process-wide registry"""
+    return _registry
+
+
+def get_embedding_model(model_name: str = DEFAULT_MODEL_NAME):
+    """Shortcut for get_registry().get(model_name)"""
+    return _registry.get(model_name)
+
+
+def warmup_embedding_models(model_names: Iterable[str] = (DEFAULT_MODEL_NAME,)):
+    """Shortcut for get_registry().warmup(model_names)"""
+    _registry.warmup(model_names)
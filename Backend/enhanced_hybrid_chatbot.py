@@ -6,10 +6,13 @@ Uses comprehensive data from both MOSDAC and ISRO websites
 
 import os
 import json
+import time
 import logging
+import importlib.util
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from datetime import datetime
 import google.generativeai as genai
 from neo4j import GraphDatabase
@@ -22,17 +25,28 @@ except ImportError:
     FAISS_AVAILABLE = False
     logger.warning("FAISS not available - vector search will be disabled")
 
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
-    logger.warning("Sentence Transformers not available - will use simpler embeddings")
+from embedding_registry import get_registry, current_rss_bytes, DEFAULT_MODEL_NAME
+from vector_store_embedder import apply_search_params, index_is_mmapped
+from chunk_store import ChunkStore, chunk_store_exists
+from chunk_id_map import ChunkIdMap, chunk_id_map_exists
+from response_streaming import stream_gemini_text
+from response_cache import DataVersion
+from semantic_cache import create_semantic_cache, source_key
+from kg_search import KnowledgeGraphSearch
+from kg_snapshot import create_kg_snapshot
+from query_embedding_cache import get_query_embedding_cache, get_query_embedding_cache_stats
+from micro_batcher import QuerySearchBatcher
+from metrics import STAGE_SECONDS, FALLBACKS, ERRORS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Models are loaded through embedding_registry; only check the package is installed
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+if not SENTENCE_TRANSFORMERS_AVAILABLE:
+    logger.warning("Sentence Transformers not available - will use simpler embeddings")
+
 class EnhancedHybridMOSDACChatbot:
     def __init__(self, gemini_api_key: str = None):
         """
@@ -43,7 +57,29 @@ class EnhancedHybridMOSDACChatbot:
         # Initialize components
         self.setup_vector_store()
         self.setup_neo4j()
+        # Optional in-memory copy of the graph (KG_SNAPSHOT_ENABLED) that serves the KG lookups locally
+        self.kg_snapshot = create_kg_snapshot(lambda: self.driver)
         self.setup_gemini(gemini_api_key)
+        self.setup_embedding_model()
+        self.setup_search_batching()
+        
+        # Retrieval fan-out: vector search and both graph queries run in parallel,
+        # each bounded by its own timeout (seconds)
+        self.retrieval_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("RETRIEVAL_WORKERS", "12")),
+            thread_name_prefix="retrieval"
+        )
+        self.retrieval_timeouts = {
+            "rag": float(os.getenv("RAG_TIMEOUT_SECONDS", "3.0")),
+            "kg_entities": float(os.getenv("KG_TIMEOUT_SECONDS", "2.0")),
+            "kg_relationships": float(os.getenv("KG_TIMEOUT_SECONDS", "2.0"))
+        }
+        
+        # Semantic answer cache: paraphrased questions that retrieve the same
+        # chunks reuse an earlier Gemini answer; emptied when the data changes
+        self.data_version = DataVersion(str(Path(self.base_dir) / "enhanced_vector_store"), self.driver,
+                                        refresh_seconds=float(os.getenv("DATA_VERSION_REFRESH_SECONDS", "60")))
+        self.semantic_cache = create_semantic_cache(self.index.d)
         
         # Conversation memory
         self.conversation_memory = {}
@@ -51,31 +87,130 @@ class EnhancedHybridMOSDACChatbot:
         logger.info("✅ Enhanced Hybrid MOSDAC + ISRO Chatbot initialized!")
     
     def setup_vector_store(self):
-        """Setup enhanced vector store"""
+        """
+        Setup enhanced vector store.
+        VECTOR_STORE_LOAD_MODE=mmap (default) memory-maps the columnar chunk store
+        and, for the IVF backends (ivf_flat / ivf_pq), the FAISS inverted lists,
+        so workers share those pages. Flat and HNSW indexes are read into each
+        worker's memory either way (faiss only maps IVF lists). =memory reads
+        everything into RAM.
+        """
         try:
+            start = time.perf_counter()
+            rss_before = current_rss_bytes()
+            
             # Load enhanced vector store
-            vector_store_dir = Path(self.base_dir) / "enhanced_vector_store"
+            # Resolve the store symlink once so every file comes from the same version
+            vector_store_dir = (Path(self.base_dir) / "enhanced_vector_store").resolve()
+            load_mode = os.getenv("VECTOR_STORE_LOAD_MODE", "mmap").lower()
             
             # Load FAISS index
             index_path = vector_store_dir / "faiss_index.bin"
-            self.index = faiss.read_index(str(index_path))
+            self.index = None
+            if load_mode == "mmap":
+                try:
+                    self.index = faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                except Exception as mmap_error:
+                    logger.warning(f"⚠️ Could not mmap FAISS index, reading into memory: {mmap_error}")
+            if self.index is None:
+                self.index = faiss.read_index(str(index_path))
             
-            # Load chunks metadata
-            chunks_path = vector_store_dir / "chunks_metadata.json"
-            with open(chunks_path, 'r', encoding='utf-8') as f:
-                self.chunks = json.load(f)
+            # Load chunks metadata (rows decoded lazily from the columnar mmap store)
+            if chunk_store_exists(str(vector_store_dir)):
+                chunk_store = ChunkStore(str(vector_store_dir))
+                self.chunks = chunk_store if load_mode == "mmap" else list(chunk_store)
+            else:
+                # Legacy vector stores only have the JSON metadata
+                chunks_path = vector_store_dir / "chunks_metadata.json"
+                with open(chunks_path, 'r', encoding='utf-8') as f:
+                    self.chunks = json.load(f)
             
             # Load index info
             info_path = vector_store_dir / "index_info.json"
             with open(info_path, 'r', encoding='utf-8') as f:
                 self.index_info = json.load(f)
             
-            logger.info(f"✅ Loaded enhanced vector store with {len(self.chunks)} chunks")
+            # Chunk id <-> row map (legacy stores keep chunk_ids inside index_info.json)
+            self.id_map = None
+            if chunk_id_map_exists(str(vector_store_dir)):
+                self.id_map = ChunkIdMap(str(vector_store_dir), expected_version=self.index_info.get('index_version'))
+            
+            # Search-time tuning (nprobe / efSearch) recorded at build time
+            apply_search_params(self.index, self.index_info)
+            
+            index_mmapped = index_is_mmapped(self.index)
+            if load_mode == "mmap" and not index_mmapped:
+                logger.info(f"📦 The {self.index_info.get('index_backend', 'flat')} backend cannot be memory-mapped, "
+                            "FAISS index read into memory (only IVF inverted lists are mapped)")
+            
+            rss_after = current_rss_bytes()
+            self.vector_store_load_stats = {
+                "load_mode": "mmap" if isinstance(self.chunks, ChunkStore) else "memory",
+                "index_mmapped": index_mmapped,
+                "load_seconds": round(time.perf_counter() - start, 3),
+                "rss_delta_bytes": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None
+            }
+            
+            logger.info(f"✅ Loaded enhanced vector store with {len(self.chunks)} chunks "
+                        f"({self.vector_store_load_stats['load_mode']}, {self.vector_store_load_stats['load_seconds']}s)")
             
         except Exception as e:
             logger.error(f"❌ Failed to load vector store: {e}")
             raise
     
+    def setup_embedding_model(self):
+        """Warm the shared query embedding model so the first chat doesn't pay the load"""
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            logger.warning("⚠️ Sentence Transformers not available - skipping embedding model warmup")
+            return
+        
+        model_name = self.index_info.get('model_name', DEFAULT_MODEL_NAME)
+        get_registry().warmup([model_name])
+    
+    def _get_query_model(self):
+        """Get the query embedding model from the process-wide registry"""
+        registry = get_registry()
+        model_name = self.index_info.get('model_name', DEFAULT_MODEL_NAME)
+        try:
+            return registry.get(model_name)
+        except Exception as model_error:
+            logger.error(f"❌ Failed to load SentenceTransformer model '{model_name}': {model_error}")
+            if model_name == DEFAULT_MODEL_NAME:
+                return None
+            # Try with a simpler model as fallback
+            try:
+                model = registry.get(DEFAULT_MODEL_NAME)
+                logger.info(f"✅ Loaded fallback model: {DEFAULT_MODEL_NAME}")
+                return model
+            except Exception as fallback_error:
+                logger.error(f"❌ Fallback model also failed: {fallback_error}")
+                return None
+    
+    def setup_search_batching(self):
+        """
+        Micro-batch concurrent query encodes and FAISS searches.
+        SEARCH_BATCH_WINDOW_MS (default 2, 0 disables), SEARCH_BATCH_MAX_SIZE (default 32) and
+        SEARCH_BATCH_TIMEOUT_SECONDS (default 30: how long a request waits for its batch).
+        """
+        self.search_batcher = None
+        window_ms = float(os.getenv("SEARCH_BATCH_WINDOW_MS", "2"))
+        if window_ms <= 0 or not SENTENCE_TRANSFORMERS_AVAILABLE:
+            return
+        self.search_batcher = QuerySearchBatcher(
+            self._encode_queries, self.index,
+            max_batch_size=int(os.getenv("SEARCH_BATCH_MAX_SIZE", "32")),
+            max_wait_ms=window_ms,
+            timeout_seconds=float(os.getenv("SEARCH_BATCH_TIMEOUT_SECONDS", "30"))
+        )
+        logger.info(f"🧺 Search micro-batching enabled ({window_ms} ms window)")
+    
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Batched, cached query encoding used by the search batcher"""
+        model = self._get_query_model()
+        if model is None:
+            raise RuntimeError("No query embedding model available")
+        return get_query_embedding_cache(model).encode_many(queries)
+    
     def setup_neo4j(self):
         """Setup Neo4j connection"""
         try:
@@ -95,6 +230,10 @@ class EnhancedHybridMOSDACChatbot:
         except Exception as e:
             logger.warning(f"⚠️ Neo4j connection failed: {e}")
             self.driver = None
+        
+        # Entity lookups go through the full-text index instead of CONTAINS scans
+        self.kg_search = KnowledgeGraphSearch(self.driver)
+        self.kg_search.ensure_indexes()
     
     def setup_gemini(self, api_key: str = None):
         """Setup Gemini LLM"""
@@ -114,41 +253,57 @@ class EnhancedHybridMOSDACChatbot:
             logger.warning(f"⚠️ Gemini setup failed: {e}")
             self.gemini_available = False
     
-    def search_rag(self, query: str, k=5) -> List[Dict]:
-        """Search using enhanced RAG (vector search)"""
-        try:
-            # Use SentenceTransformer for query embedding (matching the stored embeddings)
-            if not SENTENCE_TRANSFORMERS_AVAILABLE:
-                logger.warning("Sentence Transformers not available - cannot perform RAG search")
-                return []
-            
-            # Initialize SentenceTransformer model with error handling
-            model_name = self.index_info.get('model_name', 'all-MiniLM-L6-v2')
-            try:
-                model = SentenceTransformer(model_name)
-            except Exception as model_error:
-                logger.error(f"❌ Failed to load SentenceTransformer model '{model_name}': {model_error}")
-                # Try with a simpler model as fallback
-                try:
-                    model = SentenceTransformer('all-MiniLM-L6-v2')
-                    logger.info("✅ Loaded fallback model: all-MiniLM-L6-v2")
-                except Exception as fallback_error:
-                    logger.error(f"❌ Fallback model also failed: {fallback_error}")
-                    return []
+    def embed_query(self, query: str) -> Optional[np.ndarray]:
+        """L2-normalized (1, dimension) query embedding, or None if no model is available"""
+        # Use SentenceTransformer for query embedding (matching the stored embeddings)
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            logger.warning("Sentence Transformers not available - cannot embed query")
+            return None
+        
+        # Shared model instance - loaded once per process, not per query
+        model = self._get_query_model()
+        if model is None:
+            return None
+        
+        with STAGE_SECONDS.time(stage="embedding"):
+            # Concurrent queries share one forward pass
+            if self.search_batcher is not None:
+                return self.search_batcher.embed(query)
             
-            # Encode query
-            query_vector = model.encode([query], convert_to_tensor=False).astype('float32')
-            faiss.normalize_L2(query_vector)
+            # Repeated queries are served from the per-model LRU instead of re-encoding
+            return get_query_embedding_cache(model).encode(query)
+    
+    def search_rag(self, query: str, k=5, query_vector: np.ndarray = None) -> List[Dict]:
+        """Search using enhanced RAG (vector search); pass query_vector to skip re-encoding"""
+        try:
+            if self.search_batcher is not None:
+                # Encoded (if needed) and searched together with concurrent requests
+                timings = {}
+                scores, indices = self.search_batcher.search(query, k, query_vector=query_vector, timings=timings)
+                for stage, seconds in timings.items():
+                    STAGE_SECONDS.observe(seconds, stage=stage)
+            else:
+                if query_vector is None:
+                    query_vector = self.embed_query(query)
+                    if query_vector is None:
+                        return []
+                
+                # Search FAISS index
+                with STAGE_SECONDS.time(stage="faiss_search"):
+                    scores, indices = self.index.search(query_vector, k)
             
-            # Search FAISS index
-            scores, indices = self.index.search(query_vector, k)
+            # Incremental (IndexIDMap2) stores return content-hash labels, not rows
+            if self.id_map is not None and self.id_map.has_labels:
+                indices = [[-1 if row is None else row for row in self.id_map.rows_for_labels(indices[0])]]
             
             results = []
             for score, idx in zip(scores[0], indices[0]):
-                if idx < len(self.chunks):
+                # FAISS pads missing results with -1
+                if 0 <= idx < len(self.chunks):
                     chunk = self.chunks[idx]
                     results.append({
                         'score': float(score),
+                        'chunk_id': chunk.get('id'),
                         'content': chunk['content'],
                         'source_file': chunk['source_file'],
                         'source_type': chunk.get('source_type', 'unknown')
@@ -162,40 +317,91 @@ class EnhancedHybridMOSDACChatbot:
     
     def search_knowledge_graph(self, query: str) -> Dict:
         """Search using Neo4j knowledge graph"""
+        return {
+            'entities': self.search_kg_entities(query),
+            'relationships': self.search_kg_relationships(query)
+        }
+    
+    def search_kg_entities(self, query: str) -> List[Dict]:
+        """Knowledge graph entities matching the query's entity terms, best first"""
+        snapshot = self.kg_snapshot.get() if self.kg_snapshot else None
+        if snapshot is not None:
+            with STAGE_SECONDS.time(stage="kg_snapshot_entities"):
+                return snapshot.search_entities(query, limit=5)
+        
         if not self.driver:
-            return {'entities': [], 'relationships': []}
+            return []
         
         try:
-            with self.driver.session() as session:
-                # Search for entities
-                entity_query = """
-                MATCH (n)
-                WHERE toLower(n.name) CONTAINS toLower($search_term)
-                   OR toLower(n.type) CONTAINS toLower($search_term)
-                RETURN n.name as name, n.type as type, labels(n) as labels
-                LIMIT 5
-                """
-                entities = list(session.run(entity_query, search_term=query))
-                
-                # Get relationships
-                rel_query = """
-                MATCH (a)-[r]->(b)
-                WHERE toLower(a.name) CONTAINS toLower($search_term)
-                   OR toLower(b.name) CONTAINS toLower($search_term)
-                   OR toLower(type(r)) CONTAINS toLower($search_term)
-                RETURN a.name as source, type(r) as relationship, b.name as target
-                LIMIT 5
-                """
-                relationships = list(session.run(rel_query, search_term=query))
+            with STAGE_SECONDS.time(stage="cypher_kg_entities"):
+                return self.kg_search.search_entities(query, limit=5)
                 
-                return {
-                    'entities': [dict(e) for e in entities],
-                    'relationships': [dict(r) for r in relationships]
-                }
+        except Exception as e:
+            logger.error(f"❌ Knowledge graph entity search failed: {e}")
+            return []
+    
+    def search_kg_relationships(self, query: str) -> List[Dict]:
+        """Knowledge graph relationships touching the best-matching entities (or a matching type)"""
+        snapshot = self.kg_snapshot.get() if self.kg_snapshot else None
+        if snapshot is not None:
+            with STAGE_SECONDS.time(stage="kg_snapshot_relationships"):
+                return snapshot.search_relationships(query, limit=5)
+        
+        if not self.driver:
+            return []
+        
+        try:
+            with STAGE_SECONDS.time(stage="cypher_kg_relationships"):
+                return self.kg_search.search_relationships(query, limit=5)
                 
         except Exception as e:
-            logger.error(f"❌ Knowledge graph search failed: {e}")
-            return {'entities': [], 'relationships': []}
+            logger.error(f"❌ Knowledge graph relationship search failed: {e}")
+            return []
+    
+    def retrieve(self, query: str, k=3, query_vector: np.ndarray = None):
+        """
+        Run the vector search, the entity query and the relationship query
+        concurrently. A source that fails or misses its timeout contributes an
+        empty result instead of failing the chat. query_vector, if given, is the
+        precomputed query embedding.
+        Returns (rag_results, kg_results, stages) where stages holds each
+        source's status ("ok", "timeout" or "error") and duration in ms.
+        """
+        start = time.perf_counter()
+        
+        def timed(fn, *args, **kwargs):
+            stage_start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            return result, time.perf_counter() - stage_start
+        
+        futures = {
+            "rag": self.retrieval_executor.submit(timed, self.search_rag, query, k=k, query_vector=query_vector),
+            "kg_entities": self.retrieval_executor.submit(timed, self.search_kg_entities, query),
+            "kg_relationships": self.retrieval_executor.submit(timed, self.search_kg_relationships, query)
+        }
+        
+        results, stages = {}, {}
+        for name, future in futures.items():
+            # Each source gets its own deadline, measured from the fan-out start
+            remaining = self.retrieval_timeouts[name] - (time.perf_counter() - start)
+            try:
+                results[name], seconds = future.result(timeout=max(remaining, 0))
+                stages[name] = {"status": "ok", "ms": round(seconds * 1000, 1)}
+            except FutureTimeoutError:
+                # The query keeps running in its worker; its result is simply dropped
+                logger.warning(f"⚠️ Retrieval stage {name} timed out after {self.retrieval_timeouts[name]}s")
+                ERRORS.inc(stage=name, kind="timeout")
+                results[name] = []
+                stages[name] = {"status": "timeout", "ms": round(self.retrieval_timeouts[name] * 1000, 1)}
+            except Exception as e:
+                logger.error(f"❌ Retrieval stage {name} failed: {e}")
+                ERRORS.inc(stage=name, kind="error")
+                results[name] = []
+                stages[name] = {"status": "error", "ms": round((time.perf_counter() - start) * 1000, 1)}
+        
+        stages["retrieval_total"] = {"ms": round((time.perf_counter() - start) * 1000, 1)}
+        kg_results = {'entities': results["kg_entities"], 'relationships': results["kg_relationships"]}
+        return results["rag"], kg_results, stages
     
     def _build_prompt(self, query: str, rag_context: str, kg_context: str, conversation_history: str) -> str:
         """Build comprehensive prompt for Gemini"""
@@ -230,6 +436,7 @@ Please provide a comprehensive answer:"""
     
     def _fallback_answer(self, query: str, rag_context: str, kg_context: str) -> str:
         """Fallback answer when Gemini is not available"""
+        FALLBACKS.inc(chatbot="enhanced")
         answer_parts = []
         
         if rag_context:
@@ -272,72 +479,221 @@ Please provide a comprehensive answer:"""
         
         return "\n".join(history) if history else ""
     
+    def _gather_context(self, query: str, query_vector: np.ndarray = None):
+        """
+        Run RAG and knowledge-graph retrieval concurrently;
+        returns (rag_results, rag_context, kg_results, kg_context, stages)
+        """
+        # Steps 1-2: Search RAG and Knowledge Graph in parallel
+        logger.info("🔍 Searching RAG and Knowledge Graph...")
+        rag_results, kg_results, stages = self.retrieve(query, k=3, query_vector=query_vector)
+        rag_context = ""
+        if rag_results:
+            rag_context = "\n\n".join([
+                f"**Source: {r['source_file']}**\n{r['content'][:300]}..."
+                for r in rag_results
+            ])
+        
+        kg_context = ""
+        if kg_results['entities'] or kg_results['relationships']:
+            kg_parts = []
+            if kg_results['entities']:
+                kg_parts.append("**Entities:**")
+                for entity in kg_results['entities']:
+                    kg_parts.append(f"- {entity['name']} ({entity['type']})")
+            if kg_results['relationships']:
+                kg_parts.append("**Relationships:**")
+                for rel in kg_results['relationships']:
+                    kg_parts.append(f"- {rel['source']} --[{rel['relationship']}]--> {rel['target']}")
+            kg_context = "\n".join(kg_parts)
+        
+        return rag_results, rag_context, kg_results, kg_context, stages
+    
+    def _semantic_cache_enabled(self) -> bool:
+        """Only Gemini answers are worth caching; fallback answers are built locally"""
+        return self.semantic_cache is not None and self.gemini_available
+    
+    def _embed_for_cache(self, query: str, stages: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Embed the query once, up front, so the cache lookup and the vector search share it"""
+        if not self._semantic_cache_enabled():
+            return None
+        embed_start = time.perf_counter()
+        try:
+            self.semantic_cache.ensure_version(self.data_version())
+            query_vector = self.embed_query(query)
+        except Exception as e:
+            logger.warning(f"⚠️ Query embedding for semantic cache failed: {e}")
+            query_vector = None
+        stages["embedding"] = {"ms": round((time.perf_counter() - embed_start) * 1000, 1)}
+        return query_vector
+    
+    def _lookup_semantic_cache(self, query_vector: Optional[np.ndarray], rag_results: List[Dict]) -> Optional[Dict[str, Any]]:
+        """Cached answer for a similar query that retrieved the same chunks"""
+        if query_vector is None or not rag_results:
+            return None
+        entry = self.semantic_cache.lookup(query_vector, source_key(rag_results))
+        if entry is not None:
+            logger.info(f"🧭 Semantic cache hit (similarity {entry['similarity']:.3f}, cached query: {entry['query']!r})")
+        return entry
+    
+    def _store_semantic_cache(self, query: str, query_vector: Optional[np.ndarray], rag_results: List[Dict], answer: str):
+        if query_vector is not None and rag_results and answer:
+            self.semantic_cache.add(query_vector, source_key(rag_results), answer, query=query)
+    
     def chat(self, query: str, user_id: str = "default") -> str:
         """
         Main chat method - processes query and returns response
         """
+        return self.chat_with_metadata(query, user_id)['response']
+    
+    def chat_with_metadata(self, query: str, user_id: str = "default") -> Dict[str, Any]:
+        """
+        Like chat(), but returns {'response', 'metadata'} where metadata holds
+        per-stage timings (and timeout/error status) of retrieval and generation
+        """
         logger.info(f"🤖 Processing query: {query}")
+        start = time.perf_counter()
         
         try:
-            # Step 1: Search RAG
-            logger.info("🔍 Searching RAG...")
-            rag_results = self.search_rag(query, k=3)
-            rag_context = ""
-            if rag_results:
-                rag_context = "\n\n".join([
-                    f"**Source: {r['source_file']}**\n{r['content'][:300]}..."
-                    for r in rag_results
-                ])
-            
-            # Step 2: Search Knowledge Graph
-            logger.info("🗺️ Searching Knowledge Graph...")
-            kg_results = self.search_knowledge_graph(query)
-            kg_context = ""
-            if kg_results['entities'] or kg_results['relationships']:
-                kg_parts = []
-                if kg_results['entities']:
-                    kg_parts.append("**Entities:**")
-                    for entity in kg_results['entities']:
-                        kg_parts.append(f"- {entity['name']} ({entity['type']})")
-                if kg_results['relationships']:
-                    kg_parts.append("**Relationships:**")
-                    for rel in kg_results['relationships']:
-                        kg_parts.append(f"- {rel['source']} --[{rel['relationship']}]--> {rel['target']}")
-                kg_context = "\n".join(kg_parts)
+            # Steps 1-2: Search RAG and Knowledge Graph (concurrently)
+            embedding_stage = {}
+            query_vector = self._embed_for_cache(query, embedding_stage)
+            rag_results, rag_context, kg_results, kg_context, stages = self._gather_context(query, query_vector)
+            stages.update(embedding_stage)
             
             # Step 3: Get conversation history
             conversation_history = self._get_conversation_history(user_id)
             
-            # Step 4: Generate response
-            if self.gemini_available:
+            # Step 4: Generate response (or reuse the answer to a paraphrase)
+            generation_start = time.perf_counter()
+            cached = self._lookup_semantic_cache(query_vector, rag_results)
+            if cached is not None:
+                answer = cached['answer']
+            elif self.gemini_available:
                 logger.info("🤖 Generating answer with Gemini...")
-                prompt = self._build_prompt(query, rag_context, kg_context, conversation_history)
+                with STAGE_SECONDS.time(stage="prompt_build"):
+                    prompt = self._build_prompt(query, rag_context, kg_context, conversation_history)
                 
-                response = self.gemini_model.generate_content(prompt)
-                answer = response.text
+                with STAGE_SECONDS.time(stage="llm_total"):
+                    response = self.gemini_model.generate_content(prompt)
+                    answer = response.text
+                self._store_semantic_cache(query, query_vector, rag_results, answer)
             else:
                 logger.info("🤖 Using fallback answer...")
                 answer = self._fallback_answer(query, rag_context, kg_context)
+            stages["generation"] = {"ms": round((time.perf_counter() - generation_start) * 1000, 1)}
             
             # Step 5: Update conversation memory
             self._update_conversation_memory(user_id, query, answer)
             
+            total_seconds = time.perf_counter() - start
+            STAGE_SECONDS.observe(total_seconds, stage="total")
+            stages["total"] = {"ms": round(total_seconds * 1000, 1)}
             logger.info("✅ Response generated successfully")
-            return answer
+            return {'response': answer, 'metadata': {'status': 'success', 'stages': stages, 'cached': cached is not None}}
             
         except Exception as e:
             logger.error(f"❌ Error in chat: {e}")
-            return f"I apologize, but I encountered an error while processing your query: {str(e)}. Please try again."
+            ERRORS.inc(stage="chat", kind="error")
+            return {
+                'response': f"I apologize, but I encountered an error while processing your query: {str(e)}. Please try again.",
+                'metadata': {'status': 'error', 'error': str(e)}
+            }
+    
+    def chat_stream(self, query: str, user_id: str = "default") -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming variant of chat(). Yields (event, payload) pairs: one "sources"
+        event with the retrieved chunks and graph hits, then "text" events as
+        Gemini generates, then a final "metadata" event.
+        """
+        logger.info(f"🤖 Processing streaming query: {query}")
+        start = time.perf_counter()
+        first_text_at = None
+        status = 'success'
+        answer_parts = []
+        embedding_stage = {}
+        query_vector = self._embed_for_cache(query, embedding_stage)
+        
+        try:
+            rag_results, rag_context, kg_results, kg_context, stages = self._gather_context(query, query_vector)
+            stages.update(embedding_stage)
+        except Exception as e:
+            logger.error(f"❌ Error gathering context: {e}")
+            ERRORS.inc(stage="retrieval", kind="error")
+            rag_results, rag_context, kg_results, kg_context, stages = [], "", {'entities': [], 'relationships': []}, "", {}
+            status = 'error'
+        retrieval_done = time.perf_counter()
+        
+        yield "sources", {
+            "documents": [
+                {'source_file': r['source_file'], 'source_type': r['source_type'], 'score': r['score']}
+                for r in rag_results
+            ],
+            "entities": kg_results['entities'],
+            "relationships": kg_results['relationships']
+        }
+        
+        cached = self._lookup_semantic_cache(query_vector, rag_results)
+        if cached is not None:
+            first_text_at = time.perf_counter()
+            answer_parts = [cached['answer']]
+            yield "text", {"text": cached['answer']}
+        elif self.gemini_available:
+            with STAGE_SECONDS.time(stage="prompt_build"):
+                prompt = self._build_prompt(query, rag_context, kg_context, self._get_conversation_history(user_id))
+            llm_start = time.perf_counter()
+            try:
+                logger.info("🤖 Streaming answer from Gemini...")
+                for text in stream_gemini_text(self.gemini_model, prompt):
+                    if first_text_at is None:
+                        first_text_at = time.perf_counter()
+                        STAGE_SECONDS.observe(first_text_at - llm_start, stage="llm_time_to_first_token")
+                    answer_parts.append(text)
+                    yield "text", {"text": text}
+                STAGE_SECONDS.observe(time.perf_counter() - llm_start, stage="llm_total")
+                self._store_semantic_cache(query, query_vector, rag_results, "".join(answer_parts))
+            except Exception as e:
+                logger.error(f"❌ Gemini streaming error: {e}")
+                ERRORS.inc(stage="llm", kind="error")
+                status = 'error' if first_text_at is not None else 'fallback'
+        else:
+            status = 'fallback' if status == 'success' else status
+        
+        if first_text_at is None:
+            logger.info("🤖 Using fallback answer...")
+            first_text_at = time.perf_counter()
+            answer_parts = [self._fallback_answer(query, rag_context, kg_context)]
+            yield "text", {"text": answer_parts[0]}
+        
+        self._update_conversation_memory(user_id, query, "".join(answer_parts))
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage="total")
+        
+        yield "metadata", {
+            "status": status,
+            "cached": cached is not None,
+            "stages": stages,
+            "retrieval_ms": round((retrieval_done - start) * 1000, 1),
+            "time_to_first_text_ms": round((first_text_at - start) * 1000, 1),
+            "total_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
     
     def get_system_info(self) -> Dict:
         """Get system information"""
         return {
             "total_chunks": len(self.chunks),
             "vector_store_dimension": self.index_info.get('dimension', 'unknown'),
+            "vector_index_type": self.index_info.get('index_type', 'unknown'),
+            "vector_index_version": self.index_info.get('index_version', 'unknown'),
+            "vector_store_load": self.vector_store_load_stats,
             "neo4j_connected": self.driver is not None,
             "gemini_available": self.gemini_available,
             "data_sources": ["MOSDAC", "ISRO"],
-            "enhanced_data": True
+            "enhanced_data": True,
+            "embedding_models": get_registry().get_stats(),
+            "query_embedding_cache": get_query_embedding_cache_stats(),
+            "search_batching": self.search_batcher.get_stats() if self.search_batcher else {"enabled": False},
+            "semantic_cache": self.semantic_cache.get_stats() if self.semantic_cache else {"enabled": False},
+            "kg_snapshot": self.kg_snapshot.get_stats() if self.kg_snapshot else {"enabled": False}
         }
 
 def main():
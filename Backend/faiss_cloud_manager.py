@@ -58,7 +58,12 @@ class FAISSCloudManager:
                 if extracted_dirs:
                     source_path = os.path.join('temp_extract', extracted_dirs[0], 'enhanced_vector_store')
                     if os.path.exists(source_path):
-                        if os.path.exists(self.vector_store_path):
+                        if os.path.islink(self.vector_store_path):
+                            # Stores saved by the embedder are a symlink to a versioned directory
+                            version_path = os.path.realpath(self.vector_store_path)
+                            os.unlink(self.vector_store_path)
+                            shutil.rmtree(version_path, ignore_errors=True)
+                        elif os.path.exists(self.vector_store_path):
                             shutil.rmtree(self.vector_store_path)
                         shutil.move(source_path, self.vector_store_path)
                         print("Vector store downloaded and extracted successfully!")
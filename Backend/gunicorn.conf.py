@@ -0,0 +1,29 @@
+"""
+Gunicorn settings for the chatbot API (picked up automatically from Backend/).
+The chatbot is warmed up once in the master before it binds the port and forks
+workers: no request pays the cold start, and workers share the loaded state
+copy-on-write. Each worker then opens its own Neo4j/Gemini/SQLite clients
+(the Gemini model itself is only created in the workers).
+
+Command-line flags (Dockerfile, render.yaml) override the values below.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+timeout = 120
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+
+def on_starting(server):
+    """Runs in the master after the app is loaded but before the port is bound"""
+    import chatbot_api
+    # Gemini's gRPC channel is not fork-safe: it is created in post_fork instead
+    chatbot_api.warmup(pre_fork=True)
+
+
+def post_fork(server, worker):
+    import chatbot_api
+    chatbot_api.after_fork()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+🩺 Background Health Monitor
+Runs dependency checks (Neo4j, vector store, LLM) on its own interval and keeps
+the latest result of each in memory, so liveness/readiness probes answer from
+the cache instead of opening a database session per probe.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    def __init__(self, checks: Dict[str, Callable[[], str]], interval_seconds: float = 30,
+                 required: Iterable[str] = ()):
+        """
+        checks: name -> callable returning a status string ("ok", "disabled", ...);
+        raising marks the dependency as "error".
+        required: checks that must not be in error for the service to be ready.
+        """
+        self.checks = checks
+        self.interval_seconds = interval_seconds
+        self.required = set(required)
+        self.pid = os.getpid()
+        self._results = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Run the first round of checks now, then keep checking in a daemon thread"""
+        if self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._run, name="health-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check_all()
+            self._stop.wait(self.interval_seconds)
+
+    def check_all(self):
+        for name, check in self.checks.items():
+            start = time.perf_counter()
+            error = None
+            try:
+                status = check()
+            except Exception as e:
+                status = "error"
+                error = str(e)
+                logger.warning(f"⚠️ Health check {name} failed: {e}")
+            result = {
+                "status": status,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+                "checked_at": time.time()
+            }
+            if error:
+                result["error"] = error
+            with self._lock:
+                self._results[name] = result
+
+    def stop(self):
+        self._stop.set()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def results(self) -> Dict[str, Dict[str, Any]]:
+        """Latest result per check, with its age in seconds"""
+        now = time.time()
+        with self._lock:
+            results = {name: dict(result) for name, result in self._results.items()}
+        for result in results.values():
+            result["age_seconds"] = round(now - result["checked_at"], 1)
+        return results
+
+    def is_ready(self) -> bool:
+        """All required checks have run and none of them is in error"""
+        with self._lock:
+            return all(name in self._results and self._results[name]["status"] != "error"
+                       for name in self.required)
@@ -1,24 +1,220 @@
 import pandas as pd
 from neo4j import GraphDatabase
+from neo4j.exceptions import TransientError, ServiceUnavailable, SessionExpired
 import logging
+import time
+import zlib
+import json
+import hashlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from kg_search import KnowledgeGraphSearch
 load_dotenv()
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Errors worth retrying a batch for: deadlocks/lock timeouts, leader switches, dropped connections
+RETRYABLE_ERRORS = (TransientError, ServiceUnavailable, SessionExpired)
+
+# One query per relation type (types cannot be parameters); rows share a round trip and a transaction
+UNWIND_TRIPLES_QUERY = """
+    UNWIND $rows AS row
+    MERGE (s:Entity {name: row.subject})
+    MERGE (o:Entity {name: row.object})
+    MERGE (s)-[r:`%s`]->(o)
+    SET s.source_file = row.source_file
+    SET o.source_file = row.source_file
+"""
+
+# Parallel import, phase 1: every distinct node once (batches never share a node)
+UNWIND_NODES_QUERY = """
+    UNWIND $rows AS row
+    MERGE (n:Entity {name: row.name})
+    SET n.source_file = row.source_file
+"""
+
+# Parallel import, phase 2: nodes exist already, only the endpoints' relationship chains are locked.
+# Rows whose endpoints are missing (failed phase 1 batch) match nothing; `written` counts the rest.
+UNWIND_RELATIONSHIPS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (s:Entity {name: row.subject})
+    MATCH (o:Entity {name: row.object})
+    MERGE (s)-[r:`%s`]->(o)
+    RETURN count(*) AS written
+"""
+
+def relationship_type_literal(relation):
+    """Relation text as it goes between backticks in Cypher"""
+    return relation.replace("`", "``")
+
+def load_triples(csv_file_path):
+    """
+    Read triples.csv into cleaned rows: fields stripped, rows with a missing
+    or too-short (< 2 chars) subject/relation/object dropped.
+    Returns (rows, skipped) with rows as dicts subject/relation/object/source_file.
+    """
+    df = pd.read_csv(csv_file_path)
+    logger.info(f"📊 Loaded {len(df)} triples from {csv_file_path}")
+    
+    # Clean and prepare data
+    df = df.dropna(subset=['subject', 'relation', 'object'])  # Remove rows with missing values
+    if 'source_file' not in df.columns:
+        df['source_file'] = 'unknown'
+    df = df[['subject', 'relation', 'object', 'source_file']].fillna('unknown').astype(str)
+    for column in df.columns:
+        df[column] = df[column].str.strip()
+    valid = (df['subject'].str.len() >= 2) & (df['relation'].str.len() >= 2) & (df['object'].str.len() >= 2)
+    skipped = int((~valid).sum())
+    rows = df[valid].to_dict('records')
+    logger.info(f"📋 Processing {len(rows)} valid triples")
+    return rows, skipped
+
+def group_by_relation(rows):
+    """relation -> [{subject, object, source_file}] (UNWIND payloads)"""
+    groups = defaultdict(list)
+    for row in rows:
+        groups[row['relation']].append({
+            'subject': row['subject'],
+            'object': row['object'],
+            'source_file': row['source_file']
+        })
+    return groups
+
+def node_partition(name, partitions):
+    """Stable partition of a node name (same in every process, unlike hash())"""
+    return zlib.crc32(name.encode('utf-8')) % partitions
+
+def partition_rounds(partitions):
+    """
+    Schedule for the relationship cells (i, j), i <= j, of an odd number of
+    partitions: every cell exactly once, and no two cells of a round share a
+    partition, so concurrent writers never lock the same node. Round-robin
+    (circle method) pairing; each partition's diagonal cell (i, i) runs in
+    the round where it has no partner. Every round has (partitions + 1) / 2 cells.
+    """
+    if partitions % 2 == 0:
+        raise ValueError("partitions must be odd")
+    slots = [None] + list(range(partitions))
+    rounds = []
+    for _ in range(partitions):
+        cells = []
+        for k in range(len(slots) // 2):
+            a, b = slots[k], slots[-1 - k]
+            if a is None or b is None:
+                own = b if a is None else a
+                cells.append((own, own))
+            else:
+                cells.append((min(a, b), max(a, b)))
+        rounds.append(cells)
+        slots = [slots[0], slots[-1]] + slots[1:-1]
+    return rounds
+
+# Differential sync: delete relationships that left the crawl, then orphaned entities
+UNWIND_DELETE_RELATIONSHIPS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (s:Entity {name: row.subject})-[r:`%s`]->(o:Entity {name: row.object})
+    DELETE r
+"""
+
+UNWIND_DELETE_ORPHANS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (n:Entity {name: row.name})
+    WHERE NOT (n)--()
+    DELETE n
+"""
+
+# First sync without a usable state file: the imported triples currently in the graph
+GRAPH_TRIPLES_QUERY = """
+    MATCH (s:Entity)-[r]->(o:Entity)
+    RETURN s.name AS subject, type(r) AS relation, o.name AS object
+"""
+
+# Marker node tying the graph to the sync state file (a wiped or different database is detected)
+SYNC_MARKER_QUERY = "MATCH (m:KGSyncState {key: 'triples'}) RETURN m.fingerprint AS fingerprint"
+SET_SYNC_MARKER_QUERY = "MERGE (m:KGSyncState {key: 'triples'}) SET m.fingerprint = $fingerprint, m.synced_at = datetime()"
+
+def build_sync_state(rows):
+    """
+    Per source_file fingerprint of the cleaned rows: a hash of its sorted
+    distinct triples, plus the triples themselves (needed to compute deletes
+    on the next sync).
+    """
+    files = defaultdict(set)
+    for row in rows:
+        files[row['source_file']].add((row['subject'], row['relation'], row['object']))
+    state = {}
+    for source_file, triples in files.items():
+        triples = sorted(triples)
+        digest = hashlib.sha256("\n".join("\t".join(triple) for triple in triples).encode('utf-8')).hexdigest()
+        state[source_file] = {'hash': digest, 'triples': [list(triple) for triple in triples]}
+    return state
+
+def sync_state_fingerprint(state):
+    """One hash over all per-file hashes"""
+    return hashlib.sha256(json.dumps({f: entry['hash'] for f, entry in sorted(state.items())}).encode('utf-8')).hexdigest()
+
+def load_sync_state(state_path):
+    path = Path(state_path)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_sync_state(state_path, state):
+    """Write the state atomically (a crash leaves the previous file in place)"""
+    path = Path(state_path)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'fingerprint': sync_state_fingerprint(state), 'files': state}, f)
+    os.replace(tmp_path, path)
+
+def diff_sync_states(old_files, new_files):
+    """
+    Triples to insert and to delete, looking only at source files whose hash
+    changed. A triple is deleted only if no source file still contains it.
+    Returns (inserts as rows with source_file, deletes as (s, r, o), changed file names).
+    """
+    changed = sorted(f for f in set(old_files) | set(new_files)
+                     if old_files.get(f, {}).get('hash') != new_files.get(f, {}).get('hash'))
+    old_triples = {tuple(t) for f in changed for t in old_files.get(f, {}).get('triples', [])}
+    new_triples = {tuple(t) for f in changed for t in new_files.get(f, {}).get('triples', [])}
+    
+    # Triples of unchanged files are in the graph already and must stay
+    unchanged = {tuple(t) for f, entry in new_files.items() if f not in changed for t in entry['triples']}
+    deletes = old_triples - new_triples - unchanged
+    
+    inserts = []
+    for f in changed:
+        for subject, relation, object_text in new_files.get(f, {}).get('triples', []):
+            if (subject, relation, object_text) not in old_triples:
+                inserts.append({'subject': subject, 'relation': relation, 'object': object_text, 'source_file': f})
+    return inserts, sorted(deletes), changed
+
 class MOSDACNeo4jImporter:
-    def __init__(self, uri=None, user=None, password=None):
+    def __init__(self, uri=None, user=None, password=None, batch_size=None, max_retries=None,
+                 retry_backoff_seconds=None, workers=None):
         """
         Initialize Neo4j connection for MOSDAC data
+        
+        workers: concurrent sessions for import_triples_parallel (IMPORT_WORKERS, default 1)
+        batch_size: triples per UNWIND transaction (IMPORT_BATCH_SIZE, default 2000)
+        max_retries: retries per batch on transient errors (IMPORT_MAX_RETRIES, default 5)
+        retry_backoff_seconds: first retry delay, doubled per attempt (IMPORT_RETRY_BACKOFF_SECONDS, default 0.5)
         """
         uri = uri or os.getenv("NEO4J_URI", "neo4j://127.0.0.1:7687")
         user = user or os.getenv("NEO4J_USER", "neo4j")
         password = password or os.getenv("NEO4J_PASSWORD", "Hbhosale@05")
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.batch_size = batch_size or int(os.getenv("IMPORT_BATCH_SIZE", "2000"))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("IMPORT_MAX_RETRIES", "5"))
+        self.retry_backoff_seconds = (retry_backoff_seconds if retry_backoff_seconds is not None
+                                      else float(os.getenv("IMPORT_RETRY_BACKOFF_SECONDS", "0.5")))
+        self.workers = workers or int(os.getenv("IMPORT_WORKERS", "1"))
         logger.info(f"🔗 Connected to Neo4j at {uri}")
     
     def close(self):
@@ -64,67 +260,315 @@ class MOSDACNeo4jImporter:
                 logger.info("✅ Created constraint for Entity.name")
         except Exception as e:
             logger.warning(f"Constraint creation failed (might already exist): {e}")
+        
+        # Full-text index used by the chatbots' entity search
+        KnowledgeGraphSearch(self.driver).ensure_indexes()
+    
+    def write_batch(self, session, query, rows):
+        """
+        Run one UNWIND batch in an explicit transaction, retrying transient
+        errors with exponential backoff. Returns (attempts used, rows written):
+        rows written is the query's `written` column when it returns one
+        (UNWIND_RELATIONSHIPS_QUERY), otherwise every row.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                with session.begin_transaction() as tx:
+                    result = tx.run(query, rows=rows)
+                    record = result.single(strict=False)
+                    result.consume()
+                    tx.commit()
+                written = record["written"] if record is not None and "written" in record.keys() else len(rows)
+                return attempt + 1, written
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_backoff_seconds * (2 ** attempt)
+                logger.warning(f"⚠️ Batch of {len(rows)} failed ({type(e).__name__}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
     
     def import_triples(self, csv_file_path):
         """
         Import triples from CSV file into Neo4j
+        
+        Triples are grouped by relation type and sent as UNWIND batches of
+        batch_size rows, one transaction per batch, instead of one auto-commit
+        query per triple. Relies on the Entity.name constraint (create_constraints)
+        for index-backed MERGE.
         """
         try:
-            # Read CSV file
-            df = pd.read_csv(csv_file_path)
-            logger.info(f"📊 Loaded {len(df)} triples from {csv_file_path}")
-            
-            # Clean and prepare data
-            df = df.dropna()  # Remove rows with missing values
-            logger.info(f"📋 Processing {len(df)} valid triples")
+            rows, skipped_count = load_triples(csv_file_path)
+            groups = group_by_relation(rows)
             
             imported_count = 0
-            skipped_count = 0
+            failed_count = 0
+            batches = 0
+            retries = 0
+            start = time.perf_counter()
             
             with self.driver.session() as session:
-                # Import entities and relationships
-                for index, row in df.iterrows():
-                    if index % 1000 == 0:
-                        logger.info(f"⏳ Processing triple {index}/{len(df)}")
-                    
-                    subject = str(row['subject']).strip()
-                    relation = str(row['relation']).strip()
-                    object_text = str(row['object']).strip()
-                    source_file = str(row.get('source_file', 'unknown')).strip()
-                    
-                    # Skip if any field is empty or too short
-                    if len(subject) < 2 or len(relation) < 2 or len(object_text) < 2:
-                        skipped_count += 1
-                        continue
-                    
-                    try:
-                        # Create Cypher query to merge nodes and create relationship
-                        cypher_query = """
-                        MERGE (s:Entity {name: $subject})
-                        MERGE (o:Entity {name: $object})
-                        MERGE (s)-[r:`%s`]->(o)
-                        SET s.source_file = $source_file
-                        SET o.source_file = $source_file
-                        """ % relation
-                        
-                        session.run(cypher_query, 
-                                  subject=subject, 
-                                  object=object_text, 
-                                  source_file=source_file)
-                        imported_count += 1
-                        
-                    except Exception as e:
-                        logger.warning(f"Skipped triple due to error: {e}")
-                        skipped_count += 1
-                        continue
-                
-                logger.info(f"✅ Successfully imported {imported_count} triples into Neo4j")
-                logger.info(f"⚠️ Skipped {skipped_count} triples")
+                # Import entities and relationships, one relation type at a time
+                for relation, relation_rows in groups.items():
+                    query = UNWIND_TRIPLES_QUERY % relationship_type_literal(relation)
+                    for offset in range(0, len(relation_rows), self.batch_size):
+                        batch = relation_rows[offset:offset + self.batch_size]
+                        try:
+                            attempts, written = self.write_batch(session, query, batch)
+                            retries += attempts - 1
+                            imported_count += written
+                        except Exception as e:
+                            logger.warning(f"Skipped batch of {len(batch)} '{relation}' triples due to error: {e}")
+                            failed_count += len(batch)
+                        batches += 1
+                        if batches % 50 == 0:
+                            logger.info(f"⏳ Imported {imported_count}/{len(rows)} triples")
+            
+            seconds = time.perf_counter() - start
+            stats = {
+                'imported': imported_count,
+                'skipped': skipped_count,
+                'failed': failed_count,
+                'relation_types': len(groups),
+                'batches': batches,
+                'retries': retries,
+                'seconds': round(seconds, 3),
+                'triples_per_second': round(imported_count / seconds, 1) if seconds > 0 else 0.0
+            }
+            logger.info(f"✅ Successfully imported {imported_count} triples into Neo4j "
+                        f"in {stats['seconds']}s ({stats['triples_per_second']} triples/sec, "
+                        f"{batches} batches, {retries} retries)")
+            logger.info(f"⚠️ Skipped {skipped_count} invalid triples")
+            if failed_count:
+                logger.error(f"❌ {failed_count} triples failed to import")
+            return stats
                 
         except Exception as e:
             logger.error(f"❌ Error importing triples: {str(e)}")
             raise
     
+    def write_batches(self, batches):
+        """
+        Write (query, rows) batches sequentially in one session (one worker's
+        share). Returns (written, unmatched, failed, retries): unmatched rows
+        were committed but wrote nothing (write_batch), failed batches are logged.
+        """
+        written = unmatched = failed = retries = 0
+        with self.driver.session() as session:
+            for query, rows in batches:
+                try:
+                    attempts, batch_written = self.write_batch(session, query, rows)
+                    retries += attempts - 1
+                    written += batch_written
+                    unmatched += len(rows) - batch_written
+                except Exception as e:
+                    logger.warning(f"Skipped batch of {len(rows)} rows due to error: {e}")
+                    failed += len(rows)
+        return written, unmatched, failed, retries
+    
+    def import_triples_parallel(self, csv_file_path, workers=None, partitioned=True):
+        """
+        Import triples from CSV file with several concurrent sessions
+        
+        Phase 1 merges every distinct node name once, in parallel batches.
+        Phase 2 creates relationships: nodes are split into 2 * workers - 1
+        partitions, each relationship belongs to the cell of its endpoints'
+        partitions, and cells are written in rounds whose cells share no
+        partition (partition_rounds), so no two transactions wait on the same
+        node lock. partitioned=False splits relationships round-robin instead
+        (for benchmarking; expect lock conflicts and retries).
+        """
+        workers = workers or self.workers
+        try:
+            rows, skipped_count = load_triples(csv_file_path)
+            start = time.perf_counter()
+            retries = 0
+            
+            # Phase 1: nodes (the last triple mentioning a node sets its source_file, as in import_triples)
+            node_sources = {}
+            for row in rows:
+                node_sources[row['subject']] = row['source_file']
+                node_sources[row['object']] = row['source_file']
+            node_rows = [{'name': name, 'source_file': source_file} for name, source_file in node_sources.items()]
+            node_batches = [[(UNWIND_NODES_QUERY, node_rows[offset:offset + self.batch_size])]
+                            for offset in range(0, len(node_rows), self.batch_size)]
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                node_results = list(pool.map(self.write_batches, node_batches))
+            retries += sum(result[3] for result in node_results)
+            failed_nodes = sum(result[2] for result in node_results)
+            if failed_nodes:
+                logger.error(f"❌ {failed_nodes} nodes could not be merged; their relationships will be missing")
+            node_seconds = time.perf_counter() - start
+            logger.info(f"✅ Phase 1: merged {len(node_rows)} nodes in {node_seconds:.2f}s with {workers} workers")
+            
+            # Phase 2: relationships, grouped into cells and then by relation type
+            partitions = 2 * workers - 1 if partitioned else workers
+            cells = defaultdict(lambda: defaultdict(list))
+            for index, row in enumerate(rows):
+                if partitioned:
+                    a = node_partition(row['subject'], partitions)
+                    b = node_partition(row['object'], partitions)
+                    cell = (min(a, b), max(a, b))
+                else:
+                    cell = index % partitions
+                cells[cell][row['relation']].append({'subject': row['subject'], 'object': row['object']})
+            
+            def cell_batches(cell):
+                batches = []
+                for relation, relation_rows in cells.get(cell, {}).items():
+                    query = UNWIND_RELATIONSHIPS_QUERY % relationship_type_literal(relation)
+                    batches.extend((query, relation_rows[offset:offset + self.batch_size])
+                                   for offset in range(0, len(relation_rows), self.batch_size))
+                return batches
+            
+            rounds = partition_rounds(partitions) if partitioned else [list(range(partitions))]
+            imported_count = failed_count = missing_endpoints = 0
+            phase_start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for round_cells in rounds:
+                    work = [batches for batches in map(cell_batches, round_cells) if batches]
+                    for written, unmatched, failed, batch_retries in pool.map(self.write_batches, work):
+                        imported_count += written
+                        failed_count += unmatched + failed
+                        missing_endpoints += unmatched
+                        retries += batch_retries
+            relationship_seconds = time.perf_counter() - phase_start
+            if missing_endpoints:
+                logger.error(f"❌ {missing_endpoints} triples not imported: an endpoint node is missing")
+            
+            seconds = time.perf_counter() - start
+            stats = {
+                'imported': imported_count,
+                'skipped': skipped_count,
+                'failed': failed_count,
+                'missing_endpoints': missing_endpoints,
+                'nodes': len(node_rows),
+                'workers': workers,
+                'partitions': partitions,
+                'rounds': len(rounds),
+                'retries': retries,
+                'node_seconds': round(node_seconds, 3),
+                'relationship_seconds': round(relationship_seconds, 3),
+                'seconds': round(seconds, 3),
+                'triples_per_second': round(imported_count / seconds, 1) if seconds > 0 else 0.0
+            }
+            logger.info(f"✅ Phase 2: imported {imported_count} triples in {relationship_seconds:.2f}s "
+                        f"({partitions} partitions, {len(rounds)} rounds); total {stats['seconds']}s, "
+                        f"{stats['triples_per_second']} triples/sec, {retries} retries")
+            logger.info(f"⚠️ Skipped {skipped_count} invalid triples")
+            if failed_count:
+                logger.error(f"❌ {failed_count} triples failed to import")
+            return stats
+            
+        except Exception as e:
+            logger.error(f"❌ Error importing triples: {str(e)}")
+            raise
+    
+    def sync_state_path(self, csv_file_path):
+        return os.getenv("KG_SYNC_STATE_FILE") or str(Path(csv_file_path).with_suffix('.sync_state.json'))
+    
+    def record_sync_state(self, files, state_path):
+        """Mark the graph as synced to `files` (build_sync_state) and persist the state"""
+        with self.driver.session() as session:
+            session.run(SET_SYNC_MARKER_QUERY, fingerprint=sync_state_fingerprint(files)).consume()
+        save_sync_state(state_path, files)
+    
+    def sync_triples(self, csv_file_path, state_path=None):
+        """
+        Bring the graph in line with triples.csv by applying only the difference
+        to the last synced version, instead of clear_database + full import.
+        
+        The previous version is the sync state file (KG_SYNC_STATE_FILE,
+        default <csv>.sync_state.json): per source_file hashes and triples.
+        Inserts are applied before deletes, each in batched transactions, so
+        readers see the old graph, then old + new, then the new graph, never
+        an empty one. The state file is only updated after every batch
+        succeeded; a failed sync is repaired by the next run. Without a state
+        file (or when the graph's KGSyncState marker does not match it) the
+        graph itself is the previous version: its Entity triples are read once
+        and diffed against the CSV, so stale triples are deleted on the first
+        sync too.
+        """
+        state_path = state_path or self.sync_state_path(csv_file_path)
+        try:
+            start = time.perf_counter()
+            rows, skipped_count = load_triples(csv_file_path)
+            new_files = build_sync_state(rows)
+            fingerprint = sync_state_fingerprint(new_files)
+            
+            previous = load_sync_state(state_path)
+            with self.driver.session() as session:
+                record = session.run(SYNC_MARKER_QUERY).single()
+            graph_fingerprint = record["fingerprint"] if record else None
+            if previous and previous.get('fingerprint') != graph_fingerprint:
+                logger.warning(f"⚠️ Graph does not match {state_path} (marker {graph_fingerprint}); "
+                               f"reconciling against the graph instead")
+                previous = None
+            old_files = previous['files'] if previous else {}
+            if not rows and old_files:
+                # A failed crawl must not turn into "delete everything"
+                raise ValueError(f"{csv_file_path} has no valid triples; refusing to sync the graph to empty")
+            
+            if previous and previous['fingerprint'] == fingerprint:
+                logger.info("✅ Knowledge graph already in sync with triples.csv")
+                return {'inserted': 0, 'deleted': 0, 'orphans_checked': 0, 'changed_files': 0,
+                        'skipped': skipped_count, 'seconds': round(time.perf_counter() - start, 3)}
+            
+            inserts, deletes, changed = diff_sync_states(old_files, new_files)
+            if previous is None:
+                # One-time reconcile against the graph itself
+                logger.info("ℹ️ No previous sync state: reconciling triples.csv against the graph")
+                with self.driver.session() as session:
+                    graph_triples = {(record["subject"], record["relation"], record["object"])
+                                     for record in session.run(GRAPH_TRIPLES_QUERY)}
+                if not rows and graph_triples:
+                    raise ValueError(f"{csv_file_path} has no valid triples; refusing to sync the graph to empty")
+                new_triples = {(row['subject'], row['relation'], row['object']) for row in rows}
+                inserts = [row for row in inserts if (row['subject'], row['relation'], row['object']) not in graph_triples]
+                deletes = sorted(graph_triples - new_triples)
+            logger.info(f"🔀 {len(changed)}/{len(new_files)} source files changed: "
+                        f"{len(inserts)} triples to insert, {len(deletes)} to delete")
+            
+            batches = []
+            for relation, relation_rows in group_by_relation(inserts).items():
+                query = UNWIND_TRIPLES_QUERY % relationship_type_literal(relation)
+                batches.extend((query, relation_rows[offset:offset + self.batch_size])
+                               for offset in range(0, len(relation_rows), self.batch_size))
+            delete_rows = [{'subject': s, 'relation': r, 'object': o, 'source_file': None} for s, r, o in deletes]
+            for relation, relation_rows in group_by_relation(delete_rows).items():
+                query = UNWIND_DELETE_RELATIONSHIPS_QUERY % relationship_type_literal(relation)
+                batches.extend((query, relation_rows[offset:offset + self.batch_size])
+                               for offset in range(0, len(relation_rows), self.batch_size))
+            
+            # Entities no triple mentions any more (only deleted if they have no relationships left)
+            live_names = {name for row in rows for name in (row['subject'], row['object'])}
+            orphan_rows = [{'name': name} for name in sorted({name for s, _, o in deletes for name in (s, o)} - live_names)]
+            batches.extend((UNWIND_DELETE_ORPHANS_QUERY, orphan_rows[offset:offset + self.batch_size])
+                           for offset in range(0, len(orphan_rows), self.batch_size))
+            
+            written, _, failed, retries = self.write_batches(batches)
+            if failed:
+                logger.error(f"❌ {failed} rows failed to sync; keeping the previous sync state so the next run retries them")
+            else:
+                self.record_sync_state(new_files, state_path)
+            
+            stats = {
+                'inserted': len(inserts),
+                'deleted': len(deletes),
+                'orphans_checked': len(orphan_rows),
+                'changed_files': len(changed),
+                'failed': failed,
+                'retries': retries,
+                'skipped': skipped_count,
+                'seconds': round(time.perf_counter() - start, 3)
+            }
+            logger.info(f"✅ Synced knowledge graph in {stats['seconds']}s: +{stats['inserted']} "
+                        f"-{stats['deleted']} triples, {stats['orphans_checked']} orphaned entities checked")
+            return stats
+            
+        except Exception as e:
+            logger.error(f"❌ Error syncing triples: {str(e)}")
+            raise
+    
     def get_statistics(self):
         """
         Get database statistics
@@ -230,17 +674,34 @@ def main():
             logger.error("❌ Cannot proceed without Neo4j connection")
             return
         
-        # Clear existing data (optional - comment out if you want to keep existing data)
-        logger.info("🧹 Clearing existing data...")
-        importer.clear_database()
+        # Full rebuild only on request: it leaves the graph empty while importing
+        full_rebuild = os.getenv("KG_FULL_REBUILD", "false").lower() == "true"
+        if full_rebuild:
+            logger.info("🧹 Clearing existing data...")
+            importer.clear_database()
         
         # Create constraints
         logger.info("🔧 Creating constraints...")
         importer.create_constraints()
         
-        # Import triples
-        logger.info("📥 Importing triples...")
-        importer.import_triples(csv_file)
+        if full_rebuild:
+            # Import triples
+            logger.info("📥 Importing triples...")
+            if importer.workers > 1:
+                import_stats = importer.import_triples_parallel(csv_file)
+            else:
+                import_stats = importer.import_triples(csv_file)
+            # Later runs sync against this import - unless part of it is missing, so the
+            # next sync reconciles against the graph and writes the missing triples
+            if import_stats['failed']:
+                logger.error(f"❌ {import_stats['failed']} triples failed to import; not recording a sync state")
+            else:
+                rows, _ = load_triples(csv_file)
+                importer.record_sync_state(build_sync_state(rows), importer.sync_state_path(csv_file))
+        else:
+            # Apply only what changed since the last sync
+            logger.info("🔀 Syncing triples...")
+            importer.sync_triples(csv_file)
         
         # Get statistics
         logger.info("📊 Getting statistics...")
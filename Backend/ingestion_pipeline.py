@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+🚰 Streaming Ingestion Pipeline
+Small building blocks for generator-based ingestion: every stage consumes and
+produces an iterator, stages can run in their own thread behind a bounded queue,
+and snapshots are streamed to JSONL instead of one large JSON document, so
+memory stays flat as the crawl grows.
+"""
+
+import os
+import json
+import queue
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Iterable, Iterator, List, Dict, Any, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class _StageError:
+    """Carries an exception from a producer thread to the consumer"""
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def bounded(iterable: Iterable, maxsize: int = 256, name: str = "stage") -> Iterator:
+    """
+    Run iterable in a background thread and yield its items through a queue of
+    at most maxsize items, so a fast producer can never run ahead of a slow
+    consumer by more than maxsize items. Producer exceptions are re-raised here.
+    """
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_END)
+        except BaseException as e:
+            put(_StageError(e))
+
+    thread = threading.Thread(target=produce, name=f"ingest-{name}", daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = items.get()
+            if item is _END:
+                return
+            if isinstance(item, _StageError):
+                raise item.error
+            yield item
+    finally:
+        # Consumer stopped early (or failed): let the producer exit
+        stop.set()
+
+
+def batched(iterable: Iterable, batch_size: int) -> Iterator[List]:
+    """Group an iterator into lists of at most batch_size items"""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_jsonl(items: Iterable[Dict[str, Any]], output_file: str) -> Iterator[Dict[str, Any]]:
+    """
+    Pass items through unchanged while streaming them to a JSONL snapshot.
+    The file is written under a temporary name and renamed once the stream is
+    exhausted, so a partial run never replaces the previous snapshot.
+    """
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+
+    count = 0
+    completed = False
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+                yield item
+        completed = True
+    finally:
+        if not completed:
+            tmp_path.unlink(missing_ok=True)
+
+    os.replace(tmp_path, output_path)
+    logger.info(f"✅ Wrote {count} records to {output_path}")
+
+
+def read_jsonl(input_file: str) -> Iterator[Dict[str, Any]]:
+    """Stream records back from a JSONL snapshot"""
+    with open(input_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_text_documents(sources: List[Tuple[str, str]], source_type: str = 'webpage') -> Iterator[Dict[str, Any]]:
+    """
+    Yield one document per non-empty *.txt file. sources is a list of
+    (directory, source prefix) pairs, e.g. ("mosdac_data/text", "mosdac").
+    """
+    for text_dir, prefix in sources:
+        dir_path = Path(text_dir)
+        if not dir_path.exists():
+            continue
+        for text_file in sorted(dir_path.glob("*.txt")):
+            try:
+                with open(text_file, 'r', encoding='utf-8') as f:
+                    content = f.read().strip()
+            except Exception as e:
+                logger.warning(f"Failed to read {text_file}: {e}")
+                continue
+            if content:
+                yield {
+                    'content': content,
+                    'source_file': f"{prefix}/{text_file.name}",
+                    'source_type': source_type,
+                    'timestamp': datetime.now().isoformat()
+                }
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+🔎 Knowledge Graph Search
+Index-backed entity and relationship lookup for the chatbots. Instead of
+`toLower(n.name) CONTAINS toLower(<whole user sentence>)` over every node (and
+every relationship), candidate entity terms are extracted from the query and
+looked up through a Neo4j full-text index on name/type/description, so the
+cost scales with the number of matches rather than the size of the graph.
+Results carry the Lucene relevance score.
+"""
+
+import re
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FULLTEXT_INDEX_NAME = "kg_entity_text"
+# Entity: imported triples; Organization/Satellite: the chatbot's sample data
+INDEXED_LABELS = ("Entity", "Organization", "Satellite")
+
+STOPWORDS = {
+    "a", "about", "an", "and", "any", "are", "as", "at", "be", "between", "by", "can", "could", "data",
+    "describe", "detail", "details", "difference", "do", "does", "explain", "for", "from", "give", "how",
+    "i", "in", "information", "is", "it", "its", "know", "list", "me", "of", "on", "or", "please", "provide",
+    "show", "tell", "than", "that", "the", "their", "there", "these", "this", "to", "used", "vs", "was",
+    "what", "when", "where", "which", "who", "why", "with", "would", "you", "your"
+}
+
+# Errors meaning the full-text index or procedure is not there (as opposed to e.g. one bad query)
+FULLTEXT_MISSING_CODES = ("Neo.ClientError.Procedure.ProcedureNotFound", "Neo.ClientError.Schema.IndexNotFound")
+FULLTEXT_MISSING_MESSAGES = ("no such fulltext schema index", "no such fulltext index", "there is no procedure")
+
+# Lucene query syntax characters that must be escaped inside terms
+_LUCENE_SPECIAL = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+_TOKEN = re.compile(r"[A-Za-z0-9]+(?:[-_.][A-Za-z0-9]+)*")
+
+FULLTEXT_ENTITY_QUERY = """
+    CALL db.index.fulltext.queryNodes($index_name, $search) YIELD node, score
+    RETURN node.name AS name, node.type AS type, node.description AS description,
+           labels(node) AS labels, score
+    ORDER BY score DESC
+    LIMIT $limit
+"""
+
+FULLTEXT_RELATIONSHIP_QUERY = """
+    CALL db.index.fulltext.queryNodes($index_name, $search) YIELD node, score
+    WITH node, score ORDER BY score DESC LIMIT $candidates
+    MATCH (node)-[r]-()
+    WITH r, max(score) AS score
+    RETURN startNode(r).name AS source, type(r) AS relationship, endNode(r).name AS target, score
+    ORDER BY score DESC
+    LIMIT $limit
+"""
+
+# Used only when the full-text index is unavailable (e.g. no schema privileges)
+LEGACY_ENTITY_QUERY = """
+    MATCH (n)
+    WHERE toLower(toString(n.name)) CONTAINS toLower($query)
+       OR toLower(toString(n.description)) CONTAINS toLower($query)
+       OR toLower(toString(n.type)) CONTAINS toLower($query)
+    RETURN n.name AS name, n.type AS type, n.description AS description, labels(n) AS labels, 1.0 AS score
+    LIMIT $limit
+"""
+
+LEGACY_RELATIONSHIP_QUERY = """
+    MATCH (a)-[r]->(b)
+    WHERE toLower(a.name) CONTAINS toLower($query)
+       OR toLower(b.name) CONTAINS toLower($query)
+       OR toLower(type(r)) CONTAINS toLower($query)
+    RETURN a.name AS source, type(r) AS relationship, b.name AS target, 1.0 AS score
+    LIMIT $limit
+"""
+
+
+def extract_query_terms(query: str, max_phrases: int = 6, max_words: int = 8) -> List[str]:
+    """
+    Candidate entity terms: 2-3 word phrases from runs of adjacent
+    non-stopword tokens (e.g. "oceansat 3", "sea surface temperature")
+    followed by the individual tokens. Hyphenated names such as INSAT-3DR
+    stay one token.
+    """
+    tokens = [token.lower() for token in _TOKEN.findall(query)]
+    phrases, run = [], []
+    for token in tokens + [None]:
+        if token is not None and token not in STOPWORDS:
+            run.append(token)
+            continue
+        for size in (3, 2):
+            for start in range(len(run) - size + 1):
+                phrases.append(" ".join(run[start:start + size]))
+        run = []
+
+    singles = [token for token in tokens if token not in STOPWORDS and (len(token) > 2 or any(c.isdigit() for c in token))]
+    phrases = list(dict.fromkeys(phrases))[:max_phrases]
+    return phrases + list(dict.fromkeys(singles))[:max_words]
+
+
+def escape_lucene(term: str) -> str:
+    return _LUCENE_SPECIAL.sub(r"\\\1", term)
+
+
+def fulltext_clauses(terms: List[str]) -> List[Tuple[str, str, float]]:
+    """
+    (kind, term, boost) per Lucene clause: "phrase" for multi-word spans
+    (boosted), "term" otherwise, plus a "fuzzy" variant for longer single
+    words so "oceansat3" / "ocean-sat" style spellings still match.
+    """
+    clauses = []
+    for term in terms:
+        if " " in term or "-" in term:
+            clauses.append(("phrase", term, 2.0))
+        else:
+            clauses.append(("term", term, 1.0))
+            if len(term) >= 6 and term.isalpha():
+                clauses.append(("fuzzy", term, 1.0))
+    return clauses
+
+
+def build_fulltext_query(terms: List[str]) -> Optional[str]:
+    """Lucene query string for fulltext_clauses(terms)"""
+    clauses = []
+    for kind, term, boost in fulltext_clauses(terms):
+        escaped = escape_lucene(term)
+        if kind == "phrase":
+            clauses.append(f'"{escaped}"^{boost:g}')
+        elif kind == "fuzzy":
+            clauses.append(f"{escaped}~1")
+        else:
+            clauses.append(escaped)
+    return " OR ".join(clauses) if clauses else None
+
+
+class KnowledgeGraphSearch:
+    def __init__(self, driver, index_name: str = FULLTEXT_INDEX_NAME, relationship_types_ttl: float = 300,
+                 fulltext_retry_seconds: float = 300):
+        """
+        driver: a sync neo4j driver (may be None: every search returns []).
+        fulltext_retry_seconds: after the index was found missing, how long to
+        use the CONTAINS queries before trying the index again.
+        """
+        self.driver = driver
+        self.index_name = index_name
+        self._fulltext_available = True
+        self._fulltext_failed_at = 0.0
+        self.fulltext_retry_seconds = fulltext_retry_seconds
+        self.relationship_types_ttl = relationship_types_ttl
+        self._relationship_types = []
+        self._relationship_types_at = 0.0
+        self._lock = threading.Lock()
+
+    def ensure_indexes(self) -> bool:
+        """Create the full-text index if it does not exist yet"""
+        if not self.driver:
+            return False
+        labels = "|".join(INDEXED_LABELS)
+        try:
+            with self.driver.session() as session:
+                session.run(
+                    f"CREATE FULLTEXT INDEX {self.index_name} IF NOT EXISTS "
+                    f"FOR (n:{labels}) ON EACH [n.name, n.type, n.description]"
+                ).consume()
+            logger.info(f"✅ Full-text index {self.index_name} ready on {labels}(name, type, description)")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Could not create full-text index {self.index_name}: {e}")
+            return False
+
+    @property
+    def fulltext_available(self) -> bool:
+        """False while the index is known to be missing; re-probed after fulltext_retry_seconds"""
+        if not self._fulltext_available and time.time() - self._fulltext_failed_at >= self.fulltext_retry_seconds:
+            logger.info(f"🔎 Retrying full-text index {self.index_name}")
+            self._fulltext_available = True
+        return self._fulltext_available
+
+    def _fulltext_failed(self, error: Exception):
+        """
+        A missing index / procedure switches this instance to the CONTAINS
+        queries for fulltext_retry_seconds. Any other client error (e.g. a query
+        Lucene cannot parse) falls back for this query only; anything else
+        (connection loss) is re-raised.
+        """
+        code = str(getattr(error, "code", "") or "")
+        if not code.startswith("Neo.ClientError"):
+            raise error
+        message = str(getattr(error, "message", "") or error).lower()
+        if code not in FULLTEXT_MISSING_CODES and not any(text in message for text in FULLTEXT_MISSING_MESSAGES):
+            logger.warning(f"⚠️ Full-text query failed, using CONTAINS for this query: {error}")
+            return
+        if self._fulltext_available:
+            logger.warning(f"⚠️ Full-text search unavailable, falling back to CONTAINS scans "
+                           f"for {self.fulltext_retry_seconds:.0f}s: {error}")
+        self._fulltext_available = False
+        self._fulltext_failed_at = time.time()
+
+    def _params(self, query: str, limit: int) -> Optional[Dict[str, Any]]:
+        search = build_fulltext_query(extract_query_terms(query))
+        if search is None:
+            return None
+        return {"index_name": self.index_name, "search": search, "limit": limit}
+
+    def search_entities(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Entities matching the query's candidate terms, best first (name, type, description, labels, score)"""
+        if not self.driver:
+            return []
+        with self.driver.session() as session:
+            if self.fulltext_available:
+                params = self._params(query, limit)
+                if params is None:
+                    return []
+                try:
+                    return [dict(record) for record in session.run(FULLTEXT_ENTITY_QUERY, **params)]
+                except Exception as e:
+                    self._fulltext_failed(e)
+            return [dict(record) for record in session.run(LEGACY_ENTITY_QUERY, query=query, limit=limit)]
+
+    async def asearch_entities(self, async_driver, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """search_entities over the async driver"""
+        async with async_driver.session() as session:
+            if self.fulltext_available:
+                params = self._params(query, limit)
+                if params is None:
+                    return []
+                try:
+                    result = await session.run(FULLTEXT_ENTITY_QUERY, **params)
+                    return [dict(record) async for record in result]
+                except Exception as e:
+                    self._fulltext_failed(e)
+            result = await session.run(LEGACY_ENTITY_QUERY, query=query, limit=limit)
+            return [dict(record) async for record in result]
+
+    def relationship_types(self) -> List[str]:
+        """Relationship types in the graph (cached; the set changes only on import)"""
+        with self._lock:
+            if time.time() - self._relationship_types_at < self.relationship_types_ttl:
+                return self._relationship_types
+        with self.driver.session() as session:
+            types = [record["relationshipType"] for record in session.run("CALL db.relationshipTypes()")]
+        with self._lock:
+            self._relationship_types = types
+            self._relationship_types_at = time.time()
+        return types
+
+    def search_relationships(self, query: str, limit: int = 5, candidates: int = 10) -> List[Dict[str, Any]]:
+        """
+        Relationships touching the best-matching entities, then relationships
+        whose type matches a query term (e.g. "launched by" -> LAUNCHED_BY)
+        """
+        if not self.driver:
+            return []
+        with self.driver.session() as session:
+            if not self.fulltext_available:
+                return [dict(record) for record in session.run(LEGACY_RELATIONSHIP_QUERY, query=query, limit=limit)]
+
+            terms = extract_query_terms(query)
+            params = self._params(query, limit)
+            if params is None:
+                return []
+            try:
+                results = [dict(record) for record in
+                           session.run(FULLTEXT_RELATIONSHIP_QUERY, candidates=candidates, **params)]
+            except Exception as e:
+                self._fulltext_failed(e)
+                return [dict(record) for record in session.run(LEGACY_RELATIONSHIP_QUERY, query=query, limit=limit)]
+
+            # Relationship types are few: match them here and read through the type index
+            seen = {(r["source"], r["relationship"], r["target"]) for r in results}
+            for rel_type in self._matching_relationship_types(terms):
+                if len(results) >= limit:
+                    break
+                type_query = (f"MATCH (a)-[r:`{rel_type.replace('`', '``')}`]->(b) "
+                              "RETURN a.name AS source, type(r) AS relationship, b.name AS target, 0.0 AS score "
+                              "LIMIT $limit")
+                for record in session.run(type_query, limit=limit + len(seen)):
+                    key = (record["source"], record["relationship"], record["target"])
+                    if key not in seen and len(results) < limit:
+                        seen.add(key)
+                        results.append(dict(record))
+            return results
+
+    def _matching_relationship_types(self, terms: List[str]) -> List[str]:
+        try:
+            rel_types = self.relationship_types()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not list relationship types: {e}")
+            return []
+        normalized = {rel_type: rel_type.lower().replace("_", " ") for rel_type in rel_types}
+        return [rel_type for rel_type, name in normalized.items()
+                if any(len(term) >= 3 and term in name for term in terms)]
@@ -0,0 +1,644 @@
+#!/usr/bin/env python3
+"""
+🧠 In-Process Knowledge Graph Snapshot
+Read-only copy of the knowledge graph held in memory so a chat does not pay
+Neo4j round trips for five entities and five relationships:
+
+- interned name / type / relationship-type tables
+- CSR adjacency (outgoing and incoming) over integer node ids
+- per-field inverted indexes over name/type/description mirroring the
+  kg_entity_text full-text index used by the Cypher path (kg_search)
+
+Entities are ranked by the same Lucene query kg_search builds (phrases, terms
+and fuzzy ~1 variants), scored with Lucene's BM25 over the same fields.
+Tokenization approximates Lucene's standard analyzer and Neo4j keeps deleted
+documents in its statistics until segments merge, so scores can drift from
+the index; `python kg_snapshot.py` checks both paths return the same results.
+The snapshot is rebuilt in the background from Neo4j or from triples.csv and
+swapped in atomically.
+"""
+
+import os
+import re
+import csv
+import sys
+import json
+import math
+import time
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from kg_search import INDEXED_LABELS, extract_query_terms, fulltext_clauses
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Close to Lucene's standard analyzer for these texts: lowercase word runs, joined across . and '
+_WORD = re.compile(r"\w+(?:['.]\w+)*")
+
+# Lucene defaults used by the Neo4j full-text index
+TEXT_FIELDS = ("name", "type", "description")
+BM25_K1 = 1.2
+BM25_B = 0.75
+FUZZY_MAX_EXPANSIONS = 50
+
+_NO_POSTINGS = (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64))
+
+# Parity check queries (python kg_snapshot.py), extended by an optional query log
+PARITY_QUERIES = [
+    "What is INSAT-3DR?",
+    "Tell me about Oceansat-3",
+    "sea surface temperature",
+    "Which satellite measures rainfall?",
+    "SCATSAT-1 wind products",
+    "Megha-Tropiques mission",
+    "cyclone tracking from INSAT imagery",
+    "ocean colour monitor",
+    "Kalpana-1 VHRR",
+    "soil moisture data",
+    "instruments on board SARAL AltiKa",
+    "chlorophyll concentration",
+    "outgoing longwave radiation",
+    "satellites launched by ISRO",
+    "Which organization operates MOSDAC?",
+    "oceansat"
+]
+
+SNAPSHOT_NODE_QUERY = """
+    MATCH (n)
+    RETURN elementId(n) AS id, n.name AS name, n.type AS type, n.description AS description, labels(n) AS labels
+"""
+
+SNAPSHOT_EDGE_QUERY = """
+    MATCH (a)-[r]->(b)
+    RETURN elementId(a) AS source, type(r) AS relationship, elementId(b) AS target
+"""
+
+
+def tokenize(text: Any) -> List[str]:
+    return _WORD.findall(str(text).lower()) if text is not None else []
+
+
+def _phrase_freq(tokens: List[str], phrase: List[str]) -> int:
+    size = len(phrase)
+    return sum(tokens[i:i + size] == phrase for i in range(len(tokens) - size + 1))
+
+
+def _deletions(token: str) -> Set[str]:
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def _edit_distance_at_most_one(a: str, b: str) -> Optional[int]:
+    """0 or 1 when b is within one insertion, deletion, substitution or adjacent transposition of a"""
+    if a == b:
+        return 0
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        if len(diff) == 1:
+            return 1
+        if len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]:
+            return 1
+        return None
+    if abs(len(a) - len(b)) != 1:
+        return None
+    shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+    i = 0
+    while i < len(shorter) and shorter[i] == longer[i]:
+        i += 1
+    return 1 if shorter[i:] == longer[i + 1:] else None
+
+
+def _int_to_byte4(value: int) -> int:
+    """Lucene SmallFloat.intToByte4: how a field length is stored in the norms (lossy above 23)"""
+    if value < 24:
+        return value
+    value -= 24
+    bits = value.bit_length()
+    if bits < 4:
+        return 24 + value
+    shift = bits - 4
+    return 24 + (((value >> shift) & 0x07) | ((shift + 1) << 3))
+
+
+def _byte4_to_int(encoded: int) -> int:
+    """Lucene SmallFloat.byte4ToInt"""
+    if encoded < 24:
+        return encoded
+    encoded -= 24
+    bits, shift = encoded & 0x07, (encoded >> 3) - 1
+    return 24 + (bits if shift == -1 else (bits | 0x08) << shift)
+
+
+class KnowledgeGraphSnapshot:
+    def __init__(self, nodes: List[Dict[str, Any]], edges: Iterable[Tuple[Any, str, Any]], source: str = "memory"):
+        """
+        nodes: dicts with key (any unique id), name, type, description, labels.
+        edges: (source key, relationship type, target key); duplicates collapse
+        like MERGE, edges to unknown keys are dropped.
+        """
+        start = time.perf_counter()
+        self.source = source
+
+        # Interned string tables
+        self.names: List[str] = []
+        name_ids: Dict[str, int] = {}
+        self.types: List[Optional[str]] = [None]
+        type_ids: Dict[Optional[str], int] = {None: 0}
+        self.label_sets: List[Tuple[str, ...]] = []
+        label_ids: Dict[Tuple[str, ...], int] = {}
+
+        count = len(nodes)
+        self.node_name = np.zeros(count, dtype=np.int32)
+        self.node_type = np.zeros(count, dtype=np.int32)
+        self.node_labels = np.zeros(count, dtype=np.int32)
+        self.descriptions: List[Optional[str]] = [None] * count
+        key_to_node = {}
+        for i, node in enumerate(nodes):
+            key_to_node[node["key"]] = i
+            name = node.get("name")
+            name = None if name is None else str(name)
+            if name not in name_ids:
+                name_ids[name] = len(self.names)
+                self.names.append(name)
+            node_type = node.get("type")
+            if node_type not in type_ids:
+                type_ids[node_type] = len(self.types)
+                self.types.append(node_type)
+            labels = tuple(node.get("labels") or ())
+            if labels not in label_ids:
+                label_ids[labels] = len(self.label_sets)
+                self.label_sets.append(labels)
+            self.node_name[i] = name_ids[name]
+            self.node_type[i] = type_ids[node_type]
+            self.node_labels[i] = label_ids[labels]
+            self.descriptions[i] = node.get("description")
+
+        # Relationship-type table + deduplicated edge list
+        self.rel_types: List[str] = []
+        rel_ids: Dict[str, int] = {}
+        unique = set()
+        src, rel, dst = [], [], []
+        for source_key, rel_type, target_key in edges:
+            a, b = key_to_node.get(source_key), key_to_node.get(target_key)
+            if a is None or b is None:
+                continue
+            if rel_type not in rel_ids:
+                rel_ids[rel_type] = len(self.rel_types)
+                self.rel_types.append(rel_type)
+            edge = (a, rel_ids[rel_type], b)
+            if edge in unique:
+                continue
+            unique.add(edge)
+            src.append(a)
+            rel.append(edge[1])
+            dst.append(b)
+
+        self.edge_src = np.asarray(src, dtype=np.int32)
+        self.edge_rel = np.asarray(rel, dtype=np.int32)
+        self.edge_dst = np.asarray(dst, dtype=np.int32)
+        # CSR: edges of node i are edge ids order[offsets[i]:offsets[i + 1]]
+        self.out_offsets, self.out_edges = self._csr(self.edge_src, count)
+        self.in_offsets, self.in_edges = self._csr(self.edge_dst, count)
+        order = np.argsort(self.edge_rel, kind="stable")
+        rel_counts = np.bincount(self.edge_rel, minlength=len(self.rel_types))
+        self.rel_offsets = np.concatenate([[0], np.cumsum(rel_counts)]).astype(np.int64)
+        self.rel_edges = order.astype(np.int32)
+
+        self._build_text_index(count)
+        self.build_seconds = time.perf_counter() - start
+        self.loaded_at = time.time()
+
+    @staticmethod
+    def _csr(keys: np.ndarray, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        order = np.argsort(keys, kind="stable").astype(np.int32)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=count))]).astype(np.int64)
+        return offsets, order
+
+    def _build_text_index(self, count: int):
+        """
+        Per field (indexed labels only, string values only, as Neo4j indexes
+        them): token lists, posting lists with term frequencies, BM25 length
+        norms from the Lucene-encoded field length, and a deletion index over
+        the vocabulary for fuzzy term expansion.
+        """
+        indexed = {i for i, labels in enumerate(self.label_sets) if set(labels) & set(INDEXED_LABELS)}
+        self.field_tokens = {field: [None] * count for field in TEXT_FIELDS}
+        self.postings = {}
+        self.doc_count = {}
+        self.norms = {}
+        self.fuzzy_keys = {}
+        for field in TEXT_FIELDS:
+            postings = defaultdict(list)
+            lengths = np.zeros(count, dtype=np.int64)
+            for i in range(count):
+                if self.node_labels[i] not in indexed:
+                    continue
+                text = {
+                    "name": self.names[self.node_name[i]],
+                    "type": self.types[self.node_type[i]],
+                    "description": self.descriptions[i]
+                }[field]
+                if not isinstance(text, str):
+                    continue
+                tokens = tokenize(text)
+                self.field_tokens[field][i] = tokens
+                lengths[i] = len(tokens)
+                for token, freq in Counter(tokens).items():
+                    postings[token].append((i, freq))
+
+            # Posting lists as (node ids, term frequencies) arrays: scoring is vectorized over them
+            self.postings[field] = {token: (np.asarray([node for node, _ in hits], dtype=np.int32),
+                                            np.asarray([freq for _, freq in hits], dtype=np.float64))
+                                    for token, hits in postings.items()}
+            # Lucene statistics: docCount counts documents with at least one token in the field
+            self.doc_count[field] = int(np.count_nonzero(lengths))
+            avg_length = lengths.sum() / self.doc_count[field] if self.doc_count[field] else 1.0
+            decoded = {length: _byte4_to_int(_int_to_byte4(length)) for length in np.unique(lengths).tolist()}
+            encoded_lengths = np.asarray([decoded[length] for length in lengths.tolist()], dtype=np.float64)
+            self.norms[field] = BM25_K1 * ((1 - BM25_B) + BM25_B * encoded_lengths / avg_length)
+
+            # Each token and its one-character deletions -> tokens (fuzzy query terms are 6+ characters)
+            keys = defaultdict(list)
+            for token in self.postings[field]:
+                if len(token) >= 5:
+                    for key in {token} | _deletions(token):
+                        keys[key].append(token)
+            self.fuzzy_keys[field] = keys
+
+    def _idf(self, field: str, doc_freq: int) -> float:
+        count = self.doc_count[field]
+        return math.log(1 + (count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def _add_term(self, scores: np.ndarray, field: str, token: str, boost: float, idf: Optional[float] = None):
+        nodes, freqs = self.postings[field].get(token, _NO_POSTINGS)
+        if not len(nodes):
+            return
+        if idf is None:
+            idf = self._idf(field, len(nodes))
+        # Posting lists hold each node once, so fancy-index add is safe
+        scores[nodes] += boost * idf * freqs / (freqs + self.norms[field][nodes])
+
+    def _add_phrase(self, scores: np.ndarray, field: str, phrase: List[str], boost: float):
+        postings = [self.postings[field].get(token, _NO_POSTINGS)[0] for token in phrase]
+        if any(len(nodes) == 0 for nodes in postings):
+            return
+        # Lucene scores a phrase with the summed idf of its terms and the phrase frequency
+        idf = sum(self._idf(field, len(nodes)) for nodes in postings)
+        tokens = self.field_tokens[field]
+        matched, freqs = [], []
+        for node in min(postings, key=len).tolist():
+            freq = _phrase_freq(tokens[node], phrase)
+            if freq:
+                matched.append(node)
+                freqs.append(freq)
+        if matched:
+            nodes, freqs = np.asarray(matched, dtype=np.int32), np.asarray(freqs, dtype=np.float64)
+            scores[nodes] += boost * idf * freqs / (freqs + self.norms[field][nodes])
+
+    def _fuzzy_variants(self, field: str, term: str) -> List[Tuple[str, float]]:
+        """Vocabulary tokens within one edit (transpositions included), as Lucene's FuzzyQuery expands term~1"""
+        keys = self.fuzzy_keys[field]
+        candidates = set()
+        for key in {term} | _deletions(term):
+            candidates.update(keys.get(key, ()))
+        variants = []
+        for token in candidates:
+            edits = _edit_distance_at_most_one(term, token)
+            if edits is not None:
+                variants.append((token, 1.0 - edits / min(len(token), len(term)) if edits else 1.0))
+        variants.sort(key=lambda item: (-item[1], item[0]))
+        return variants[:FUZZY_MAX_EXPANSIONS]
+
+    def _add_fuzzy(self, scores: np.ndarray, field: str, term: str, boost: float):
+        variants = self._fuzzy_variants(field, term)
+        if not variants:
+            return
+        # Blended frequencies: every expansion is scored with the largest document frequency among them
+        idf = self._idf(field, max(len(self.postings[field][token][0]) for token, _ in variants))
+        for token, similarity in variants:
+            self._add_term(scores, field, token, boost * similarity, idf)
+
+    def _score_nodes(self, query: str) -> np.ndarray:
+        """
+        BM25 score per node for the Lucene query kg_search sends to the
+        full-text index: the same clauses, summed over clauses and fields
+        """
+        scores = np.zeros(len(self.node_name), dtype=np.float64)
+        for kind, term, boost in fulltext_clauses(extract_query_terms(query)):
+            tokens = tokenize(term)
+            for field in TEXT_FIELDS:
+                if kind == "fuzzy":
+                    self._add_fuzzy(scores, field, term, boost)
+                elif kind == "phrase" and len(tokens) > 1:
+                    self._add_phrase(scores, field, tokens, boost)
+                else:
+                    # A plain term the analyzer splits becomes an OR of its tokens
+                    for token in tokens:
+                        self._add_term(scores, field, token, boost)
+        return scores
+
+    def _ranked(self, scores: np.ndarray, limit: int) -> List[Tuple[int, float]]:
+        """Top nodes by score (ties: lowest node id first, as Lucene orders equal scores by document)"""
+        nonzero = np.flatnonzero(scores)
+        if len(nonzero) > limit:
+            # Keep every node tied with the limit-th score so the tie-break is stable
+            cutoff = np.partition(scores[nonzero], len(nonzero) - limit)[len(nonzero) - limit]
+            nonzero = nonzero[scores[nonzero] >= cutoff]
+        order = sorted(nonzero.tolist(), key=lambda node: (-scores[node], node))[:limit]
+        return [(node, float(scores[node])) for node in order]
+
+    def _entity(self, node: int, score: float) -> Dict[str, Any]:
+        return {
+            "name": self.names[self.node_name[node]],
+            "type": self.types[self.node_type[node]],
+            "description": self.descriptions[node],
+            "labels": list(self.label_sets[self.node_labels[node]]),
+            "score": score
+        }
+
+    def _relationship(self, edge: int, score: float) -> Dict[str, Any]:
+        return {
+            "source": self.names[self.node_name[self.edge_src[edge]]],
+            "relationship": self.rel_types[self.edge_rel[edge]],
+            "target": self.names[self.node_name[self.edge_dst[edge]]],
+            "score": score
+        }
+
+    def search_entities(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Same shape, scores and ranking as KnowledgeGraphSearch.search_entities"""
+        return [self._entity(node, score) for node, score in self._ranked(self._score_nodes(query), limit)]
+
+    def node_edges(self, node: int) -> np.ndarray:
+        """Ids of all edges touching a node (both directions)"""
+        return np.concatenate([
+            self.out_edges[self.out_offsets[node]:self.out_offsets[node + 1]],
+            self.in_edges[self.in_offsets[node]:self.in_offsets[node + 1]]
+        ])
+
+    def search_relationships(self, query: str, limit: int = 5, candidates: int = 10) -> List[Dict[str, Any]]:
+        """
+        Relationships touching the best-matching entities (score = best entity
+        score), then relationships whose type matches a query term - the same
+        rules as KnowledgeGraphSearch.search_relationships
+        """
+        edge_scores = {}
+        for node, score in self._ranked(self._score_nodes(query), candidates):
+            for edge in self.node_edges(node).tolist():
+                edge_scores[edge] = max(edge_scores.get(edge, 0.0), score)
+        ranked = sorted(edge_scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        results = [self._relationship(edge, score) for edge, score in ranked]
+        seen = {(r["source"], r["relationship"], r["target"]) for r in results}
+
+        terms = [term for term in extract_query_terms(query) if len(term) >= 3]
+        for rel_id, rel_type in enumerate(self.rel_types):
+            if len(results) >= limit:
+                break
+            name = rel_type.lower().replace("_", " ")
+            if not any(term in name for term in terms):
+                continue
+            # kg_search reads limit + len(seen) edges of the type, then skips the ones it already has
+            edges = self.rel_edges[self.rel_offsets[rel_id]:self.rel_offsets[rel_id + 1]][:limit + len(seen)]
+            for edge in edges.tolist():
+                relationship = self._relationship(edge, 0.0)
+                key = (relationship["source"], relationship["relationship"], relationship["target"])
+                if key not in seen and len(results) < limit:
+                    seen.add(key)
+                    results.append(relationship)
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "nodes": int(len(self.node_name)),
+            "relationships": int(len(self.edge_src)),
+            "names": len(self.names),
+            "relationship_types": len(self.rel_types),
+            "build_seconds": round(self.build_seconds, 3),
+            "loaded_at": self.loaded_at
+        }
+
+
+def load_snapshot_from_neo4j(driver) -> KnowledgeGraphSnapshot:
+    """Read every node and relationship in two streaming queries"""
+    with driver.session() as session:
+        nodes = [{
+            "key": record["id"],
+            "name": record["name"],
+            "type": record["type"],
+            "description": record["description"],
+            "labels": record["labels"]
+        } for record in session.run(SNAPSHOT_NODE_QUERY)]
+        edges = [(record["source"], record["relationship"], record["target"])
+                 for record in session.run(SNAPSHOT_EDGE_QUERY)]
+    return KnowledgeGraphSnapshot(nodes, edges, source="neo4j")
+
+
+def load_snapshot_from_triples(csv_file_path: str) -> KnowledgeGraphSnapshot:
+    """
+    Build the graph import_to_neo4j would create from triples.csv: Entity nodes
+    by name, one relationship per distinct (subject, relation, object), rows
+    with a missing or too-short field skipped.
+    """
+    names = {}
+    edges = []
+    with open(csv_file_path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            subject = (row.get('subject') or '').strip()
+            relation = (row.get('relation') or '').strip()
+            object_text = (row.get('object') or '').strip()
+            if len(subject) < 2 or len(relation) < 2 or len(object_text) < 2:
+                continue
+            names.setdefault(subject, None)
+            names.setdefault(object_text, None)
+            edges.append((subject, relation, object_text))
+    nodes = [{"key": name, "name": name, "type": None, "description": None, "labels": ["Entity"]} for name in names]
+    return KnowledgeGraphSnapshot(nodes, edges, source=csv_file_path)
+
+
+class KnowledgeGraphSnapshotManager:
+    def __init__(self, loader: Callable[[], KnowledgeGraphSnapshot], refresh_seconds: float = 600):
+        """
+        loader: builds a fresh snapshot (from Neo4j or triples.csv).
+        refresh_seconds: rebuild interval in the background; 0 disables refresh.
+        """
+        self.loader = loader
+        self.refresh_seconds = refresh_seconds
+        self.snapshot: Optional[KnowledgeGraphSnapshot] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+
+    def refresh(self) -> bool:
+        """Build a new snapshot and swap it in; the old one keeps serving on failure"""
+        try:
+            snapshot = self.loader()
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logger.warning(f"⚠️ Knowledge graph snapshot refresh failed: {e}")
+            return False
+        self.snapshot = snapshot
+        self.refreshes += 1
+        self.last_error = None
+        stats = snapshot.get_stats()
+        logger.info(f"🧠 KG snapshot loaded from {stats['source']}: {stats['nodes']} nodes, "
+                    f"{stats['relationships']} relationships in {stats['build_seconds']}s")
+        return True
+
+    def _ensure_refresher(self):
+        """Background refresh thread, started lazily in the serving process (threads do not survive fork)"""
+        if not self.refresh_seconds or (self._thread_pid == os.getpid() and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid() and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="kg-snapshot-refresh", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.refresh_seconds)
+            self.refresh()
+
+    def get(self) -> Optional[KnowledgeGraphSnapshot]:
+        """Current snapshot (None until the first successful load)"""
+        self._ensure_refresher()
+        return self.snapshot
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {
+            "enabled": True,
+            "refresh_seconds": self.refresh_seconds,
+            "refreshes": self.refreshes,
+            "failures": self.failures
+        }
+        if self.last_error:
+            stats["last_error"] = self.last_error
+        if self.snapshot is not None:
+            stats.update(self.snapshot.get_stats())
+        return stats
+
+
+def create_kg_snapshot(get_driver: Callable[[], Any]) -> Optional[KnowledgeGraphSnapshotManager]:
+    """
+    Snapshot manager from the environment, loaded once before returning:
+    KG_SNAPSHOT_ENABLED (default false), KG_SNAPSHOT_SOURCE ("neo4j" or a path
+    to triples.csv, default neo4j), KG_SNAPSHOT_REFRESH_SECONDS (default 600).
+    get_driver returns the current Neo4j driver (it changes after a fork).
+    """
+    if os.getenv("KG_SNAPSHOT_ENABLED", "false").lower() != "true":
+        return None
+
+    source = os.getenv("KG_SNAPSHOT_SOURCE", "neo4j")
+    if source == "neo4j":
+        def loader():
+            driver = get_driver()
+            if not driver:
+                raise RuntimeError("Neo4j not connected")
+            return load_snapshot_from_neo4j(driver)
+    else:
+        def loader():
+            return load_snapshot_from_triples(source)
+
+    manager = KnowledgeGraphSnapshotManager(loader, refresh_seconds=float(os.getenv("KG_SNAPSHOT_REFRESH_SECONDS", "600")))
+    manager.refresh()
+    return manager
+
+
+def _same_results(expected: List[Dict[str, Any]], actual: List[Dict[str, Any]], fields: Tuple[str, ...],
+                  limit: int) -> bool:
+    """
+    Same scores in the same order (at float32 precision: Lucene scores in
+    float) and the same results per score. Neither path orders equal scores
+    the same way, so a tie group cut off by the limit may hold different members.
+    """
+    def groups(records):
+        by_score = defaultdict(set)
+        for record in records:
+            by_score[round(float(np.float32(record["score"])), 4)].add(tuple(str(record[field]) for field in fields))
+        return sorted(by_score.items(), reverse=True)
+
+    expected_groups, actual_groups = groups(expected), groups(actual)
+    if len(expected) != len(actual) or [s for s, _ in expected_groups] != [s for s, _ in actual_groups]:
+        return False
+    for i, ((_, a), (_, b)) in enumerate(zip(expected_groups, actual_groups)):
+        truncated = i == len(expected_groups) - 1 and len(expected) == limit
+        if len(a) != len(b) or (a != b and not truncated):
+            return False
+    return True
+
+
+def main():
+    """
+    Usage: python kg_snapshot.py [query_log]
+    Parity check: loads a snapshot from Neo4j and runs it and the Cypher path
+    (KnowledgeGraphSearch, full-text index) over PARITY_QUERIES plus the
+    queries in query_log (one per line, or JSONL with a "query" field).
+    Prints every query whose entity or relationship lists differ and exits
+    with status 1 if any do.
+    """
+    from neo4j import GraphDatabase
+    from kg_search import KnowledgeGraphSearch
+
+    queries = list(PARITY_QUERIES)
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f if line.strip()]
+        queries += [json.loads(line)["query"] if line.startswith("{") else line for line in lines]
+
+    driver = GraphDatabase.driver(os.getenv("NEO4J_URI", "neo4j://127.0.0.1:7687"),
+                                  auth=(os.getenv("NEO4J_USER", "neo4j"), os.getenv("NEO4J_PASSWORD", "Hbhosale@05")))
+    snapshot = load_snapshot_from_neo4j(driver)
+    cypher = KnowledgeGraphSearch(driver)
+    logger.info(f"🧠 Snapshot: {snapshot.get_stats()}")
+
+    mismatches = []
+    cypher_ms, snapshot_ms = [], []
+    for query in queries:
+        start = time.perf_counter()
+        cypher_entities = cypher.search_entities(query)
+        cypher_rels = cypher.search_relationships(query)
+        cypher_ms.append((time.perf_counter() - start) * 1000)
+        if not cypher.fulltext_available:
+            driver.close()
+            raise RuntimeError(f"Full-text index {cypher.index_name} is unavailable: nothing to compare against")
+
+        start = time.perf_counter()
+        local_entities = snapshot.search_entities(query)
+        local_rels = snapshot.search_relationships(query)
+        snapshot_ms.append((time.perf_counter() - start) * 1000)
+
+        for kind, fields, expected, actual in (
+            ("entities", ("name",), cypher_entities, local_entities),
+            ("relationships", ("source", "relationship", "target"), cypher_rels, local_rels)
+        ):
+            if not _same_results(expected, actual, fields, limit=5):
+                mismatches.append({
+                    "query": query,
+                    "kind": kind,
+                    "cypher": [[record[field] for field in fields] + [record["score"]] for record in expected],
+                    "snapshot": [[record[field] for field in fields] + [record["score"]] for record in actual]
+                })
+
+    driver.close()
+    print(json.dumps({
+        "queries": len(queries),
+        "mismatches": mismatches,
+        "cypher_p50_ms": round(float(np.percentile(cypher_ms, 50)), 3),
+        "snapshot_p50_ms": round(float(np.percentile(snapshot_ms, 50)), 3)
+    }, indent=2, default=str))
+    if mismatches:
+        logger.error(f"❌ Snapshot differs from the Cypher path on {len(mismatches)} result lists")
+        sys.exit(1)
+    logger.info(f"✅ Snapshot matches the Cypher path on all {len(queries)} queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+🧺 Request Micro-Batching
+Under concurrent load every request thread used to call model.encode([query])
+and index.search(vector, k) with a batch of one. The MicroBatcher collects
+requests that arrive within a short window (up to a max batch size), runs them
+through one batched call on a dispatcher thread and hands each caller its own
+result. QuerySearchBatcher applies it to query embedding + FAISS search.
+"""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 32,
+                 max_wait_ms: float = 2.0, name: str = "batcher", timeout_seconds: Optional[float] = 30.0):
+        """
+        process_batch: maps a list of items to a list of results (same order).
+        max_wait_ms: how long the first request of a batch waits for company.
+        timeout_seconds: how long submit() waits for its result (None: forever).
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self.timeout = timeout_seconds
+
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+        self._thread = threading.Thread(target=self._run, name=f"microbatch-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Any:
+        """Queue an item and block until its batch has been processed (TimeoutError after timeout_seconds)"""
+        future = Future()
+        self._queue.put((item, future))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"Micro-batch {self.name} gave no result within {self.timeout}s") from None
+
+    def _collect(self, first) -> List[Tuple[Any, Future]]:
+        """The first request plus whatever arrives before the window closes"""
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is _STOP:
+                # Finish this batch, then stop
+                self._queue.put(_STOP)
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = self._collect(first)
+
+            try:
+                results = list(self.process_batch([item for item, _ in batch]))
+                # zip() would silently leave the extra callers waiting
+                if len(results) != len(batch):
+                    raise RuntimeError(f"process_batch returned {len(results)} results for {len(batch)} requests")
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"❌ Micro-batch {self.name} failed ({len(batch)} requests): {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.largest_batch = max(self.largest_batch, len(batch))
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self.batches,
+                "requests": self.items,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "largest_batch": self.largest_batch
+            }
+
+
+class QuerySearchBatcher:
+    def __init__(self, encode_many: Callable[[List[str]], np.ndarray], index, max_batch_size: int = 32,
+                 max_wait_ms: float = 2.0, timeout_seconds: Optional[float] = 30.0):
+        """
+        encode_many: list of queries -> (n, dimension) normalized float32 vectors
+        (e.g. QueryEmbeddingCache.encode_many). index: a FAISS index.
+        Every batch does one encode call for the queries that still need a
+        vector and one index.search for the queries that asked for results.
+        """
+        self.encode_many = encode_many
+        self.index = index
+        self.batcher = MicroBatcher(self._process, max_batch_size=max_batch_size,
+                                    max_wait_ms=max_wait_ms, name="query-search", timeout_seconds=timeout_seconds)
+
+    def _process(self, requests: List[Tuple[str, Optional[np.ndarray], int]]) -> List[Tuple]:
+        vectors = [vector for _, vector, _ in requests]
+        timings = [{} for _ in requests]
+        to_encode = [i for i, vector in enumerate(vectors) if vector is None]
+        if to_encode:
+            start = time.perf_counter()
+            encoded = self.encode_many([requests[i][0] for i in to_encode])
+            seconds = time.perf_counter() - start
+            for i, vector in zip(to_encode, encoded):
+                vectors[i] = vector.reshape(1, -1)
+                timings[i]["embedding"] = seconds
+
+        results = [(vector, None, None, timing) for vector, timing in zip(vectors, timings)]
+        to_search = [i for i, (_, _, k) in enumerate(requests) if k > 0]
+        if to_search:
+            max_k = max(requests[i][2] for i in to_search)
+            matrix = np.ascontiguousarray(np.vstack([vectors[i] for i in to_search]), dtype='float32')
+            start = time.perf_counter()
+            scores, labels = self.index.search(matrix, max_k)
+            seconds = time.perf_counter() - start
+            for row, i in enumerate(to_search):
+                k = requests[i][2]
+                timings[i]["faiss_search"] = seconds
+                results[i] = (vectors[i], scores[row:row + 1, :k], labels[row:row + 1, :k], timings[i])
+        return results
+
+    def embed(self, query: str) -> np.ndarray:
+        """(1, dimension) normalized query vector, encoded together with concurrent queries"""
+        return self.batcher.submit((query, None, 0))[0]
+
+    def search(self, query: str, k: int, query_vector: np.ndarray = None,
+               timings: Dict[str, float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (scores, labels) shaped (1, k), like index.search for a single query.
+        If timings is given it receives the batch's encode/search seconds.
+        """
+        _, scores, labels, batch_timings = self.batcher.submit((query, query_vector, k))
+        if timings is not None:
+            timings.update(batch_timings)
+        return scores, labels
+
+    def close(self):
+        self.batcher.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.batcher.get_stats()
@@ -6,11 +6,18 @@ A simplified version that works reliably in cloud environments
 
 import os
 import json
+import time
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Iterator, AsyncIterator, Tuple
 import google.generativeai as genai
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase
 from dotenv import load_dotenv
+from response_streaming import stream_gemini_text, astream_gemini_text
+from response_cache import create_response_cache, DataVersion
+from metrics import STAGE_SECONDS, FALLBACKS, ERRORS
+from kg_search import KnowledgeGraphSearch
+from kg_snapshot import create_kg_snapshot
 
 # Load environment variables
 load_dotenv()
@@ -19,18 +26,103 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class _StreamTurn:
+    """
+    Timing, status and collected text of one streamed answer; the event
+    bookkeeping shared by chat_stream and achat_stream (only their I/O differs)
+    """
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.llm_start = None
+        self.first_text_at = None
+        self.status = 'success'
+        self.answer_parts = []
+
+    def cached_events(self, cached: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        STAGE_SECONDS.observe(time.perf_counter() - self.start, stage="total")
+        elapsed_ms = round((time.perf_counter() - self.start) * 1000, 1)
+        return [
+            ("sources", {"sources": cached['sources']}),
+            ("text", {"text": cached['response']}),
+            ("metadata", {"status": self.status, "cached": True,
+                          "time_to_first_text_ms": elapsed_ms, "total_ms": elapsed_ms})
+        ]
+
+    def context_failed(self, error: Exception):
+        logger.error(f"Error preparing context: {error}")
+        ERRORS.inc(stage="retrieval", kind="error")
+        self.status = 'error'
+        return None, ['fallback']
+
+    def llm_started(self):
+        logger.info("🤖 Streaming Gemini AI response")
+        self.llm_start = time.perf_counter()
+
+    def text_event(self, text: str) -> Tuple[str, Dict[str, Any]]:
+        if self.first_text_at is None:
+            self.first_text_at = time.perf_counter()
+            STAGE_SECONDS.observe(self.first_text_at - self.llm_start, stage="llm_time_to_first_token")
+        self.answer_parts.append(text)
+        return "text", {"text": text}
+
+    def llm_finished(self) -> str:
+        """Record the LLM time and return the full answer (for the response cache)"""
+        STAGE_SECONDS.observe(time.perf_counter() - self.llm_start, stage="llm_total")
+        return "".join(self.answer_parts)
+
+    def llm_failed(self, error: Exception):
+        logger.error(f"❌ Gemini streaming error: {error}")
+        ERRORS.inc(stage="llm", kind="error")
+        self.status = 'error' if self.first_text_at is not None else 'fallback'
+
+    def no_llm(self):
+        if self.status == 'success':
+            logger.warning("⚠️ Gemini model not available, using fallback")
+            self.status = 'fallback'
+
+    def closing_events(self, fallback_response, query: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Fallback text if nothing was streamed, then the final metadata event"""
+        events = []
+        if self.first_text_at is None:
+            self.first_text_at = time.perf_counter()
+            events.append(("text", {"text": fallback_response(query)}))
+        STAGE_SECONDS.observe(time.perf_counter() - self.start, stage="total")
+        events.append(("metadata", {
+            "status": self.status,
+            "time_to_first_text_ms": round((self.first_text_at - self.start) * 1000, 1),
+            "total_ms": round((time.perf_counter() - self.start) * 1000, 1)
+        }))
+        return events
+
+
 class MinimalMOSDACChatbot:
-    def __init__(self, gemini_api_key: str = None):
+    def __init__(self, gemini_api_key: str = None, setup_llm: bool = True):
         """
-        Initialize minimal chatbot with essential features only
+        Initialize minimal chatbot with essential features only.
+        setup_llm=False defers the Gemini setup to reconnect(): used when the
+        chatbot is built in the gunicorn master, since gRPC channels must not
+        be created before fork.
         """
         self.gemini_api_key = gemini_api_key or os.getenv('GEMINI_API_KEY')
+        # Seconds spent in each setup step (reported as the cold-start breakdown)
+        self.startup_timings = {}
         
         # Initialize Gemini AI
-        self.setup_gemini()
+        self.llm_deferred = not setup_llm
+        if setup_llm:
+            start = time.perf_counter()
+            self.setup_gemini()
+            self.startup_timings["gemini"] = round(time.perf_counter() - start, 3)
+        else:
+            logger.info("ℹ️ Gemini setup deferred until after fork")
+            self.gemini_model = None
+            self.gemini_model_name = None
         
         # Initialize Neo4j (optional - with error handling)
+        self.async_driver = None
+        start = time.perf_counter()
         self.setup_neo4j()
+        self.startup_timings["neo4j"] = round(time.perf_counter() - start, 3)
         
         # Enhanced knowledge base with detailed ISRO satellite information
         self.knowledge_base = {
@@ -54,7 +146,21 @@ class MinimalMOSDACChatbot:
         
         # Setup sample data if Neo4j is available
         if self.driver:
+            start = time.perf_counter()
             self.setup_sample_data()
+            self.startup_timings["sample_data"] = round(time.perf_counter() - start, 3)
+        
+        # Exact-match response cache, keyed by query + vector store/KG data version
+        vector_store_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "enhanced_vector_store")
+        self.data_version = DataVersion(vector_store_dir, self.driver,
+                                        refresh_seconds=float(os.getenv("DATA_VERSION_REFRESH_SECONDS", "60")))
+        self.response_cache = create_response_cache(self.data_version)
+        
+        # Optional in-memory copy of the graph (KG_SNAPSHOT_ENABLED): entity lookups without Neo4j round trips
+        start = time.perf_counter()
+        self.kg_snapshot = create_kg_snapshot(lambda: self.driver)
+        if self.kg_snapshot:
+            self.startup_timings["kg_snapshot"] = round(time.perf_counter() - start, 3)
         
         logger.info("✅ Minimal MOSDAC Chatbot initialized successfully")
 
@@ -75,10 +181,12 @@ class MinimalMOSDACChatbot:
                 ]
                 
                 self.gemini_model = None
+                self.gemini_model_name = None
                 for model_name in models_to_try:
                     try:
                         logger.info(f"🔧 Trying model: {model_name}")
                         self.gemini_model = genai.GenerativeModel(model_name)
+                        self.gemini_model_name = model_name
                         # Test the model with a simple query
                         test_response = self.gemini_model.generate_content("Hello")
                         logger.info(f"✅ Gemini AI configured successfully with {model_name}")
@@ -93,9 +201,11 @@ class MinimalMOSDACChatbot:
             else:
                 logger.warning("⚠️ No Gemini API key provided - using fallback responses only")
                 self.gemini_model = None
+                self.gemini_model_name = None
         except Exception as e:
             logger.error(f"❌ Failed to setup Gemini: {e}")
             self.gemini_model = None
+            self.gemini_model_name = None
 
     def setup_neo4j(self):
         """Setup Neo4j connection with error handling"""
@@ -105,6 +215,7 @@ class MinimalMOSDACChatbot:
         if not neo4j_enabled:
             logger.info("ℹ️ Neo4j disabled - set NEO4J_ENABLED=true to enable")
             self.driver = None
+            self.kg_search = KnowledgeGraphSearch(None)
             return
             
         try:
@@ -119,12 +230,13 @@ class MinimalMOSDACChatbot:
             logger.info(f"🔑 Using username: {neo4j_user}")
             
             # Create driver with proper configuration for cloud databases
-            self.driver = GraphDatabase.driver(
-                neo4j_uri, 
-                auth=(neo4j_user, neo4j_password),
-                encrypted=True,  # Enable encryption for cloud databases
-                trust=True       # Trust the server certificate
-            )
+            self.neo4j_config = {
+                "auth": (neo4j_user, neo4j_password),
+                "encrypted": True,  # Enable encryption for cloud databases
+                "trust": True       # Trust the server certificate
+            }
+            self.driver = GraphDatabase.driver(neo4j_uri, **self.neo4j_config)
+            self.neo4j_uri = neo4j_uri
             
             # Test connection
             with self.driver.session() as session:
@@ -139,6 +251,49 @@ class MinimalMOSDACChatbot:
             logger.error(f"❌ Neo4j connection failed: {e}")
             logger.info("💡 Make sure to set NEO4J_URI, NEO4J_USER, and NEO4J_PASSWORD environment variables")
             self.driver = None
+        
+        # Entity lookups go through the full-text index instead of CONTAINS scans
+        self.kg_search = KnowledgeGraphSearch(self.driver)
+        self.kg_search.ensure_indexes()
+
+    def reconnect(self):
+        """
+        Recreate network clients in a forked worker. Sample data and indexes
+        were already set up once in the parent (pre-fork warmup); sockets,
+        gRPC channels and SQLite handles must not be shared across processes,
+        so the worker only opens its own clients.
+        """
+        if self.llm_deferred:
+            # Built in the gunicorn master without Gemini: probe for a model here
+            start = time.perf_counter()
+            self.setup_gemini()
+            self.startup_timings["gemini"] = round(time.perf_counter() - start, 3)
+            self.llm_deferred = False
+        elif self.gemini_model_name:
+            genai.configure(api_key=self.gemini_api_key)
+            self.gemini_model = genai.GenerativeModel(self.gemini_model_name)
+        
+        self.async_driver = None
+        if self.driver:
+            # Drop the inherited driver without closing it: its sockets belong to the parent
+            self.driver = GraphDatabase.driver(self.neo4j_uri, **self.neo4j_config)
+            self.kg_search.driver = self.driver
+            self.data_version.driver = self.driver
+        
+        if self.response_cache:
+            self.response_cache.after_fork()
+        logger.info(f"🔄 Reconnected clients in worker {os.getpid()}")
+
+    def get_async_driver(self):
+        """
+        Async Neo4j driver for the ASGI app, created on first use inside the
+        running event loop. None when the sync connection was not established.
+        """
+        if not self.driver:
+            return None
+        if self.async_driver is None:
+            self.async_driver = AsyncGraphDatabase.driver(self.neo4j_uri, **self.neo4j_config)
+        return self.async_driver
 
     def simple_keyword_search(self, query: str) -> str:
         """Enhanced keyword-based search in knowledge base"""
@@ -158,42 +313,67 @@ class MinimalMOSDACChatbot:
 
     def get_neo4j_data(self, query: str) -> str:
         """Get relevant data from Neo4j if available"""
+        snapshot = self.kg_snapshot.get() if self.kg_snapshot else None
+        if snapshot is not None:
+            with STAGE_SECONDS.time(stage="kg_snapshot_search"):
+                records = snapshot.search_entities(query, limit=5)
+            return self._format_neo4j_records(records)
+        
         if not self.driver:
             return "Database connection not available."
         
         try:
-            with self.driver.session() as session:
-                # First, try to find nodes with specific properties
-                result = session.run("""
-                    MATCH (n)
-                    WHERE toLower(toString(n.name)) CONTAINS toLower($query)
-                    OR toLower(toString(n.description)) CONTAINS toLower($query)
-                    OR toLower(toString(n.type)) CONTAINS toLower($query)
-                    RETURN n.name as name, n.description as description, n.type as type, labels(n) as labels
-                    LIMIT 5
-                """, query=query)
-                
-                records = []
-                for record in result:
-                    records.append({
-                        'name': record.get('name', 'Unknown'),
-                        'description': record.get('description', 'No description'),
-                        'type': record.get('type', 'Unknown'),
-                        'labels': record.get('labels', [])
-                    })
-                
-                if records:
-                    response = f"Found {len(records)} relevant items in Neo4j database:\n"
-                    for i, record in enumerate(records, 1):
-                        response += f"{i}. {record['name']} ({record['type']}): {record['description']}\n"
-                    return response
-                else:
-                    return "No specific database records found for your query."
+            with STAGE_SECONDS.time(stage="cypher_search"):
+                records = self.kg_search.search_entities(query, limit=5)
+            return self._format_neo4j_records(records)
+                    
+        except Exception as e:
+            logger.error(f"Neo4j query error: {e}")
+            ERRORS.inc(stage="cypher_search", kind="error")
+            return "Database query encountered an issue."
+
+    async def aget_neo4j_data(self, query: str) -> str:
+        """Async variant of get_neo4j_data (async Neo4j driver, no thread held)"""
+        snapshot = self.kg_snapshot.get() if self.kg_snapshot else None
+        if snapshot is not None:
+            # In-memory lookup: sub-millisecond, fine to run on the event loop
+            with STAGE_SECONDS.time(stage="kg_snapshot_search"):
+                records = snapshot.search_entities(query, limit=5)
+            return self._format_neo4j_records(records)
+        
+        driver = self.get_async_driver()
+        if not driver:
+            return "Database connection not available."
+        
+        try:
+            with STAGE_SECONDS.time(stage="cypher_search"):
+                records = await self.kg_search.asearch_entities(driver, query, limit=5)
+            return self._format_neo4j_records(records)
                     
         except Exception as e:
             logger.error(f"Neo4j query error: {e}")
+            ERRORS.inc(stage="cypher_search", kind="error")
             return "Database query encountered an issue."
 
+    def _format_neo4j_records(self, result) -> str:
+        """Turn search records into the context text passed to Gemini"""
+        records = []
+        for record in result:
+            records.append({
+                'name': record.get('name', 'Unknown'),
+                'description': record.get('description', 'No description'),
+                'type': record.get('type', 'Unknown'),
+                'labels': record.get('labels', [])
+            })
+        
+        if records:
+            response = f"Found {len(records)} relevant items in Neo4j database:\n"
+            for i, record in enumerate(records, 1):
+                response += f"{i}. {record['name']} ({record['type']}): {record['description']}\n"
+            return response
+        else:
+            return "No specific database records found for your query."
+
     def setup_sample_data(self):
         """Setup sample MOSDAC/ISRO data in Neo4j"""
         if not self.driver:
@@ -232,26 +412,32 @@ class MinimalMOSDACChatbot:
         Chat method that matches the API interface
         """
         try:
-            response_data = self.generate_response(query)
+            with STAGE_SECONDS.time(stage="total"):
+                response_data = self.generate_response(query)
             return response_data.get('response', 'Sorry, I encountered an error.')
         except Exception as e:
             logger.error(f"Chat error: {e}")
             return "I apologize, but I'm having trouble processing your request right now."
 
-    def generate_response(self, user_message: str) -> Dict[str, Any]:
-        """
-        Generate response using available methods
-        """
-        try:
-            logger.info(f"🔄 Processing query: {user_message}")
-            logger.info(f"📱 Gemini model available: {self.gemini_model is not None}")
-            
-            # Get context from different sources
-            keyword_context = self.simple_keyword_search(user_message)
-            db_context = self.get_neo4j_data(user_message)
-            
-            # Prepare context for Gemini
-            context = f"""
+    def _prepare_context(self, user_message: str):
+        """Build the Gemini prompt and the list of sources it draws on"""
+        # Get context from different sources
+        keyword_context = self.simple_keyword_search(user_message)
+        db_context = self.get_neo4j_data(user_message)
+        with STAGE_SECONDS.time(stage="prompt_build"):
+            return self._build_prompt(user_message, keyword_context, db_context)
+
+    async def _aprepare_context(self, user_message: str):
+        """Async variant of _prepare_context"""
+        keyword_context = self.simple_keyword_search(user_message)
+        db_context = await self.aget_neo4j_data(user_message)
+        with STAGE_SECONDS.time(stage="prompt_build"):
+            return self._build_prompt(user_message, keyword_context, db_context)
+
+    def _build_prompt(self, user_message: str, keyword_context: str, db_context: str):
+        """Prompt and source list for the gathered context"""
+        # Prepare context for Gemini
+        context = f"""
             You are a helpful assistant for MOSDAC (Meteorological & Oceanographic Satellite Data Archival Centre) and ISRO.
             
             User question: {user_message}
@@ -263,38 +449,191 @@ class MinimalMOSDACChatbot:
             Please provide a helpful response about MOSDAC, ISRO, satellites, or meteorological data.
             If you don't have specific information, provide general guidance about these topics.
             """
+        
+        sources = ['gemini_ai', 'knowledge_base', 'neo4j'] if self.driver else ['gemini_ai', 'knowledge_base']
+        return context, sources
+
+    def _cached_response(self, user_message: str) -> Optional[Dict[str, Any]]:
+        """Response dict for a repeated question, or None on a cache miss"""
+        cached = self.response_cache.get(user_message) if self.response_cache else None
+        if cached is None:
+            return None
+        logger.info("🗃️ Response cache hit")
+        return {'response': cached['response'], 'sources': cached['sources'], 'status': 'success', 'cached': True}
+
+    def _cache_answer(self, user_message: str, answer: str, sources):
+        if self.response_cache and answer:
+            self.response_cache.put(user_message, {'response': answer, 'sources': sources})
+
+    def _llm_failed(self, error: Exception):
+        logger.error(f"❌ Gemini generation error: {error}")
+        ERRORS.inc(stage="llm", kind="error")
+
+    def _success_response(self, user_message: str, ai_response: Optional[str], sources) -> Dict[str, Any]:
+        """Result dict for a generated answer (ai_response None: Gemini unavailable or failed)"""
+        if ai_response is None:
+            if not self.gemini_model:
+                logger.warning("⚠️ Gemini model not available, using fallback")
+            ai_response = self.fallback_response(user_message)
+        else:
+            logger.info("✅ Gemini AI response generated successfully")
+        return {
+            'response': ai_response,
+            'sources': sources,
+            'status': 'success'
+        }
+
+    def _error_response(self, user_message: str, error: Exception) -> Dict[str, Any]:
+        logger.error(f"Error generating response: {error}")
+        ERRORS.inc(stage="chat", kind="error")
+        return {
+            'response': self.fallback_response(user_message),
+            'sources': ['fallback'],
+            'status': 'error',
+            'error': str(error)
+        }
+
+    def generate_response(self, user_message: str) -> Dict[str, Any]:
+        """
+        Generate response using available methods
+        """
+        try:
+            logger.info(f"🔄 Processing query: {user_message}")
+            logger.info(f"📱 Gemini model available: {self.gemini_model is not None}")
+            
+            # Repeated questions are answered from the response cache
+            cached = self._cached_response(user_message)
+            if cached is not None:
+                return cached
+            
+            context, sources = self._prepare_context(user_message)
             
             # Generate response with Gemini or fallback
+            ai_response = None
             if self.gemini_model:
                 try:
                     logger.info("🤖 Using Gemini AI for response generation")
-                    response = self.gemini_model.generate_content(context)
-                    ai_response = response.text
-                    logger.info("✅ Gemini AI response generated successfully")
+                    with STAGE_SECONDS.time(stage="llm_total"):
+                        ai_response = self.gemini_model.generate_content(context).text
+                    self._cache_answer(user_message, ai_response, sources)
                 except Exception as e:
-                    logger.error(f"❌ Gemini generation error: {e}")
-                    ai_response = self.fallback_response(user_message)
-            else:
-                logger.warning("⚠️ Gemini model not available, using fallback")
-                ai_response = self.fallback_response(user_message)
+                    self._llm_failed(e)
+                    ai_response = None
+            return self._success_response(user_message, ai_response, sources)
             
-            return {
-                'response': ai_response,
-                'sources': ['gemini_ai', 'knowledge_base', 'neo4j'] if self.driver else ['gemini_ai', 'knowledge_base'],
-                'status': 'success'
-            }
+        except Exception as e:
+            return self._error_response(user_message, e)
+
+    def chat_stream(self, query: str, user_id: str = "default_user") -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming variant of chat(). Yields (event, payload) pairs: one "sources"
+        event, then "text" events as Gemini generates, then a final "metadata" event.
+        """
+        turn = _StreamTurn()
+        
+        cached = self._cached_response(query)
+        if cached is not None:
+            yield from turn.cached_events(cached)
+            return
+        
+        try:
+            context, sources = self._prepare_context(query)
+        except Exception as e:
+            context, sources = turn.context_failed(e)
+        
+        yield "sources", {"sources": sources}
+        
+        if context is not None and self.gemini_model:
+            turn.llm_started()
+            try:
+                for text in stream_gemini_text(self.gemini_model, context):
+                    yield turn.text_event(text)
+                self._cache_answer(query, turn.llm_finished(), sources)
+            except Exception as e:
+                turn.llm_failed(e)
+        else:
+            turn.no_llm()
+        
+        yield from turn.closing_events(self.fallback_response, query)
+
+    async def achat(self, query: str, user_id: str = "default_user") -> str:
+        """
+        Async variant of chat()
+        """
+        try:
+            with STAGE_SECONDS.time(stage="total"):
+                response_data = await self.agenerate_response(query)
+            return response_data.get('response', 'Sorry, I encountered an error.')
+        except Exception as e:
+            logger.error(f"Chat error: {e}")
+            return "I apologize, but I'm having trouble processing your request right now."
+
+    async def agenerate_response(self, user_message: str) -> Dict[str, Any]:
+        """
+        Async variant of generate_response (async Neo4j and Gemini calls; the
+        response cache, which may read the data version, runs in a thread)
+        """
+        try:
+            logger.info(f"🔄 Processing query: {user_message}")
+            logger.info(f"📱 Gemini model available: {self.gemini_model is not None}")
+            
+            cached = await asyncio.to_thread(self._cached_response, user_message)
+            if cached is not None:
+                return cached
+            
+            context, sources = await self._aprepare_context(user_message)
+            
+            ai_response = None
+            if self.gemini_model:
+                try:
+                    logger.info("🤖 Using Gemini AI for response generation")
+                    with STAGE_SECONDS.time(stage="llm_total"):
+                        ai_response = (await self.gemini_model.generate_content_async(context)).text
+                    await asyncio.to_thread(self._cache_answer, user_message, ai_response, sources)
+                except Exception as e:
+                    self._llm_failed(e)
+                    ai_response = None
+            return self._success_response(user_message, ai_response, sources)
             
         except Exception as e:
-            logger.error(f"Error generating response: {e}")
-            return {
-                'response': self.fallback_response(user_message),
-                'sources': ['fallback'],
-                'status': 'error',
-                'error': str(e)
-            }
+            return self._error_response(user_message, e)
+
+    async def achat_stream(self, query: str, user_id: str = "default_user") -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Async variant of chat_stream(), yielding the same events
+        """
+        turn = _StreamTurn()
+        
+        cached = await asyncio.to_thread(self._cached_response, query)
+        if cached is not None:
+            for event in turn.cached_events(cached):
+                yield event
+            return
+        
+        try:
+            context, sources = await self._aprepare_context(query)
+        except Exception as e:
+            context, sources = turn.context_failed(e)
+        
+        yield "sources", {"sources": sources}
+        
+        if context is not None and self.gemini_model:
+            turn.llm_started()
+            try:
+                async for text in astream_gemini_text(self.gemini_model, context):
+                    yield turn.text_event(text)
+                await asyncio.to_thread(self._cache_answer, query, turn.llm_finished(), sources)
+            except Exception as e:
+                turn.llm_failed(e)
+        else:
+            turn.no_llm()
+        
+        for event in turn.closing_events(self.fallback_response, query):
+            yield event
 
     def fallback_response(self, user_message: str) -> str:
         """Enhanced fallback response with specific knowledge"""
+        FALLBACKS.inc(chatbot="minimal")
         
         query_lower = user_message.lower()
         
@@ -400,12 +739,31 @@ India's national space agency with remarkable achievements:
 
 Please feel free to ask specific questions about these topics!"""
 
+    def get_system_info(self) -> Dict[str, Any]:
+        """Get system information"""
+        return {
+            "gemini_available": self.gemini_model is not None,
+            "neo4j_connected": self.driver is not None,
+            "knowledge_base_topics": len(self.knowledge_base),
+            "startup_timings": self.startup_timings,
+            "data_version": self.data_version(),
+            "response_cache": self.response_cache.get_stats() if self.response_cache else {"enabled": False},
+            "kg_snapshot": self.kg_snapshot.get_stats() if self.kg_snapshot else {"enabled": False}
+        }
+
     def close(self):
         """Clean up resources"""
         if self.driver:
             self.driver.close()
             logger.info("Neo4j connection closed")
 
+    async def aclose(self):
+        """Close the async Neo4j driver (ASGI shutdown)"""
+        if self.async_driver is not None:
+            await self.async_driver.close()
+            self.async_driver = None
+            logger.info("Async Neo4j connection closed")
+
 # For testing
 if __name__ == "__main__":
     chatbot = MinimalMOSDACChatbot()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+🔁 Query Embedding Cache
+Bounded in-process LRU of query text -> L2-normalized float32 vector in front of
+the SentenceTransformer encoder, so repeated queries (chat retries, eval and
+benchmark runs over the same query set) skip the forward pass. One cache per
+embedding model, shared by the chatbot, VectorStoreEmbedder.test_search and
+the benchmarks.
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+import numpy as np
+from embedding_cache import normalize_content
+from metrics import CACHE_LOOKUPS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingCache:
+    def __init__(self, model, max_entries: int = 10_000):
+        """
+        model: a loaded SentenceTransformer (or anything with encode()).
+        Keys are whitespace/Unicode-normalized query text; no normalization that
+        could change the embedding (case, punctuation) is applied.
+        """
+        self.model = model
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # normalized query -> read-only (dimension,) vector
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.encoded = 0
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.asarray(self.model.encode(texts, convert_to_tensor=False), dtype='float32').reshape(len(texts), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def encode_many(self, queries: List[str]) -> np.ndarray:
+        """
+        (len(queries), dimension) normalized vectors. Cached queries are served
+        from memory; the rest (deduplicated) are encoded in one batch.
+        """
+        keys = [normalize_content(query) for query in queries]
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vector
+                    self.hits += 1
+                else:
+                    self.misses += 1
+
+        CACHE_LOOKUPS.inc(len(found), cache="query_embedding", result="hit")
+        CACHE_LOOKUPS.inc(len(keys) - len(found), cache="query_embedding", result="miss")
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            vectors = self._encode(missing)
+            with self._lock:
+                self.encoded += len(missing)
+                for key, vector in zip(missing, vectors):
+                    vector.flags.writeable = False
+                    found[key] = vector
+                    self._entries[key] = vector
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        if not keys:
+            return np.zeros((0, 0), dtype='float32')
+        return np.vstack([found[key] for key in keys])
+
+    def encode(self, query: str) -> np.ndarray:
+        """(1, dimension) normalized vector for one query"""
+        return self.encode_many([query])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "encoded": self.encoded
+            }
+
+
+# One cache per loaded model (models live for the whole process in the registry)
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_query_embedding_cache(model) -> QueryEmbeddingCache:
+    """
+    Process-wide cache for a model; size from QUERY_EMBEDDING_CACHE_SIZE
+    (default 10000 queries)
+    """
+    with _caches_lock:
+        cache = _caches.get(id(model))
+        if cache is None or cache.model is not model:
+            cache = QueryEmbeddingCache(model, max_entries=int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "10000")))
+            _caches[id(model)] = cache
+        return cache
+
+
+def get_query_embedding_cache_stats() -> List[Dict[str, Any]]:
+    """Stats of every query embedding cache in this process"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.get_stats() for cache in caches]
@@ -2,7 +2,7 @@ import os
 import json
 from pathlib import Path
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 import hashlib
 
@@ -49,6 +49,75 @@ class RAGChunker:
         
         return text.strip()
     
+    def chunk_text(self, text: str, source_meta: Dict[str, Any], id_prefix: str = None) -> List[Dict[str, Any]]:
+        """
+        Chunk in-memory text and return structured chunks.
+        source_meta must contain 'source_file'; optional 'file_path' and 'file_type'
+        go into each chunk's metadata and any other keys (source_type, timestamp, ...)
+        are copied onto each chunk. With id_prefix, ids are "<id_prefix>_<n>"
+        (n = position among kept chunks) instead of content hashes.
+        """
+        meta = dict(source_meta)
+        source_file = meta.pop('source_file')
+        file_path = meta.pop('file_path', source_file)
+        file_type = meta.pop('file_type', "text" if "text_from_pdfs" not in file_path else "pdf_extracted")
+        
+        # Clean the text
+        cleaned_text = self.clean_text(text)
+        
+        if not cleaned_text:
+            logger.warning(f"Empty or invalid text in {source_file}")
+            return []
+        
+        # Split the text into chunks
+        chunks = self.text_splitter.split_text(cleaned_text)
+        
+        # Create structured chunk objects
+        structured_chunks = []
+        for i, chunk in enumerate(chunks):
+            if len(chunk.strip()) < 50:  # Skip very short chunks
+                continue
+            
+            # Create a unique ID for the chunk (computed once, here)
+            if id_prefix is not None:
+                chunk_id = f"{id_prefix}_{len(structured_chunks)}"
+            else:
+                chunk_id = hashlib.md5(f"{Path(source_file).name}_{i}_{chunk[:100]}".encode()).hexdigest()
+            
+            structured_chunk = {
+                "id": chunk_id,
+                "content": chunk.strip(),
+                "source_file": source_file,
+                "chunk_index": i,
+                "chunk_size": len(chunk),
+                "metadata": {
+                    "file_type": file_type,
+                    "file_path": file_path,
+                    "total_chunks": len(chunks)
+                }
+            }
+            structured_chunk.update(meta)
+            
+            structured_chunks.append(structured_chunk)
+        
+        return structured_chunks
+    
+    def chunk_documents(self, documents: Iterable[Dict[str, Any]], id_prefix: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream chunks for an iterable of documents ({'content', 'source_file', ...}).
+        Each document's other keys are passed to chunk_text as source_meta. With
+        id_prefix, ids are "<id_prefix>_<document number>_<n>" (documents numbered from 1).
+        """
+        for doc_number, document in enumerate(documents, start=1):
+            source_meta = {key: value for key, value in document.items() if key != 'content'}
+            try:
+                chunks = self.chunk_text(document['content'], source_meta,
+                                         id_prefix=f"{id_prefix}_{doc_number}" if id_prefix is not None else None)
+            except Exception as e:
+                logger.warning(f"Failed to chunk {document.get('source_file')}: {e}")
+                continue
+            yield from chunks
+    
     def chunk_text_file(self, file_path: Path) -> List[Dict[str, Any]]:
         """
         Chunk a single text file and return structured chunks
@@ -58,39 +127,7 @@ class RAGChunker:
             with open(file_path, 'r', encoding='utf-8') as f:
                 text = f.read()
             
-            # Clean the text
-            cleaned_text = self.clean_text(text)
-            
-            if not cleaned_text:
-                logger.warning(f"Empty or invalid text in {file_path}")
-                return []
-            
-            # Split the text into chunks
-            chunks = self.text_splitter.split_text(cleaned_text)
-            
-            # Create structured chunk objects
-            structured_chunks = []
-            for i, chunk in enumerate(chunks):
-                if len(chunk.strip()) < 50:  # Skip very short chunks
-                    continue
-                
-                # Create a unique ID for the chunk
-                chunk_id = hashlib.md5(f"{file_path.name}_{i}_{chunk[:100]}".encode()).hexdigest()
-                
-                structured_chunk = {
-                    "id": chunk_id,
-                    "content": chunk.strip(),
-                    "source_file": file_path.name,
-                    "chunk_index": i,
-                    "chunk_size": len(chunk),
-                    "metadata": {
-                        "file_type": "text" if "text_from_pdfs" not in str(file_path) else "pdf_extracted",
-                        "file_path": str(file_path),
-                        "total_chunks": len(chunks)
-                    }
-                }
-                
-                structured_chunks.append(structured_chunk)
+            structured_chunks = self.chunk_text(text, {"source_file": file_path.name, "file_path": str(file_path)})
             
             logger.info(f"Created {len(structured_chunks)} chunks from {file_path.name}")
             return structured_chunks
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+🗃️ Response Cache
+Exact-match cache for chat answers, keyed by the normalized query plus the
+data version of the vector store and knowledge graph (so a rebuild or KG sync
+never serves stale answers). Entries expire after a TTL and are evicted least
+recently used first once the entry or byte cap is reached.
+
+Backends:
+  - memory: per-process OrderedDict
+  - sqlite: a local SQLite file shared by all gunicorn workers on the host
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from metrics import CACHE_LOOKUPS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Case, whitespace and trailing-punctuation insensitive form of a query"""
+    text = unicodedata.normalize("NFKC", query).lower()
+    return " ".join(text.split()).rstrip("?!. ")
+
+
+class MemoryCacheBackend:
+    def __init__(self, max_entries: int = 5000, max_bytes: int = 64 * 1024 * 1024):
+        """
+        In-process LRU store: key -> (value, expires_at, size)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, size = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        size = len(key) + len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (value, time.time() + ttl_seconds, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._entries), "bytes": self._bytes,
+                    "max_entries": self.max_entries, "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+
+class SQLiteCacheBackend:
+    TOUCH_BATCH_SIZE = 64
+    TOUCH_FLUSH_SECONDS = 5.0
+
+    def __init__(self, path: str, max_entries: int = 5000, max_bytes: int = 64 * 1024 * 1024):
+        """
+        SQLite-backed LRU store shared across processes (WAL mode, one
+        connection per thread). Hits are read-only; their last_used times are
+        buffered and written in one transaction every TOUCH_BATCH_SIZE hits or
+        TOUCH_FLUSH_SECONDS, and before any eviction.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._local = threading.local()
+        # last_used updates from hits, written in batches rather than one commit per hit
+        self._touched = {}
+        self._touched_lock = threading.Lock()
+        self._flushed_at = time.time()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            conn.commit()
+            return None
+        with self._touched_lock:
+            self._touched[key] = now
+            flush = (len(self._touched) >= self.TOUCH_BATCH_SIZE
+                     or now - self._flushed_at >= self.TOUCH_FLUSH_SECONDS)
+        if flush:
+            self._flush_touched(conn)
+        return row[0]
+
+    def _flush_touched(self, conn: sqlite3.Connection):
+        """Write the buffered last_used times of cache hits"""
+        with self._touched_lock:
+            touched, self._touched = self._touched, {}
+            self._flushed_at = time.time()
+        if touched:
+            conn.executemany("UPDATE responses SET last_used = MAX(last_used, ?) WHERE key = ?",
+                             [(used, key) for key, used in touched.items()])
+            conn.commit()
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        size = len(key) + len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        conn = self._conn()
+        now = time.time()
+        conn.execute("INSERT OR REPLACE INTO responses (key, value, expires_at, last_used, size) VALUES (?, ?, ?, ?, ?)",
+                     (key, value, now + ttl_seconds, now, size))
+        conn.commit()
+        self._flush_touched(conn)
+        self._evict(conn, now)
+        conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired rows, then least recently used rows until under both caps"""
+        conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        count, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        while count > self.max_entries or total_bytes > self.max_bytes:
+            batch = max(count - self.max_entries, 1)
+            rows = conn.execute("SELECT key, size FROM responses ORDER BY last_used LIMIT ?", (batch,)).fetchall()
+            if not rows:
+                break
+            conn.executemany("DELETE FROM responses WHERE key = ?", [(row[0],) for row in rows])
+            count -= len(rows)
+            total_bytes -= sum(row[1] for row in rows)
+            self.evictions += len(rows)
+
+    def after_fork(self):
+        """Forget connections (and buffered hits) inherited from the parent process"""
+        self._local = threading.local()
+        self._touched = {}
+        self._touched_lock = threading.Lock()
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("DELETE FROM responses")
+        conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        count, total_bytes = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"backend": "sqlite", "path": self.path, "entries": count, "bytes": total_bytes,
+                "max_entries": self.max_entries, "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl_seconds: float = 3600, data_version: Callable[[], str] = None):
+        """
+        backend: MemoryCacheBackend or SQLiteCacheBackend.
+        data_version: returns the current data version; it is part of every key.
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.data_version = data_version or (lambda: "")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, query: str) -> str:
+        payload = f"{self.data_version()}\0{normalize_query(query)}".encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Cached entry for the query, or None"""
+        try:
+            value = self.backend.get(self._key(query))
+        except Exception as e:
+            logger.warning(f"⚠️ Response cache lookup failed: {e}")
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        CACHE_LOOKUPS.inc(cache="response", result="miss" if value is None else "hit")
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def put(self, query: str, entry: Dict[str, Any]):
+        """Store a JSON-serializable entry for the query"""
+        try:
+            self.backend.set(self._key(query), json.dumps(entry, ensure_ascii=False), self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"⚠️ Response cache store failed: {e}")
+
+    def after_fork(self):
+        """Call in a forked worker so it opens its own backend connections"""
+        if hasattr(self.backend, "after_fork"):
+            self.backend.after_fork()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters (this process) and backend size"""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        stats = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "ttl_seconds": self.ttl_seconds,
+            "data_version": self.data_version()
+        }
+        try:
+            stats.update(self.backend.get_stats())
+        except Exception as e:
+            stats["backend_error"] = str(e)
+        return stats
+
+
+# Written by import_to_neo4j.py after every successful import/sync
+KG_SYNC_MARKER_QUERY = "MATCH (m:KGSyncState {key: 'triples'}) RETURN m.fingerprint AS fingerprint"
+
+
+class DataVersion:
+    def __init__(self, vector_store_dir: str = "enhanced_vector_store", driver=None, refresh_seconds: float = 60):
+        """
+        Current data version: the vector store's index_version plus the
+        fingerprint of the last knowledge-graph sync (the KGSyncState marker
+        written by import_to_neo4j.py). Computed once here, then refreshed every
+        refresh_seconds by a background thread, so calls never wait on Neo4j.
+        """
+        self.vector_store_dir = vector_store_dir
+        self.driver = driver
+        self.refresh_seconds = refresh_seconds
+        self._refresher = None
+        self._refresher_pid = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._value = self._compute()
+
+    def _vector_store_version(self) -> str:
+        info_path = Path(self.vector_store_dir) / "index_info.json"
+        try:
+            with open(info_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("index_version") or str(int(info_path.stat().st_mtime))
+        except Exception:
+            return "none"
+
+    def _kg_version(self) -> str:
+        if self.driver is None:
+            return "none"
+        try:
+            with self.driver.session() as session:
+                record = session.run(KG_SYNC_MARKER_QUERY).single()
+                return record["fingerprint"] if record and record["fingerprint"] else "unsynced"
+        except Exception:
+            return "unknown"
+
+    def _compute(self) -> str:
+        return f"vs:{self._vector_store_version()}|kg:{self._kg_version()}"
+
+    def refresh(self) -> str:
+        """Recompute the version now"""
+        self._value = self._compute()
+        return self._value
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"⚠️ Data version refresh failed: {e}")
+
+    def _ensure_refresher(self):
+        # Threads do not survive fork: each gunicorn worker starts its own
+        with self._lock:
+            if self._refresher_pid == os.getpid() and self._refresher.is_alive():
+                return
+            self._stop = threading.Event()
+            self._refresher = threading.Thread(target=self._refresh_loop, name="data-version-refresh", daemon=True)
+            self._refresher.start()
+            self._refresher_pid = os.getpid()
+
+    def __call__(self) -> str:
+        if self._refresher_pid != os.getpid():
+            self._ensure_refresher()
+        return self._value
+
+    def stop(self):
+        """Stop the background refresh"""
+        self._stop.set()
+
+
+def create_response_cache(data_version: Callable[[], str] = None) -> Optional[ResponseCache]:
+    """
+    Build the cache from the environment:
+      RESPONSE_CACHE_BACKEND      memory (default), sqlite or off
+      RESPONSE_CACHE_PATH         SQLite file (default cache/response_cache.sqlite3)
+      RESPONSE_CACHE_TTL_SECONDS  default 3600
+      RESPONSE_CACHE_MAX_ENTRIES  default 5000
+      RESPONSE_CACHE_MAX_BYTES    default 64 MB
+    """
+    backend_name = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+    if backend_name in ("off", "none", "disabled"):
+        logger.info("ℹ️ Response cache disabled")
+        return None
+
+    max_entries = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+    max_bytes = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    ttl_seconds = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+
+    try:
+        if backend_name == "sqlite":
+            path = os.getenv("RESPONSE_CACHE_PATH", "cache/response_cache.sqlite3")
+            backend = SQLiteCacheBackend(path, max_entries=max_entries, max_bytes=max_bytes)
+        else:
+            backend = MemoryCacheBackend(max_entries=max_entries, max_bytes=max_bytes)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not open {backend_name} response cache, using in-process cache: {e}")
+        backend = MemoryCacheBackend(max_entries=max_entries, max_bytes=max_bytes)
+
+    logger.info(f"🗃️ Response cache: {type(backend).__name__} (ttl={ttl_seconds}s, max_entries={max_entries})")
+    return ResponseCache(backend, ttl_seconds=ttl_seconds, data_version=data_version)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+📡 Response Streaming Helpers
+Shared by the chatbots' chat_stream() generators and the /chat/stream route:
+incremental Gemini output and server-sent-event framing.
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Iterator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def stream_gemini_text(model, prompt: str) -> Iterator[str]:
+    """
+    Yield text fragments from Gemini as they are generated (stream=True).
+    Fragments without text (e.g. safety-filtered candidates) are skipped;
+    request/transport errors are raised to the caller.
+    """
+    for chunk in model.generate_content(prompt, stream=True):
+        try:
+            text = chunk.text
+        except ValueError:
+            # .text raises when a chunk has no text parts
+            continue
+        if text:
+            yield text
+
+
+async def astream_gemini_text(model, prompt: str) -> AsyncIterator[str]:
+    """Async variant of stream_gemini_text (generate_content_async)"""
+    response = await model.generate_content_async(prompt, stream=True)
+    async for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            continue
+        if text:
+            yield text
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Frame one server-sent event (JSON payload on a single data line)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+🧭 Semantic Response Cache
+Answers paraphrased questions ("tell me about oceansat 3" / "what is OCEANSAT-3?")
+from cache. Recent (query vector, answer) pairs live in a small FAISS inner-product
+index; a lookup hits when cosine similarity passes a threshold AND the query
+retrieved the same set of chunks, so the cached answer was grounded in the same
+documents. The cache is bounded (LRU + TTL) and emptied when the vector store
+version changes.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import faiss
+from metrics import CACHE_LOOKUPS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def source_key(rag_results: List[Dict[str, Any]]) -> Tuple[str, ...]:
+    """Order-independent identity of the chunks a query retrieved"""
+    return tuple(sorted(str(r.get('chunk_id') or r['source_file']) for r in rag_results))
+
+
+class SemanticCache:
+    def __init__(self, dimension: int, threshold: float = 0.92, max_entries: int = 2000,
+                 ttl_seconds: float = 3600, candidates: int = 5):
+        """
+        threshold: minimum cosine similarity (vectors must be L2-normalized).
+        candidates: nearest cached queries checked for a matching source set.
+        """
+        self.dimension = dimension
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.candidates = candidates
+
+        self._lock = threading.Lock()
+        self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+        self._entries = OrderedDict()   # id -> entry dict, least recently used first
+        self._next_id = 0
+        self.data_version = None
+
+        self.hits = 0
+        self.misses = 0
+        self.source_mismatches = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def ensure_version(self, data_version: Optional[str]):
+        """Drop everything if the vector store was rebuilt since the entries were added"""
+        with self._lock:
+            if data_version != self.data_version:
+                if self._entries:
+                    logger.info(f"🧭 Vector store version changed ({self.data_version} -> {data_version}), "
+                                f"clearing {len(self._entries)} semantic cache entries")
+                    self.invalidations += 1
+                self._clear_locked()
+                self.data_version = data_version
+
+    def _clear_locked(self):
+        self._index.reset()
+        self._entries.clear()
+
+    def clear(self):
+        with self._lock:
+            self._clear_locked()
+
+    def _remove_locked(self, entry_ids: List[int]):
+        if not entry_ids:
+            return
+        self._index.remove_ids(np.asarray(entry_ids, dtype='int64'))
+        for entry_id in entry_ids:
+            self._entries.pop(entry_id, None)
+
+    def lookup(self, query_vector: np.ndarray, sources: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        """
+        Cached entry for a similar query that retrieved the same sources, or None.
+        The returned entry includes the similarity and the original query.
+        """
+        vector = np.ascontiguousarray(query_vector, dtype='float32').reshape(1, -1)
+
+        with self._lock:
+            if self._index.ntotal == 0:
+                self.misses += 1
+                CACHE_LOOKUPS.inc(cache="semantic", result="miss")
+                return None
+
+            scores, ids = self._index.search(vector, min(self.candidates, self._index.ntotal))
+            now = time.time()
+            expired = []
+            similar_found = False
+            result = None
+
+            for score, entry_id in zip(scores[0], ids[0]):
+                if entry_id < 0 or score < self.threshold:
+                    break
+                entry = self._entries.get(int(entry_id))
+                if entry is None:
+                    continue
+                if entry['expires_at'] <= now:
+                    expired.append(int(entry_id))
+                    continue
+                similar_found = True
+                if entry['sources'] == sources:
+                    self._entries.move_to_end(int(entry_id))
+                    result = dict(entry, similarity=float(score))
+                    break
+
+            self._remove_locked(expired)
+
+            if result is None:
+                self.misses += 1
+                if similar_found:
+                    self.source_mismatches += 1
+            else:
+                self.hits += 1
+        CACHE_LOOKUPS.inc(cache="semantic", result="miss" if result is None else "hit")
+        return result
+
+    def add(self, query_vector: np.ndarray, sources: Tuple[str, ...], answer: str, query: str = ""):
+        """Remember an answer; evicts the least recently used entries over max_entries"""
+        vector = np.ascontiguousarray(query_vector, dtype='float32').reshape(1, -1)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vector, np.asarray([entry_id], dtype='int64'))
+            self._entries[entry_id] = {
+                'answer': answer,
+                'sources': tuple(sources),
+                'query': query,
+                'expires_at': time.time() + self.ttl_seconds
+            }
+
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                self._remove_locked(list(self._entries.keys())[:overflow])
+                self.evictions += overflow
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "source_mismatches": self.source_mismatches,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "data_version": self.data_version
+            }
+
+
+def create_semantic_cache(dimension: int) -> Optional[SemanticCache]:
+    """
+    Build the cache from the environment:
+      SEMANTIC_CACHE_ENABLED      true (default) / false
+      SEMANTIC_CACHE_THRESHOLD    cosine similarity, default 0.92
+      SEMANTIC_CACHE_MAX_ENTRIES  default 2000
+      SEMANTIC_CACHE_TTL_SECONDS  default 3600
+    """
+    if os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() != "true":
+        logger.info("ℹ️ Semantic cache disabled")
+        return None
+    return SemanticCache(
+        dimension,
+        threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+        max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000")),
+        ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600"))
+    )
+
+
+def replay_query_log(queries: Iterable[str], embed: Callable[[str], np.ndarray],
+                     retrieve: Callable[[str], List[Dict[str, Any]]], dimension: int,
+                     thresholds: Iterable[float] = (0.85, 0.9, 0.92, 0.95)) -> List[Dict[str, Any]]:
+    """
+    Replay a query log against fresh caches, one per threshold. Each miss stands
+    for one Gemini call (its "answer" is added to the cache), each hit for a call
+    saved. Embeddings and retrieval are computed once per query and shared.
+    """
+    queries = [q.strip() for q in queries if q.strip()]
+    prepared = [(query, embed(query), source_key(retrieve(query))) for query in queries]
+
+    report = []
+    for threshold in thresholds:
+        cache = SemanticCache(dimension, threshold=threshold, max_entries=max(len(prepared), 1))
+        examples = []
+        for query, vector, sources in prepared:
+            entry = cache.lookup(vector, sources)
+            if entry is None:
+                cache.add(vector, sources, answer=query, query=query)
+            elif len(examples) < 5 and entry['query'] != query:
+                examples.append({"query": query, "matched": entry['query'], "similarity": round(entry['similarity'], 4)})
+        stats = cache.get_stats()
+        report.append({
+            "threshold": threshold,
+            "queries": len(prepared),
+            "gemini_calls": stats["misses"],
+            "gemini_calls_saved": stats["hits"],
+            "hit_rate": stats["hit_rate"],
+            "source_mismatches": stats["source_mismatches"],
+            "paraphrase_examples": examples
+        })
+        logger.info(f"  threshold={threshold:.2f} hit_rate={stats['hit_rate']:.3f} "
+                    f"calls_saved={stats['hits']}/{len(prepared)} source_mismatches={stats['source_mismatches']}")
+    return report
+
+
+def main():
+    """
+    Usage: python semantic_cache.py [query_log] [thresholds, e.g. 0.85,0.9,0.95]
+    query_log is a text file (one query per line) or JSONL with a "query" field.
+    Replays it through the enhanced chatbot's embedding + RAG retrieval.
+    """
+    query_log = sys.argv[1] if len(sys.argv) > 1 else "query_log.txt"
+    thresholds = [float(t) for t in (sys.argv[2] if len(sys.argv) > 2 else "0.85,0.9,0.92,0.95").split(",")]
+
+    with open(query_log, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    queries = [json.loads(line)["query"] if line.startswith("{") else line for line in lines]
+
+    from enhanced_hybrid_chatbot import EnhancedHybridMOSDACChatbot
+    chatbot = EnhancedHybridMOSDACChatbot()
+
+    logger.info(f"🧭 Replaying {len(queries)} queries from {query_log}")
+    report = replay_query_log(
+        queries,
+        embed=chatbot.embed_query,
+        retrieve=lambda query: chatbot.search_rag(query, k=3),
+        dimension=chatbot.index.d,
+        thresholds=thresholds
+    )
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
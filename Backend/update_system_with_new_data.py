@@ -10,6 +10,7 @@ import shutil
 import logging
 from pathlib import Path
 from datetime import datetime
+from ingestion_pipeline import bounded, write_jsonl, read_text_documents
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +26,9 @@ logger = logging.getLogger(__name__)
 class SystemUpdater:
     def __init__(self):
         self.base_dir = "mosdac_data"
+        # Streaming pipeline tuning: documents buffered between stages, chunks per embedding batch
+        self.queue_size = int(os.getenv("INGEST_QUEUE_SIZE", "64"))
+        self.embed_batch_size = int(os.getenv("INGEST_BATCH_SIZE", "512"))
         self.setup_directories()
         
     def setup_directories(self):
@@ -41,52 +45,18 @@ class SystemUpdater:
             logger.info(f"✅ Created directory: {dir_path}")
     
     def merge_text_data(self):
-        """Merge all text data from both websites"""
+        """
+        Stream all text documents from both websites, writing an
+        all_text_data.jsonl snapshot as they pass through
+        """
         logger.info("📄 Merging text data from both websites...")
         
-        combined_text = []
-        
-        # Process MOSDAC text files
-        mosdac_text_dir = Path(f"{self.base_dir}/text")
-        if mosdac_text_dir.exists():
-            for text_file in mosdac_text_dir.glob("*.txt"):
-                try:
-                    with open(text_file, 'r', encoding='utf-8') as f:
-                        content = f.read().strip()
-                        if content:
-                            combined_text.append({
-                                'content': content,
-                                'source_file': f"mosdac/{text_file.name}",
-                                'source_type': 'webpage',
-                                'timestamp': datetime.now().isoformat()
-                            })
-                except Exception as e:
-                    logger.warning(f"Failed to read {text_file}: {e}")
-        
-        # Process ISRO text files
-        isro_text_dir = Path(f"{self.base_dir}/isro_data/text")
-        if isro_text_dir.exists():
-            for text_file in isro_text_dir.glob("*.txt"):
-                try:
-                    with open(text_file, 'r', encoding='utf-8') as f:
-                        content = f.read().strip()
-                        if content:
-                            combined_text.append({
-                                'content': content,
-                                'source_file': f"isro/{text_file.name}",
-                                'source_type': 'webpage',
-                                'timestamp': datetime.now().isoformat()
-                            })
-                except Exception as e:
-                    logger.warning(f"Failed to read {text_file}: {e}")
-        
-        # Save combined text data
-        combined_text_file = Path(f"{self.base_dir}/combined_text/all_text_data.json")
-        with open(combined_text_file, 'w', encoding='utf-8') as f:
-            json.dump(combined_text, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"✅ Merged {len(combined_text)} text files")
-        return combined_text
+        sources = [
+            (f"{self.base_dir}/text", "mosdac"),
+            (f"{self.base_dir}/isro_data/text", "isro")
+        ]
+        documents = read_text_documents(sources)
+        return write_jsonl(documents, f"{self.base_dir}/combined_text/all_text_data.jsonl")
     
     def merge_pdf_data(self):
         """Merge PDF data and extract text"""
@@ -116,70 +86,43 @@ class SystemUpdater:
         logger.info(f"✅ Merged PDF files to {combined_pdf_dir}")
     
     def create_enhanced_chunks(self, text_data):
-        """Create enhanced chunks from combined text data"""
+        """
+        Chunk a stream of text documents into a stream of enhanced chunks,
+        writing an enhanced_chunks.jsonl snapshot as they pass through
+        """
         logger.info("✂️ Creating enhanced chunks...")
-        
+        return write_jsonl(self._chunk_documents(text_data), f"{self.base_dir}/enhanced_chunks.jsonl")
+    
+    def _chunk_documents(self, text_data):
+        """Yield the chunks of each document in turn (chunked in memory)"""
         from rag_chunker import RAGChunker
         chunker = RAGChunker()
         
-        enhanced_chunks = []
-        chunk_id = 1
-        
-        for item in text_data:
-            try:
-                # Create temporary file for chunking
-                temp_file = Path(f"temp_chunk_{chunk_id}.txt")
-                with open(temp_file, 'w', encoding='utf-8') as f:
-                    f.write(item['content'])
-                
-                # Chunk the text
-                chunks = chunker.chunk_text_file(temp_file)
-                
-                # Add metadata to chunks
-                for chunk in chunks:
-                    chunk['source_file'] = item['source_file']
-                    chunk['source_type'] = item['source_type']
-                    chunk['timestamp'] = item['timestamp']
-                    chunk['id'] = f"chunk_{chunk_id}_{chunks.index(chunk)}"
-                
-                enhanced_chunks.extend(chunks)
-                
-                # Clean up temp file
-                temp_file.unlink()
-                chunk_id += 1
-                
-            except Exception as e:
-                logger.warning(f"Failed to chunk {item['source_file']}: {e}")
-        
-        # Save enhanced chunks
-        enhanced_chunks_file = Path(f"{self.base_dir}/enhanced_chunks.json")
-        with open(enhanced_chunks_file, 'w', encoding='utf-8') as f:
-            json.dump(enhanced_chunks, f, indent=2, ensure_ascii=False)
+        chunk_count = 0
+        for chunk in chunker.chunk_documents(text_data, id_prefix="chunk"):
+            chunk_count += 1
+            yield chunk
         
-        logger.info(f"✅ Created {len(enhanced_chunks)} enhanced chunks")
-        return enhanced_chunks
+        logger.info(f"✅ Created {chunk_count} enhanced chunks")
     
     def update_vector_store(self, chunks):
-        """Update vector store with new chunks"""
+        """Update vector store from a stream of chunks, one embedding batch at a time"""
         logger.info("🔍 Updating vector store...")
         
         try:
             from vector_store_embedder import VectorStoreEmbedder
             
-            # Initialize embedder
-            embedder = VectorStoreEmbedder()
+            # Initialize embedder (ANN backend selectable via VECTOR_INDEX_TYPE)
+            embedder = VectorStoreEmbedder(index_type=os.getenv("VECTOR_INDEX_TYPE", "flat"), incremental=True,
+                                           embedding_cache_dir=f"{self.base_dir}/embedding_cache")
             
-            # Embed chunks
-            embeddings = embedder.embed_chunks(chunks)
-            
-            # Build FAISS index
-            embedder.build_faiss_index(embeddings, chunks)
-            
-            # Save to enhanced vector store
+            # Embed only new/changed chunks, drop stale ones, save atomically
             output_dir = f"{self.base_dir}/enhanced_vector_store"
-            embedder.save_index(output_dir)
+            stats = embedder.update_index_stream(chunks, output_dir, batch_size=self.embed_batch_size)
             
-            logger.info(f"✅ Updated vector store with {len(chunks)} chunks")
+            logger.info(f"✅ Updated vector store with {stats['added'] + stats['reused']} chunks "
+                        f"({stats['added']} added, {stats['removed']} removed, {stats['reused']} reused)")
+            return stats
             
         except Exception as e:
             logger.error(f"❌ Failed to update vector store: {e}")
@@ -243,7 +186,7 @@ class SystemUpdater:
             "system_components": {
                 "vector_store": "enhanced_vector_store/",
                 "knowledge_graph": "neo4j_updated",
-                "chunks": "enhanced_chunks.json",
+                "chunks": "enhanced_chunks.jsonl",
                 "combined_data": "combined_data/"
             },
             "next_steps": [
@@ -266,16 +209,13 @@ class SystemUpdater:
         logger.info("🚀 Starting complete system update...")
         
         try:
-            # Step 1: Merge text data
-            text_data = self.merge_text_data()
-            
-            # Step 2: Merge PDF data
+            # Step 1: Merge PDF data
             self.merge_pdf_data()
             
-            # Step 3: Create enhanced chunks
-            chunks = self.create_enhanced_chunks(text_data)
-            
-            # Step 4: Update vector store
+            # Steps 2-4: read -> chunk -> embed -> index, streamed end to end.
+            # Each stage runs ahead of the next by at most a bounded queue.
+            text_data = bounded(self.merge_text_data(), maxsize=self.queue_size, name="read")
+            chunks = bounded(self.create_enhanced_chunks(text_data), maxsize=self.queue_size * 4, name="chunk")
             self.update_vector_store(chunks)
             
             # Step 5: Update knowledge graph
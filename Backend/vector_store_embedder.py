@@ -2,38 +2,295 @@ import json
 import os
 import logging
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
 import numpy as np
 import faiss
-from sentence_transformers import SentenceTransformer
 import pickle
+import time
+import math
+import shutil
+from embedding_registry import get_embedding_model
+from query_embedding_cache import get_query_embedding_cache
+from embedding_cache import EmbeddingCache
+from embedding_engine import ParallelEmbeddingEngine
+from chunk_store import write_chunk_store, ChunkStore, ChunkStoreWriter, chunk_store_exists, default_export_path
+from chunk_id_map import (write_chunk_id_map, new_index_version, content_label, suffix_duplicate_ids, ChunkIdMap,
+                          ID_MAP_HEADER)
+from ingestion_pipeline import batched
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Supported ANN backends and their default tuning parameters.
+# nlist=None means "pick from the corpus size at build time".
+INDEX_BACKENDS = {
+    "flat": {},
+    "ivf_flat": {"nlist": None, "nprobe": 16},
+    "hnsw": {"M": 32, "efConstruction": 200, "efSearch": 64},
+    "ivf_pq": {"nlist": None, "nprobe": 16, "pq_m": 48, "pq_nbits": 8}
+}
+
+# Parameters that only affect search, applied to an index after loading
+SEARCH_TIME_PARAMS = ("nprobe", "efSearch")
+
+
+def resolve_index_params(index_type: str, num_vectors: int, index_params: Dict[str, Any] = None) -> Dict[str, Any]:
+    """
+    Merge user parameters over the backend defaults and fill in size-dependent values
+    """
+    if index_type not in INDEX_BACKENDS:
+        raise ValueError(f"Unknown index type '{index_type}'. Choose from: {', '.join(INDEX_BACKENDS)}")
+    
+    params = dict(INDEX_BACKENDS[index_type])
+    params.update(index_params or {})
+    
+    if "nlist" in params and not params["nlist"]:
+        # ~4*sqrt(N) lists, keeping at least 39 training points per list
+        params["nlist"] = max(1, min(int(4 * math.sqrt(max(num_vectors, 1))), num_vectors // 39 or 1))
+    if "nprobe" in params and "nlist" in params:
+        params["nprobe"] = min(params["nprobe"], params["nlist"])
+    
+    return params
+
+
+def create_faiss_index(index_type: str, dimension: int, params: Dict[str, Any]):
+    """
+    Create an (untrained, empty) inner-product FAISS index for the given backend
+    """
+    if index_type == "flat":
+        return faiss.IndexFlatIP(dimension)
+    
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, params["M"], faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = params["efConstruction"]
+        index.hnsw.efSearch = params["efSearch"]
+        return index
+    
+    quantizer = faiss.IndexFlatIP(dimension)
+    if index_type == "ivf_flat":
+        index = faiss.IndexIVFFlat(quantizer, dimension, params["nlist"], faiss.METRIC_INNER_PRODUCT)
+    elif index_type == "ivf_pq":
+        if dimension % params["pq_m"] != 0:
+            raise ValueError(f"pq_m={params['pq_m']} must divide the embedding dimension {dimension}")
+        index = faiss.IndexIVFPQ(quantizer, dimension, params["nlist"], params["pq_m"],
+                                 params["pq_nbits"], faiss.METRIC_INNER_PRODUCT)
+    else:
+        raise ValueError(f"Unknown index type '{index_type}'")
+    
+    index.nprobe = params["nprobe"]
+    return index
+
+
+def apply_search_params(index, index_info: Dict[str, Any]):
+    """
+    Apply the search-time parameters recorded in index_info.json to a loaded index
+    """
+    params = index_info.get("index_params") or {}
+    parameter_space = faiss.ParameterSpace()
+    applied = {}
+    
+    for name in SEARCH_TIME_PARAMS:
+        if name in params:
+            parameter_space.set_index_parameter(index, name, params[name])
+            applied[name] = params[name]
+    
+    if applied:
+        logger.info(f"Applied search parameters: {applied}")
+    return applied
+
+
+def index_is_mmapped(index) -> bool:
+    """
+    True when the index's vectors are memory-mapped: faiss maps only IVF
+    inverted lists (read with IO_FLAG_MMAP); flat and HNSW indexes are
+    always read into memory
+    """
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        return False
+    return isinstance(faiss.downcast_InvertedLists(ivf.invlists), faiss.OnDiskInvertedLists)
+
+
+def train_and_add(index, embeddings: np.ndarray):
+    """Train the index if the backend needs it, then add the vectors"""
+    if not index.is_trained:
+        logger.info(f"Training index on {len(embeddings)} vectors...")
+        index.train(embeddings)
+    index.add(embeddings)
+
+
+def benchmark_index_backends(embeddings: np.ndarray, queries: np.ndarray, k=10,
+                             configs: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Build each backend over the same (normalized) vectors and report recall@k against
+    the exact flat index together with build time, search latency and index size
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+    queries = np.ascontiguousarray(queries, dtype='float32')
+    dimension = embeddings.shape[1]
+    
+    if configs is None:
+        configs = [{"index_type": index_type} for index_type in INDEX_BACKENDS]
+    
+    # Exact ground truth
+    exact = faiss.IndexFlatIP(dimension)
+    exact.add(embeddings)
+    _, ground_truth = exact.search(queries, k)
+    
+    report = []
+    for config in configs:
+        index_type = config["index_type"]
+        params = resolve_index_params(index_type, len(embeddings), config.get("index_params"))
+        
+        start = time.perf_counter()
+        index = create_faiss_index(index_type, dimension, params)
+        train_and_add(index, embeddings)
+        build_seconds = time.perf_counter() - start
+        
+        # Per-query latency (batch of one, like the chatbot)
+        latencies = []
+        found = np.empty_like(ground_truth)
+        for i in range(len(queries)):
+            start = time.perf_counter()
+            _, indices = index.search(queries[i:i + 1], k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found[i] = indices[0]
+        
+        hits = sum(len(set(found[i]) & set(ground_truth[i])) for i in range(len(queries)))
+        latencies = np.array(latencies)
+        
+        report.append({
+            "index_type": index_type,
+            "index_params": params,
+            "recall_at_k": round(hits / float(ground_truth.size), 4),
+            "k": k,
+            "build_seconds": round(build_seconds, 3),
+            "latency_ms_mean": round(float(latencies.mean()), 4),
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 4),
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)), 4),
+            "index_bytes": int(faiss.serialize_index(index).size)
+        })
+        logger.info(f"  {index_type:9s} recall@{k}={report[-1]['recall_at_k']:.3f} "
+                    f"p50={report[-1]['latency_ms_p50']:.3f}ms p95={report[-1]['latency_ms_p95']:.3f}ms "
+                    f"build={report[-1]['build_seconds']:.2f}s params={params}")
+    
+    return report
+
+
+def dedupe_chunks(chunks: List[Dict[str, Any]]):
+    """
+    Drop chunks whose id or content label was already seen (first one wins)
+    and return (chunks, labels, kept_positions)
+    """
+    kept, labels, positions = [], [], []
+    seen_ids, seen_labels = set(), set()
+    for position, chunk in enumerate(chunks):
+        label = content_label(chunk)
+        if chunk['id'] in seen_ids or label in seen_labels:
+            continue
+        seen_ids.add(chunk['id'])
+        seen_labels.add(label)
+        kept.append(chunk)
+        labels.append(label)
+        positions.append(position)
+    
+    if len(kept) < len(chunks):
+        logger.info(f"Dropped {len(chunks) - len(kept)} duplicate chunks")
+    return kept, labels, positions
+
+
+# Reports kept next to the index that survive a rebuild; everything else is
+# written fresh (a stale chunks_metadata.json or id map must never carry over)
+CARRY_OVER_FILES = ("ann_benchmark.json", "micro_batching_benchmark.json")
+
+
+def replace_directory(staging_dir: Path, target_dir: Path):
+    """
+    Publish a fully written staging directory as target_dir. target_dir is a
+    symlink to a versioned directory (<name>.v-<index_version>), and switching
+    versions is a single atomic rename of a new symlink over it, so readers
+    always see either the complete old store or the complete new one.
+    Readers that already mmap-ed the old files keep working after it is removed.
+    """
+    version = staging_dir.name.rsplit('.tmp-', 1)[-1]
+    previous_dir = target_dir.resolve() if target_dir.exists() else None
+    if previous_dir is not None:
+        for name in CARRY_OVER_FILES:
+            if (previous_dir / name).is_file() and not (staging_dir / name).exists():
+                shutil.copy2(previous_dir / name, staging_dir / name)
+    
+    version_dir = target_dir.with_name(f"{target_dir.name}.v-{version}")
+    os.rename(staging_dir, version_dir)
+    
+    if target_dir.exists() and not target_dir.is_symlink():
+        # One-time migration of a plain directory store: a directory cannot be
+        # atomically replaced by a symlink, so it is moved aside and linked back
+        previous_dir = target_dir.with_name(f"{target_dir.name}.v-legacy-{version}")
+        os.rename(target_dir, previous_dir)
+        os.symlink(previous_dir.name, target_dir)
+    
+    link_path = target_dir.with_name(f"{target_dir.name}.link-{version}")
+    os.symlink(version_dir.name, link_path)
+    os.replace(link_path, target_dir)
+    
+    if previous_dir is not None and previous_dir != version_dir:
+        shutil.rmtree(previous_dir, ignore_errors=True)
+
+
 class VectorStoreEmbedder:
-    def __init__(self, model_name="all-MiniLM-L6-v2"):
+    def __init__(self, model_name="all-MiniLM-L6-v2", index_type="flat", index_params: Dict[str, Any] = None,
+                 incremental: bool = False, embedding_cache_dir: str = None, embedding_cache_dtype: str = "float32",
+                 embedding_cache_max_entries: int = 500_000, num_workers: int = None,
+                 max_tokens_per_batch: int = 16384):
         """
         Initialize the vector store embedder with SentenceTransformer
+        (shared through the process-wide embedding model registry).
+        index_type selects the ANN backend: flat, ivf_flat, hnsw or ivf_pq.
+        incremental=True keys vectors by content hash (IndexIDMap2 for flat, native
+        ids for IVF) so update_index() can add/remove chunks instead of rebuilding.
         """
+        if index_type not in INDEX_BACKENDS:
+            raise ValueError(f"Unknown index type '{index_type}'. Choose from: {', '.join(INDEX_BACKENDS)}")
+        if incremental and index_type == "hnsw":
+            raise ValueError("hnsw indexes cannot remove vectors; use flat, ivf_flat or ivf_pq for incremental updates")
+        
+        self.incremental = incremental
         self.model_name = model_name
+        self.index_type = index_type
+        self.index_params = dict(index_params or {})
         logger.info(f"Loading embedding model: {model_name}")
         
         try:
-            self.embedding_model = SentenceTransformer(model_name)
+            self.embedding_model = get_embedding_model(model_name)
             logger.info(f"✅ Successfully loaded embedding model: {model_name}")
         except Exception as e:
             logger.error(f"❌ Error loading embedding model: {str(e)}")
             raise
         
-        # Initialize FAISS index
+        # FAISS index is created in build_faiss_index, once the corpus size is known
         self.dimension = self.embedding_model.get_sentence_embedding_dimension()
-        self.index = faiss.IndexFlatIP(self.dimension)  # Inner product for cosine similarity
+        self.index = None
         self.chunks = []
         self.chunk_ids = []
+        self.labels = []
+        
+        # Persistent embedding cache (re-crawls mostly hit it)
+        self.embedding_cache = None
+        if embedding_cache_dir:
+            self.embedding_cache = EmbeddingCache(embedding_cache_dir, model_name, self.dimension,
+                                                  dtype=embedding_cache_dtype,
+                                                  max_entries=embedding_cache_max_entries)
+        
+        # Length-sorted, token-budgeted batching, optionally across worker processes
+        self.embedding_engine = ParallelEmbeddingEngine(
+            model_name,
+            num_workers=num_workers or int(os.getenv("EMBEDDING_WORKERS", "1")),
+            max_tokens_per_batch=max_tokens_per_batch
+        )
         
-        logger.info(f"Initialized FAISS index with dimension: {self.dimension}")
+        logger.info(f"Using {index_type} index backend with dimension: {self.dimension}")
     
     def load_chunks(self, chunks_file: str) -> List[Dict[str, Any]]:
         """
@@ -50,26 +307,55 @@ class VectorStoreEmbedder:
             logger.error(f"Error loading chunks: {str(e)}")
             raise
     
-    def embed_chunks(self, chunks: List[Dict[str, Any]], batch_size=32) -> np.ndarray:
+    def iter_embeddings(self, chunks: List[Dict[str, Any]], flush_cache: bool = True, max_batch_size: int = None):
         """
-        Embed chunks using SentenceTransformer
+        Yield (positions, float32 embeddings) for chunks as they become available:
+        cache hits first in one block, then encoded batches as workers finish them.
+        flush_cache=False leaves persisting the cache index to the caller.
+        max_batch_size caps the texts per batch for this call only.
         """
-        logger.info(f"Starting embedding of {len(chunks)} chunks...")
-        
-        # Extract text content
+        if not chunks:
+            return
         texts = [chunk['content'] for chunk in chunks]
         
-        # Embed in batches
-        embeddings = []
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i + batch_size]
-            batch_embeddings = self.embedding_model.encode(batch_texts, show_progress_bar=True)
-            embeddings.append(batch_embeddings)
-            
-            logger.info(f"Embedded batch {i//batch_size + 1}/{(len(texts) + batch_size - 1)//batch_size}")
+        # Batch lookup in the embedding cache; only misses are encoded
+        to_encode = list(range(len(texts)))
+        if self.embedding_cache is not None:
+            cached, to_encode = self.embedding_cache.get_many(texts)
+            logger.info(f"Embedding cache: {len(texts) - len(to_encode)} hits, {len(to_encode)} to encode")
+            missed = set(to_encode)
+            hit_positions = [i for i in range(len(texts)) if i not in missed]
+            if hit_positions:
+                yield hit_positions, cached[hit_positions]
+        
+        start = time.perf_counter()
+        encoded_count = 0
+        for batch_positions, vectors in self.embedding_engine.encode_stream([texts[i] for i in to_encode],
+                                                                                 max_batch_size=max_batch_size):
+            positions = [to_encode[i] for i in batch_positions]
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many([texts[i] for i in positions], vectors)
+            encoded_count += len(positions)
+            yield positions, vectors
+        
+        if flush_cache and self.embedding_cache is not None:
+            self.embedding_cache.flush()
+        if encoded_count:
+            seconds = time.perf_counter() - start
+            logger.info(f"Encoded {encoded_count} chunks in {seconds:.1f}s "
+                        f"({encoded_count / max(seconds, 1e-9):.1f} chunks/sec, {self.embedding_engine.num_workers} workers)")
+    
+    def embed_chunks(self, chunks: List[Dict[str, Any]], batch_size=None) -> np.ndarray:
+        """
+        Embed chunks using SentenceTransformer (cached embeddings are looked up first).
+        batch_size optionally caps the number of texts per batch (this call only).
+        """
+        logger.info(f"Starting embedding of {len(chunks)} chunks...")
         
-        # Concatenate all embeddings
-        all_embeddings = np.vstack(embeddings)
+        # Results land straight in their rows; no per-batch list + vstack copy
+        all_embeddings = np.empty((len(chunks), self.dimension), dtype='float32')
+        for positions, vectors in self.iter_embeddings(chunks, max_batch_size=batch_size):
+            all_embeddings[positions] = vectors
         
         logger.info(f"✅ Completed embedding. Shape: {all_embeddings.shape}")
         return all_embeddings
@@ -81,10 +367,30 @@ class VectorStoreEmbedder:
         logger.info("Building FAISS index...")
         
         # Normalize embeddings for cosine similarity
+        embeddings = np.ascontiguousarray(embeddings, dtype='float32')
         faiss.normalize_L2(embeddings)
         
-        # Add to FAISS index
-        self.index.add(embeddings.astype('float32'))
+        # Create the configured backend (inner product for cosine similarity)
+        self.index_params = resolve_index_params(self.index_type, len(embeddings), self.index_params)
+        self.index = create_faiss_index(self.index_type, self.dimension, self.index_params)
+        
+        if self.incremental:
+            # Key vectors by content hash so later runs can add/remove by chunk
+            chunks, self.labels, positions = dedupe_chunks(chunks)
+            embeddings = np.ascontiguousarray(embeddings[positions])
+            if not self.index.is_trained:
+                logger.info(f"Training index on {len(embeddings)} vectors...")
+                self.index.train(embeddings)
+            # IVF indexes store ids natively (and IndexIDMap2 over IVF breaks on
+            # remove_ids, since IVF does not compact its internal ids)
+            if self.index_type == "flat":
+                self.index = faiss.IndexIDMap2(self.index)
+            self.index.add_with_ids(embeddings, np.asarray(self.labels, dtype='int64'))
+        else:
+            # Row-keyed: every chunk keeps its vector, but ids must be unique for the id map
+            chunks = suffix_duplicate_ids(chunks)
+            # Train (IVF backends) and add to FAISS index
+            train_and_add(self.index, embeddings)
         
         # Store chunks and IDs for retrieval
         self.chunks = chunks
@@ -92,38 +398,291 @@ class VectorStoreEmbedder:
         
         logger.info(f"✅ FAISS index built with {self.index.ntotal} vectors")
     
-    def save_index(self, output_dir: str):
+    def load_index(self, vector_store_dir: str, load_metadata: bool = True) -> bool:
         """
-        Save FAISS index and metadata
+        Load an existing incremental vector store so it can be updated in place.
+        Returns False if there is none, or it was built with another model or without content-hash labels.
+        load_metadata=False loads only the index, ids and labels (not the chunks).
         """
-        output_path = Path(output_dir)
-        output_path.mkdir(exist_ok=True)
+        # Resolve the store symlink once so every file comes from the same version
+        path = Path(vector_store_dir).resolve()
+        info_path = path / "index_info.json"
+        if not info_path.exists() or not chunk_store_exists(str(path)):
+            return False
+        
+        with open(info_path, 'r', encoding='utf-8') as f:
+            index_info = json.load(f)
+        
+        if index_info.get("label_scheme") != "content_hash":
+            logger.info("Existing vector store is not incremental - rebuilding from scratch")
+            return False
+        if index_info.get("model_name") != self.model_name or index_info.get("dimension") != self.dimension:
+            logger.info("Existing vector store uses a different embedding model - rebuilding from scratch")
+            return False
+        
+        self.index = faiss.read_index(str(path / "faiss_index.bin"))
+        self.index_type = index_info.get("index_backend", self.index_type)
+        self.index_params = index_info.get("index_params", self.index_params)
+        
+        id_map = ChunkIdMap(str(path), expected_version=index_info.get("index_version"))
+        self.chunk_ids = id_map.ids()
+        self.labels = [int(label) for label in id_map.labels()]
+        id_map.close()
+        
+        self.chunks = []
+        if load_metadata:
+            chunk_store = ChunkStore(str(path))
+            self.chunks = list(chunk_store)
+            chunk_store.close()
+        
+        logger.info(f"Loaded existing vector store with {self.index.ntotal} vectors "
+                    f"(version {index_info.get('index_version')})")
+        return True
+    
+    def remove_chunks(self, chunk_ids: List[str]) -> int:
+        """
+        Remove chunks (and their vectors) by chunk id; returns the number removed
+        """
+        if not self.incremental:
+            raise ValueError("remove_chunks requires an incremental (IndexIDMap2) vector store")
+        
+        wanted = set(chunk_ids)
+        keep = [i for i, chunk_id in enumerate(self.chunk_ids) if chunk_id not in wanted]
+        removed_labels = [self.labels[i] for i, chunk_id in enumerate(self.chunk_ids) if chunk_id in wanted]
+        if not removed_labels:
+            return 0
+        
+        self.index.remove_ids(np.asarray(removed_labels, dtype='int64'))
+        self.chunks = [self.chunks[i] for i in keep]
+        self.chunk_ids = [self.chunk_ids[i] for i in keep]
+        self.labels = [self.labels[i] for i in keep]
+        return len(removed_labels)
+    
+    def update_index(self, chunks: List[Dict[str, Any]], output_dir: str) -> Dict[str, int]:
+        """
+        Bring the vector store in output_dir in line with chunks: embed only new or
+        changed chunks, drop stale ones, reuse the rest, then save atomically.
+        Returns counts of added, removed and reused vectors.
+        """
+        if not self.incremental:
+            raise ValueError("update_index requires VectorStoreEmbedder(incremental=True)")
+        
+        start = time.perf_counter()
+        chunks, labels, _ = dedupe_chunks(chunks)
+        
+        if not self.load_index(output_dir) or self.index.ntotal == 0:
+            logger.info("No incremental vector store to update - building a new one")
+            embeddings = self.embed_chunks(chunks)
+            self.build_faiss_index(embeddings, chunks)
+            self.save_index(output_dir)
+            stats = {"added": len(self.chunks), "removed": 0, "reused": 0, "total": self.index.ntotal}
+            logger.info(f"✅ Vector store built: {stats} in {time.perf_counter() - start:.1f}s")
+            return stats
+        
+        existing_labels = set(self.labels)
+        new_labels = set(labels)
+        
+        # Remove stale vectors
+        stale_labels = [label for label in self.labels if label not in new_labels]
+        if stale_labels:
+            self.index.remove_ids(np.asarray(stale_labels, dtype='int64'))
+        
+        # Embed only new or changed chunks, streaming each batch straight into the index
+        to_add = [(chunk, label) for chunk, label in zip(chunks, labels) if label not in existing_labels]
+        add_labels = np.asarray([label for _, label in to_add], dtype='int64')
+        for positions, vectors in self.iter_embeddings([chunk for chunk, _ in to_add]):
+            vectors = np.ascontiguousarray(vectors, dtype='float32')
+            faiss.normalize_L2(vectors)
+            self.index.add_with_ids(vectors, add_labels[positions])
+        
+        # Metadata follows the new crawl (ids, timestamps, order may all change)
+        self.chunks = chunks
+        self.chunk_ids = [chunk['id'] for chunk in chunks]
+        self.labels = labels
+        self.save_index(output_dir)
         
+        stats = {
+            "added": len(to_add),
+            "removed": len(stale_labels),
+            "reused": len(new_labels & existing_labels),
+            "total": self.index.ntotal
+        }
+        logger.info(f"✅ Vector store updated: {stats} in {time.perf_counter() - start:.1f}s")
+        return stats
+    
+    def update_index_stream(self, chunks: Iterable[Dict[str, Any]], output_dir: str,
+                            batch_size: int = 512, train_size: int = 50_000) -> Dict[str, int]:
+        """
+        Streaming variant of update_index(): chunks can be any iterator and is
+        consumed batch by batch. Each chunk's metadata goes straight to the new
+        chunk store and each new vector straight into the index, so only one
+        batch (plus ids and labels) is held in memory. A new IVF index is
+        trained on the first train_size vectors before the rest are streamed in.
+        """
+        if not self.incremental:
+            raise ValueError("update_index_stream requires VectorStoreEmbedder(incremental=True)")
+        
+        start = time.perf_counter()
+        if not self.load_index(output_dir, load_metadata=False) or self.index.ntotal == 0:
+            logger.info("No incremental vector store to update - building a new one")
+            self.index = None
+        existing_labels = set(self.labels) if self.index is not None else set()
+        
+        staging_path = self._create_staging_dir(output_dir)
+        writer = ChunkStoreWriter(str(staging_path))
+        self.chunks, self.chunk_ids, self.labels = [], [], []
+        seen_ids, seen_labels = set(), set()
+        pending, pending_count = [], 0
+        needs_training = self.index_type != "flat"
+        added = duplicates = 0
+        
+        try:
+            for batch in batched(chunks, batch_size):
+                to_embed, embed_labels = [], []
+                for chunk in batch:
+                    label = content_label(chunk)
+                    if chunk['id'] in seen_ids or label in seen_labels:
+                        duplicates += 1
+                        continue
+                    seen_ids.add(chunk['id'])
+                    seen_labels.add(label)
+                    writer.append(chunk)
+                    self.chunk_ids.append(chunk['id'])
+                    self.labels.append(label)
+                    if label not in existing_labels:
+                        to_embed.append(chunk)
+                        embed_labels.append(label)
+                
+                embed_labels = np.asarray(embed_labels, dtype='int64')
+                for positions, vectors in self.iter_embeddings(to_embed, flush_cache=False):
+                    vectors = np.ascontiguousarray(vectors, dtype='float32')
+                    faiss.normalize_L2(vectors)
+                    added += len(positions)
+                    if self.index is not None:
+                        self.index.add_with_ids(vectors, embed_labels[positions])
+                        continue
+                    # New store: hold vectors back until there are enough to train on
+                    pending.append((vectors, embed_labels[positions]))
+                    pending_count += len(positions)
+                    if not needs_training or pending_count >= train_size:
+                        self._create_index_from_sample(pending)
+                        pending, pending_count = [], 0
+            
+            if self.index is None:
+                self._create_index_from_sample(pending)
+            
+            stale_labels = [label for label in existing_labels if label not in seen_labels]
+            if stale_labels:
+                self.index.remove_ids(np.asarray(stale_labels, dtype='int64'))
+            
+            writer.close()
+            self._finalize_save(staging_path, Path(output_dir))
+        except Exception:
+            shutil.rmtree(staging_path, ignore_errors=True)
+            raise
+        finally:
+            if self.embedding_cache is not None:
+                self.embedding_cache.flush()
+        
+        if duplicates:
+            logger.info(f"Dropped {duplicates} duplicate chunks")
+        stats = {
+            "added": added,
+            "removed": len(stale_labels),
+            "reused": len(seen_labels & existing_labels),
+            "total": self.index.ntotal
+        }
+        logger.info(f"✅ Vector store updated (streaming): {stats} in {time.perf_counter() - start:.1f}s")
+        return stats
+    
+    def _create_index_from_sample(self, pending):
+        """
+        Create the configured backend for a streamed build, train it on the
+        buffered (vectors, labels) sample and add the sample
+        """
+        if pending:
+            vectors = np.ascontiguousarray(np.vstack([v for v, _ in pending]))
+            labels = np.concatenate([l for _, l in pending])
+        else:
+            vectors = np.empty((0, self.dimension), dtype='float32')
+            labels = np.empty(0, dtype='int64')
+        
+        if not len(vectors) and self.index_type != "flat":
+            raise ValueError(f"No chunks to train the {self.index_type} index on")
+        
+        # nlist is sized from the sample; the sample is the whole corpus for small crawls
+        self.index_params = resolve_index_params(self.index_type, len(vectors), self.index_params)
+        self.index = create_faiss_index(self.index_type, self.dimension, self.index_params)
+        if not self.index.is_trained:
+            logger.info(f"Training index on {len(vectors)} vectors...")
+            self.index.train(vectors)
+        if self.index_type == "flat":
+            self.index = faiss.IndexIDMap2(self.index)
+        if len(vectors):
+            self.index.add_with_ids(vectors, labels)
+    
+    def _create_staging_dir(self, output_dir: str) -> Path:
+        """New, versioned staging directory next to output_dir"""
+        output_path = Path(output_dir)
+        self.index_version = new_index_version()
+        staging_path = output_path.with_name(f"{output_path.name}.tmp-{self.index_version}")
+        staging_path.mkdir(parents=True)
+        return staging_path
+    
+    def _finalize_save(self, staging_path: Path, output_path: Path):
+        """
+        Write the FAISS index, id map and index info next to the chunk store
+        already in staging_path, then swap the staging directory into place
+        """
         # Save FAISS index
-        faiss_index_path = output_path / "faiss_index.bin"
-        faiss.write_index(self.index, str(faiss_index_path))
+        faiss.write_index(self.index, str(staging_path / "faiss_index.bin"))
         
-        # Save chunks metadata
-        chunks_metadata_path = output_path / "chunks_metadata.json"
-        with open(chunks_metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(self.chunks, f, indent=2, ensure_ascii=False)
+        # Save chunk id <-> row map, versioned together with the FAISS index
+        write_chunk_id_map(self.chunk_ids, str(staging_path), self.index_version,
+                           labels=self.labels if self.incremental else None)
         
-        # Save index info
+        # Save index info (small manifest, written last)
         index_info = {
             "model_name": self.model_name,
             "dimension": self.dimension,
             "total_vectors": self.index.ntotal,
-            "index_type": "IndexFlatIP",
-            "chunk_ids": self.chunk_ids
+            "index_type": type(faiss.downcast_index(self.index)).__name__,
+            "index_backend": self.index_type,
+            "index_params": self.index_params,
+            "label_scheme": "content_hash" if self.incremental else "row",
+            "index_version": self.index_version,
+            "id_map": ID_MAP_HEADER
         }
         
-        index_info_path = output_path / "index_info.json"
-        with open(index_info_path, 'w', encoding='utf-8') as f:
+        with open(staging_path / "index_info.json", 'w', encoding='utf-8') as f:
             json.dump(index_info, f, indent=2, ensure_ascii=False)
         
-        logger.info(f"✅ Saved FAISS index to: {faiss_index_path}")
-        logger.info(f"✅ Saved chunks metadata to: {chunks_metadata_path}")
-        logger.info(f"✅ Saved index info to: {index_info_path}")
+        replace_directory(staging_path, output_path)
+        
+        logger.info(f"✅ Saved FAISS index to: {output_path / 'faiss_index.bin'}")
+        logger.info(f"✅ Saved index info to: {output_path / 'index_info.json'}")
+    
+    def save_index(self, output_dir: str, export_json: bool = False):
+        """
+        Save FAISS index and metadata.
+        Chunk metadata goes to the columnar chunk store; export_json=True also
+        writes a pretty-printed JSON copy for debugging, next to (not inside)
+        the store: <output_dir>_chunks_metadata.json.
+        Everything is written to a staging directory first and swapped in, so
+        readers never see a half-written store.
+        """
+        staging_path = self._create_staging_dir(output_dir)
+        
+        # Save chunks metadata (columnar, mmap-able)
+        write_chunk_store(self.chunks, str(staging_path))
+        
+        self._finalize_save(staging_path, Path(output_dir))
+        
+        if export_json:
+            export_path = default_export_path(output_dir)
+            with open(export_path, 'w', encoding='utf-8') as f:
+                json.dump(self.chunks, f, indent=2, ensure_ascii=False)
+            logger.info(f"✅ Exported chunks metadata JSON to: {export_path}")
     
     def test_search(self, query: str, k=5):
         """
@@ -131,15 +690,21 @@ class VectorStoreEmbedder:
         """
         logger.info(f"Testing search with query: '{query}'")
         
-        # Embed the query
-        query_embedding = self.embedding_model.encode([query])
-        faiss.normalize_L2(query_embedding)
+        # Embed the query (cached, so eval loops over a fixed query set encode each once)
+        query_embedding = get_query_embedding_cache(self.embedding_model).encode(query)
         
         # Search
-        scores, indices = self.index.search(query_embedding.astype('float32'), k)
+        scores, indices = self.index.search(query_embedding, k)
+        
+        # IndexIDMap2 returns content-hash labels rather than row positions
+        if self.incremental:
+            row_for_label = {label: row for row, label in enumerate(self.labels)}
+            indices = np.array([[row_for_label.get(int(label), -1) for label in indices[0]]])
         
         logger.info("Search results:")
         for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
+            if idx < 0:
+                continue
             chunk = self.chunks[idx]
             logger.info(f"  {i+1}. Score: {score:.4f}")
             logger.info(f"     Source: {chunk['source_file']}")
@@ -155,11 +720,12 @@ def main():
     # Configuration
     chunks_file = "mosdac_data/rag_chunks.json"
     output_dir = "mosdac_data/vector_store"
+    index_type = os.getenv("VECTOR_INDEX_TYPE", "flat")
     
     try:
         # Initialize embedder
         logger.info("Initializing vector store embedder...")
-        embedder = VectorStoreEmbedder()
+        embedder = VectorStoreEmbedder(index_type=index_type)
         
         # Load chunks
         logger.info("Loading chunks...")
@@ -47,17 +47,31 @@ const ChatBot = () => {
       // Send query to backend API
       console.log('Sending query to backend:', currentQuery);
       
-      const data = await apiClient.chat(currentQuery);
-      console.log('Backend response:', data);
-      
-      const botResponse: Message = {
-        id: (Date.now() + 1).toString(),
-        text: data.response || "I'm sorry, I couldn't process your request. Please try again.",
-        sender: 'bot',
-        timestamp: new Date()
-      };
-      
-      setMessages(prev => [...prev, botResponse]);
+      const botMessageId = (Date.now() + 1).toString();
+      let started = false;
+
+      const answer = await apiClient.chatStream(currentQuery, {
+        onText: (text) => {
+          if (!started) {
+            // First fragment: replace the typing indicator with the streaming message
+            started = true;
+            setIsTyping(false);
+            setMessages(prev => [...prev, { id: botMessageId, text, sender: 'bot', timestamp: new Date() }]);
+          } else {
+            setMessages(prev => prev.map(m => m.id === botMessageId ? { ...m, text: m.text + text } : m));
+          }
+        },
+        onMetadata: (metadata) => console.log('Backend response metadata:', metadata),
+      });
+
+      if (!started) {
+        setMessages(prev => [...prev, {
+          id: botMessageId,
+          text: answer || "I'm sorry, I couldn't process your request. Please try again.",
+          sender: 'bot',
+          timestamp: new Date()
+        }]);
+      }
     } catch (error) {
       console.error('Error sending message:', error);
       
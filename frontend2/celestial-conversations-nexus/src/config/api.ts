@@ -4,6 +4,7 @@ export const API_BASE_URL = rawApiUrl.endsWith('/') ? rawApiUrl.slice(0, -1) : r
 
 export const apiEndpoints = {
   chat: `${API_BASE_URL}/chat`,
+  chatStream: `${API_BASE_URL}/chat/stream`,
   health: `${API_BASE_URL}/health`,
 };
 
@@ -33,6 +34,66 @@ export const apiClient = {
     }
   },
   
+  // Streams the answer over server-sent events: onSources first, then onText
+  // per fragment, then onMetadata. Resolves with the full answer text.
+  async chatStream(message: string, handlers: {
+    onSources?: (sources: any) => void;
+    onText?: (text: string) => void;
+    onMetadata?: (metadata: any) => void;
+  } = {}) {
+    const response = await fetch(apiEndpoints.chatStream, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'Accept': 'text/event-stream',
+      },
+      body: JSON.stringify({
+        query: message,
+        user_id: 'frontend_user'
+      }),
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let answer = '';
+
+    const handleEvent = (rawEvent: string) => {
+      let event = 'message';
+      let data = '';
+      for (const line of rawEvent.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      }
+      if (!data) return;
+      const payload = JSON.parse(data);
+      if (event === 'sources') handlers.onSources?.(payload);
+      else if (event === 'text') {
+        answer += payload.text;
+        handlers.onText?.(payload.text);
+      } else if (event === 'metadata') handlers.onMetadata?.(payload);
+    };
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        handleEvent(buffer.slice(0, boundary));
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+      }
+    }
+    if (buffer.trim()) handleEvent(buffer);
+
+    return answer;
+  },
+
   async healthCheck() {
     try {
       const response = await fetch(apiEndpoints.health);